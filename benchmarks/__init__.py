@@ -0,0 +1 @@
+"""Benchmarks do consolidador de notas (executar com `python -m benchmarks.<modulo>`)."""
@@ -0,0 +1,74 @@
+"""
+Mede o ganho da leitura antecipada com entradas num compartilhamento lento.
+
+A latência de rede é simulada por `abrir_com_latencia` (espera ao abrir e a
+cada leitura, mais a taxa de transferência). A versão sequencial lê os
+bytes de um relatório e só depois o interpreta; a antecipada lê os próximos
+em threads enquanto o atual é interpretado.
+
+O caso ponta a ponta roda `processar_arquivos` com `leitura_antecipada` e o
+mesmo `abrir` lento. Sem leitura antecipada os arquivos não passam pelo
+`abrir`, então a referência é a mesma consolidação em disco local: a última
+coluna mostra quanto da latência da rede ainda aparece no tempo total.
+Uso: python -m benchmarks.bench_antecipacao [--arquivos 60] [--latencia-ms 20] [--mb-por-s 20] [--antecipar 2 4 8]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.gerador import gerar_relatorios
+from senai_tools.tools.notas.antecipacao import LeituraAntecipada, abrir_com_latencia
+from senai_tools.tools.notas.leitor import ler_relatorio
+from senai_tools.tools.notas.processor import processar_arquivos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arquivos", type=int, default=60)
+    parser.add_argument("--linhas", type=int, default=40)
+    parser.add_argument("--atividades", type=int, default=30)
+    parser.add_argument("--latencia-ms", type=float, default=20.0)
+    parser.add_argument("--mb-por-s", type=float, default=20.0)
+    parser.add_argument("--antecipar", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    abrir = abrir_com_latencia(args.latencia_ms / 1000, args.mb_por_s)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = [str(caminho) for caminho in gerar_relatorios(pasta, args.arquivos, args.linhas, args.atividades)]
+
+        inicio = time.perf_counter()
+        for caminho in caminhos:
+            with abrir(caminho) as f:
+                ler_relatorio(caminho, f.read())
+        t_sequencial = time.perf_counter() - inicio
+        print(f"{'antecipados':>11} {'tempo (s)':>10} {'ganho':>7}")
+        print(f"{0:>11} {t_sequencial:>10.3f} {1:>6.1f}x")
+
+        for arquivos in args.antecipar:
+            inicio = time.perf_counter()
+            with LeituraAntecipada(caminhos, arquivos, abrir=abrir) as antecipada:
+                for caminho in caminhos:
+                    ler_relatorio(caminho, antecipada.obter(caminho))
+            t_antecipado = time.perf_counter() - inicio
+            print(f"{arquivos:>11} {t_antecipado:>10.3f} {t_sequencial / t_antecipado:>6.1f}x")
+
+        saida = os.path.join(pasta, "consolidado.xlsx")
+        inicio = time.perf_counter()
+        processar_arquivos(caminhos, saida)
+        t_local = time.perf_counter() - inicio
+        print()
+        print("Ponta a ponta (processar_arquivos):")
+        print(f"{'antecipados':>11} {'tempo (s)':>10} {'x local':>8}")
+        print(f"{'local':>11} {t_local:>10.3f} {1:>7.2f}x")
+        for arquivos in args.antecipar:
+            inicio = time.perf_counter()
+            processar_arquivos(caminhos, saida, leitura_antecipada=arquivos, abrir=abrir)
+            t_antecipado = time.perf_counter() - inicio
+            print(f"{arquivos:>11} {t_antecipado:>10.3f} {t_antecipado / t_local:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
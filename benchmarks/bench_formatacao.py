@@ -0,0 +1,149 @@
+"""
+Compara o formatar_worksheet atual com a implementação original (uma
+Alignment nova por célula e segunda passada via ws["A1"]) em abas
+"Consolidado" de vários tamanhos, conferindo que o resultado é o mesmo.
+
+Uso: python -m benchmarks.bench_formatacao [--linhas 10000 100000 500000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.dataframe import dataframe_to_rows
+
+from senai_tools.tools.notas.formatacao import formatar_worksheet
+
+
+def formatar_worksheet_original(ws) -> None:
+    """Cópia da implementação anterior, usada como referência."""
+    max_row = ws.max_row
+    max_col = ws.max_column
+
+    header_font = Font(bold=True)
+    header_fill = PatternFill("solid", fgColor="DDDDDD")
+    header_align = Alignment(horizontal="center", vertical="center")
+    thin_side = Side(border_style="thin", color="000000")
+    border = Border(top=thin_side, left=thin_side, right=thin_side, bottom=thin_side)
+
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_align
+        cell.border = border
+
+    for row in ws.iter_rows(min_row=2, max_row=max_row, max_col=max_col):
+        for cell in row:
+            cell.border = border
+            if isinstance(cell.value, str):
+                cell.alignment = Alignment(horizontal="left", vertical="center")
+            else:
+                cell.alignment = Alignment(horizontal="right", vertical="center")
+
+    for col_idx in range(1, max_col + 1):
+        col_letter = get_column_letter(col_idx)
+        max_len = 0
+        for row in range(1, max_row + 1):
+            cell = ws[f"{col_letter}{row}"]
+            value = "" if cell.value is None else str(cell.value)
+            max_len = max(max_len, len(value))
+        ws.column_dimensions[col_letter].width = max_len + 2
+
+    total_col_idx = None
+    for cell in ws[1]:
+        if str(cell.value).strip() == "Total do Curso":
+            total_col_idx = cell.column
+            break
+
+    if total_col_idx and max_row >= 2:
+        col_letter = get_column_letter(total_col_idx)
+        cell_range = f"{col_letter}2:{col_letter}{max_row}"
+        for operador, formula, cor in (
+            ("greaterThanOrEqual", ["60"], "C6EFCE"),
+            ("between", ["40", "59"], "FFEB9C"),
+            ("lessThan", ["40"], "F2DCDB"),
+        ):
+            ws.conditional_formatting.add(
+                cell_range,
+                CellIsRule(
+                    operator=operador,
+                    formula=formula,
+                    stopIfTrue=False,
+                    fill=PatternFill(start_color=cor, end_color=cor, fill_type="solid"),
+                ),
+            )
+
+
+def gerar_consolidado(linhas: int, seed: int = 42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "UC / Relatório": [f"Unidade Curricular {i // 40}" for i in range(linhas)],
+            "Aluno": [f"Aluno {i} Sobrenome {rnd.randint(0, 999)}" for i in range(linhas)],
+            "Total do Curso": [
+                rnd.choice(["-", round(rnd.uniform(0, 100), 2)]) for _ in range(linhas)
+            ],
+        }
+    )
+
+
+def montar_aba(df: pd.DataFrame):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Consolidado"
+    for linha in dataframe_to_rows(df, index=False, header=True):
+        ws.append(linha)
+    return ws
+
+
+def assinatura(ws) -> tuple:
+    """Resumo comparável do resultado visual de uma aba formatada."""
+    celulas = tuple(
+        (c.value, c.font.b, c.fill.fgColor.rgb, c.alignment.horizontal, c.alignment.vertical, c.border.left.style)
+        for linha in ws.iter_rows()
+        for c in linha
+    )
+    larguras = tuple(sorted((k, d.width) for k, d in ws.column_dimensions.items()))
+    regras = tuple(
+        (str(faixa.sqref), tuple((r.operator, tuple(r.formula)) for r in faixa.rules))
+        for faixa in ws.conditional_formatting
+    )
+    return celulas, larguras, regras
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--sem-original", action="store_true", help="mede só a versão atual")
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'original (s)':>13} {'atual (s)':>10} {'ganho':>7} {'igual':>6}")
+    for linhas in args.linhas:
+        df = gerar_consolidado(linhas)
+
+        ws_atual = montar_aba(df)
+        inicio = time.perf_counter()
+        formatar_worksheet(ws_atual, df)
+        t_atual = time.perf_counter() - inicio
+
+        if args.sem_original:
+            print(f"{linhas:>8} {'-':>13} {t_atual:>10.2f} {'-':>7} {'-':>6}")
+            continue
+
+        ws_original = montar_aba(df)
+        inicio = time.perf_counter()
+        formatar_worksheet_original(ws_original)
+        t_original = time.perf_counter() - inicio
+
+        igual = assinatura(ws_original) == assinatura(ws_atual)
+        print(f"{linhas:>8} {t_original:>13.2f} {t_atual:>10.2f} {t_original / t_atual:>6.1f}x {str(igual):>6}")
+
+
+if __name__ == "__main__":
+    main()
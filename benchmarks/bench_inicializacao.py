@@ -0,0 +1,110 @@
+"""
+Mede o tempo até a primeira janela do aplicativo e o custo de importação
+dos módulos carregados antes dela (via `python -X importtime`).
+
+Sem display disponível, mede apenas até o registro das ferramentas.
+Uso: python -m benchmarks.bench_inicializacao [--repeticoes 5] [--json resultado.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Executado em um processo novo para medir a partir de uma importação "fria".
+SCRIPT_FILHO = """
+import json, sys, time
+t0 = time.perf_counter()
+from senai_tools.tools import get_tools
+ferramentas = get_tools()
+t_registro = time.perf_counter()
+t_janela = None
+try:
+    from senai_tools.app import SENAIToolsApp
+    app = SENAIToolsApp(ferramentas)
+    app.update()
+    t_janela = time.perf_counter()
+    pandas_antes_da_janela = "pandas" in sys.modules
+    app.destroy()
+except Exception:
+    pandas_antes_da_janela = "pandas" in sys.modules
+print(json.dumps({
+    "registro_s": t_registro - t0,
+    "primeira_janela_s": None if t_janela is None else t_janela - t0,
+    "pandas_antes_da_janela": pandas_antes_da_janela,
+}))
+"""
+
+MODULOS_MONITORADOS = ("tkinter", "pandas", "openpyxl", "numpy", "senai_tools")
+
+
+def medir_uma_vez() -> dict:
+    inicio = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT_FILHO],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - inicio
+    resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+    resultado["processo_s"] = total
+    resultado["importacoes_ms"] = _importacoes_de_topo(proc.stderr)
+    return resultado
+
+
+def _importacoes_de_topo(saida_importtime: str) -> dict[str, float]:
+    """Tempo acumulado (ms) de cada módulo monitorado, pela linha do pacote raiz."""
+    tempos: dict[str, float] = {}
+    for linha in saida_importtime.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, nome = (parte.strip() for parte in linha.split(":", 1)[1].split("|"))
+        if nome in MODULOS_MONITORADOS and acumulado.isdigit():
+            tempos[nome] = max(tempos.get(nome, 0.0), int(acumulado) / 1000)
+    return tempos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", help="grava as medições neste arquivo")
+    args = parser.parse_args()
+
+    medicoes = [medir_uma_vez() for _ in range(args.repeticoes)]
+
+    def mediana(chave: str) -> float | None:
+        valores = [m[chave] for m in medicoes if m[chave] is not None]
+        return statistics.median(valores) if valores else None
+
+    resumo = {
+        "registro_s": mediana("registro_s"),
+        "primeira_janela_s": mediana("primeira_janela_s"),
+        "processo_s": mediana("processo_s"),
+        "pandas_antes_da_janela": medicoes[-1]["pandas_antes_da_janela"],
+        "importacoes_ms": medicoes[-1]["importacoes_ms"],
+    }
+
+    print(f"registro das ferramentas: {resumo['registro_s'] * 1000:.1f} ms")
+    if resumo["primeira_janela_s"] is None:
+        print("primeira janela: sem display disponível")
+    else:
+        print(f"primeira janela: {resumo['primeira_janela_s'] * 1000:.1f} ms")
+    print(f"processo completo: {resumo['processo_s'] * 1000:.1f} ms")
+    print(f"pandas importado antes da janela: {resumo['pandas_antes_da_janela']}")
+    for modulo, ms in sorted(resumo["importacoes_ms"].items(), key=lambda item: -item[1]):
+        print(f"  import {modulo}: {ms:.1f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"medicoes": medicoes, "resumo": resumo}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compara a leitura completa via pandas com o leitor projetado do pacote notas
+em planilhas largas (muitas colunas de atividades).
+
+Uso: python -m benchmarks.bench_leitor [--linhas 2000] [--atividades 10 80 200] [--formato ods]
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.gerador import gerar_relatorio
+from senai_tools.tools.notas.leitor import COLUNAS_OBRIGATORIAS, ler_relatorio
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=2000)
+    parser.add_argument("--atividades", type=int, nargs="+", default=[10, 80, 200])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--formato", choices=["xlsx", "ods"], default="xlsx")
+    args = parser.parse_args()
+
+    print(f"{'atividades':>10} {'pandas (s)':>11} {'projetado (s)':>14} {'ganho':>7}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for atividades in args.atividades:
+            caminho = Path(pasta) / f"1000 - Largura {atividades} Notas.{args.formato}"
+            gerar_relatorio(caminho, args.linhas, atividades)
+
+            t_pandas = cronometrar(
+                lambda: pd.read_excel(caminho, sheet_name=0)[list(COLUNAS_OBRIGATORIAS)],
+                args.repeticoes,
+            )
+            t_leitor = cronometrar(lambda: ler_relatorio(caminho), args.repeticoes)
+            print(f"{atividades:>10} {t_pandas:>11.3f} {t_leitor:>14.3f} {t_pandas / t_leitor:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compara a memória do consolidado com os tipos originais (UC repetida como
+texto em cada linha, 'Total do Curso' em object) e com os tipos compactos.
+
+Os relatórios sintéticos são lidos uma vez e guardados serializados; cada
+medição os desserializa (objetos novos, como numa leitura) e descarta a
+entrada depois de montar cada parte, como o processador faz. Mede o tamanho
+das partes e do consolidado e, via tracemalloc, a memória que continua alocada
+ao fim e o pico de montar + concatenar. O tracemalloc não vê a memória do
+Arrow (texto), que é igual nas duas versões.
+Uso: python -m benchmarks.bench_memoria [--arquivos 400] [--linhas 45]
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import pickle
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.gerador import gerar_relatorios
+from senai_tools.tools.notas.entradas import extrair_nome_uc
+from senai_tools.tools.notas.ingestao import concatenar_relatorios, ler_notas, montar_df_final
+
+
+def montar_df_final_original(df_notas: pd.DataFrame, nome_arquivo: str) -> pd.DataFrame:
+    """`montar_df_final` antes dos tipos compactos, como referência."""
+    df_final = df_notas.copy()
+    df_final["UC / Relatório"] = extrair_nome_uc(nome_arquivo)
+    return df_final[["UC / Relatório", "Aluno", "Total do Curso"]]
+
+
+def concatenar_original(partes: list[pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat(partes, ignore_index=True)
+
+
+def medir(
+    lidos: list[tuple[bytes, str]],
+    montar: Callable[[pd.DataFrame, str], pd.DataFrame],
+    concatenar: Callable[[list[pd.DataFrame]], pd.DataFrame],
+) -> dict:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    partes = [montar(pickle.loads(serializado), nome) for serializado, nome in lidos]
+    df_saida = concatenar(partes)
+    duracao = time.perf_counter() - inicio
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "partes_bytes": sum(int(df.memory_usage(deep=True).sum()) for df in partes),
+        "consolidado_bytes": int(df_saida.memory_usage(deep=True).sum()),
+        "por_coluna": df_saida.memory_usage(deep=True, index=False).to_dict(),
+        "tipos": df_saida.dtypes.astype(str).to_dict(),
+        "retido_bytes": retido,
+        "pico_bytes": pico,
+        "duracao_s": duracao,
+    }
+
+
+def mb(valor: int) -> str:
+    return f"{valor / 1024 / 1024:8.2f} MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arquivos", type=int, default=400)
+    parser.add_argument("--linhas", type=int, default=45)
+    parser.add_argument("--atividades", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_relatorios(pasta, args.arquivos, args.linhas, args.atividades)
+        lidos = [(pickle.dumps(ler_notas(str(c))), Path(c).name) for c in caminhos]
+
+    original = medir(lidos, montar_df_final_original, concatenar_original)
+    compacto = medir(lidos, montar_df_final, concatenar_relatorios)
+
+    print(f"{args.arquivos} relatórios x {args.linhas} linhas = {args.arquivos * args.linhas} linhas")
+    print(f"{'':<22} {'original':>11} {'compacto':>11} {'redução':>8}")
+    for chave, rotulo in (
+        ("partes_bytes", "partes (soma)"),
+        ("consolidado_bytes", "consolidado"),
+        ("retido_bytes", "alocado ao fim"),
+        ("pico_bytes", "pico montar+concat"),
+    ):
+        reducao = 1 - compacto[chave] / original[chave]
+        print(f"{rotulo:<22} {mb(original[chave])} {mb(compacto[chave])} {reducao:>7.0%}")
+    for coluna in dict.fromkeys([*original["por_coluna"], *compacto["por_coluna"]]):
+        antes = original["por_coluna"].get(coluna, 0)
+        depois = compacto["por_coluna"].get(coluna, 0)
+        tipos = f"{original['tipos'].get(coluna, '-')} -> {compacto['tipos'].get(coluna, '-')}"
+        print(f"  {coluna[:20]:<20} {mb(antes)} {mb(depois)}  {tipos}")
+    print(f"{'tempo montar+concat':<22} {original['duracao_s']:>10.3f}s {compacto['duracao_s']:>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Gera relatórios de notas sintéticos no formato exportado pelo Moodle:
+"<código> - <UC> Notas.xlsx" (ou .ods), com colunas de identificação,
+atividades e "Total do curso (Real)".
+
+Uso: python -m benchmarks.gerador PASTA [--arquivos 100] [--linhas 40] [--atividades 30] [--formato ods]
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+from typing import Iterator, Sequence
+from xml.sax.saxutils import escape
+import zipfile
+
+from openpyxl import Workbook
+
+NOMES = (
+    "Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+    "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sabrina", "Thiago", "Vanessa", "William",
+)
+SOBRENOMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+)
+UCS = (
+    "Banco de Dados", "Lógica de Programação", "Redes de Computadores", "Sistemas Operacionais",
+    "Desenvolvimento Web", "Eletrônica Analógica", "Comandos Elétricos", "Segurança do Trabalho",
+    "Metrologia", "Desenho Técnico", "Gestão da Qualidade", "Comunicação Oral e Escrita",
+)
+COLUNAS_IDENTIFICACAO = ("Nome", "Sobrenome", "Número de identificação", "Instituição", "Departamento", "Endereço de email")
+
+
+def nome_arquivo(indice: int, formato: str = "xlsx") -> str:
+    uc = UCS[indice % len(UCS)]
+    turma = indice // len(UCS)
+    sufixo = f" T{turma}" if turma else ""
+    return f"{1035000 + indice} - {uc}{sufixo} Notas.{formato}"
+
+
+def cabecalho(atividades: int) -> list[str]:
+    return (
+        list(COLUNAS_IDENTIFICACAO)
+        + [f"Tarefa: Atividade {i + 1} (Real)" for i in range(atividades)]
+        + ["Total do curso (Real)", "Último download deste curso"]
+    )
+
+
+def linhas_relatorio(linhas: int, atividades: int, rnd: random.Random) -> Iterator[list[object]]:
+    for i in range(linhas):
+        nome = rnd.choice(NOMES)
+        sobrenome = f"{rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        notas = [rnd.choice(("-", round(rnd.uniform(0, 10), 2))) for _ in range(atividades)]
+        # Cerca de 5% dos alunos ainda sem nota final, como nas exportações reais.
+        total = "-" if rnd.random() < 0.05 else round(rnd.uniform(0, 100), 2)
+        yield (
+            [nome, sobrenome, f"{rnd.randint(10**9, 10**10 - 1)}", "SENAI", "Regional", f"aluno{i}@senaimt.edu.br"]
+            + notas
+            + [total, "1700000000"]
+        )
+
+
+def gerar_relatorio(caminho: Path, linhas: int, atividades: int, seed: int = 0) -> Path:
+    """Grava um relatório sintético em `caminho` (.xlsx ou .ods, pela extensão)."""
+    rnd = random.Random(seed)
+    dados = linhas_relatorio(linhas, atividades, rnd)
+    if caminho.suffix.lower() == ".ods":
+        _gravar_ods(caminho, cabecalho(atividades), dados)
+    else:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Notas")
+        ws.append(cabecalho(atividades))
+        for linha in dados:
+            ws.append(linha)
+        wb.save(caminho)
+    return caminho
+
+
+def gerar_relatorios(
+    pasta: str | Path,
+    arquivos: int,
+    linhas: int,
+    atividades: int,
+    formato: str = "xlsx",
+    seed: int = 42,
+) -> list[Path]:
+    """Gera `arquivos` relatórios em `pasta` e retorna os caminhos em ordem."""
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    return [
+        gerar_relatorio(pasta / nome_arquivo(i, formato), linhas, atividades, seed=seed + i)
+        for i in range(arquivos)
+    ]
+
+
+_MANIFESTO_ODS = """<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+ <manifest:file-entry manifest:full-path="/" manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>
+ <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>"""
+
+_INICIO_ODS = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" \
+xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" \
+xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">\
+<office:body><office:spreadsheet><table:table table:name="Notas">"""
+
+# O LibreOffice completa a tabela com linhas/colunas vazias repetidas; reproduzido aqui.
+_FIM_ODS = (
+    '<table:table-row table:number-rows-repeated="1048000">'
+    '<table:table-cell table:number-columns-repeated="1024"/></table:table-row>'
+    "</table:table></office:spreadsheet></office:body></office:document-content>"
+)
+
+
+def _gravar_ods(caminho: Path, colunas: Sequence[str], dados: Iterator[Sequence[object]]) -> None:
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo("mimetype"), "application/vnd.oasis.opendocument.spreadsheet")
+        zf.writestr("META-INF/manifest.xml", _MANIFESTO_ODS)
+        with zf.open("content.xml", "w") as conteudo:
+            conteudo.write(_INICIO_ODS.encode())
+            conteudo.write(_linha_ods(colunas).encode())
+            for linha in dados:
+                conteudo.write(_linha_ods(linha).encode())
+            conteudo.write(_FIM_ODS.encode())
+
+
+def _linha_ods(valores: Sequence[object]) -> str:
+    celulas = []
+    for valor in valores:
+        if isinstance(valor, (int, float)):
+            celulas.append(
+                f'<table:table-cell office:value-type="float" office:value="{valor}"><text:p>{valor}</text:p></table:table-cell>'
+            )
+        else:
+            celulas.append(
+                f'<table:table-cell office:value-type="string"><text:p>{escape(str(valor))}</text:p></table:table-cell>'
+            )
+    celulas.append('<table:table-cell table:number-columns-repeated="1000"/>')
+    return f"<table:table-row>{''.join(celulas)}</table:table-row>"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pasta")
+    parser.add_argument("--arquivos", type=int, default=100)
+    parser.add_argument("--linhas", type=int, default=40)
+    parser.add_argument("--atividades", type=int, default=30)
+    parser.add_argument("--formato", choices=["xlsx", "ods"], default="xlsx")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    caminhos = gerar_relatorios(args.pasta, args.arquivos, args.linhas, args.atividades, args.formato, args.seed)
+    print(f"{len(caminhos)} relatórios gerados em {args.pasta}")
+
+
+if __name__ == "__main__":
+    main()
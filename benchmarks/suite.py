@@ -0,0 +1,143 @@
+"""
+Bateria de benchmarks do consolidador de notas sobre relatórios sintéticos.
+
+Mede extrair_nome_uc, leitura por arquivo, concat, to_excel,
+formatar_worksheet e processar_arquivos de ponta a ponta (aba única e uma
+aba por UC) e grava o resultado em JSON para comparar execuções.
+
+Uso: python -m benchmarks.suite [--arquivos 50] [--linhas 40] [--atividades 30] [--formato xlsx] [--json resultados.json]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+import openpyxl
+import pandas as pd
+
+from benchmarks.gerador import gerar_relatorios
+from senai_tools import __version__
+from senai_tools.tools.notas.entradas import extrair_nome_uc
+from senai_tools.tools.notas.formatacao import formatar_worksheet
+from senai_tools.tools.notas.ingestao import concatenar_relatorios, ler_notas, montar_df_final, para_planilha
+from senai_tools.tools.notas.processor import processar_arquivos
+
+
+def cronometrar(funcao: Callable[[], object], repeticoes: int) -> list[float]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def caso(nome: str, tempos: list[float], **extras: object) -> dict:
+    return {
+        "nome": nome,
+        "mediana_s": statistics.median(tempos),
+        "minimo_s": min(tempos),
+        "tempos_s": tempos,
+        **extras,
+    }
+
+
+def executar(arquivos: int, linhas: int, atividades: int, formato: str, repeticoes: int) -> dict:
+    casos = []
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter()
+        caminhos = [str(c) for c in gerar_relatorios(Path(pasta) / "entrada", arquivos, linhas, atividades, formato)]
+        geracao_s = time.perf_counter() - inicio
+        saida = str(Path(pasta) / "saida.xlsx")
+
+        nomes = [Path(c).name for c in caminhos]
+        tempos = cronometrar(lambda: [extrair_nome_uc(n) for n in nomes], repeticoes)
+        casos.append(caso("extrair_nome_uc", tempos, chamadas=len(nomes)))
+
+        tempos = cronometrar(lambda: ler_notas(caminhos[0]), repeticoes)
+        casos.append(caso("leitura_por_arquivo", tempos, arquivo=nomes[0]))
+
+        partes = [montar_df_final(ler_notas(c), Path(c).name) for c in caminhos]
+        tempos = cronometrar(lambda: concatenar_relatorios(partes), repeticoes)
+        casos.append(caso("concat", tempos, partes=len(partes)))
+
+        df_saida = concatenar_relatorios([para_planilha(p) for p in partes])
+
+        def gravar_sem_formatar() -> None:
+            with pd.ExcelWriter(saida, engine="openpyxl") as writer:
+                df_saida.to_excel(writer, sheet_name="Consolidado", index=False)
+
+        tempos = cronometrar(gravar_sem_formatar, repeticoes)
+        casos.append(caso("to_excel", tempos, linhas=len(df_saida)))
+
+        tempos = []
+        for _ in range(repeticoes):
+            wb = openpyxl.Workbook()
+            ws = wb.active
+            ws.append(list(df_saida.columns))
+            for linha in df_saida.itertuples(index=False, name=None):
+                ws.append(list(linha))
+            inicio = time.perf_counter()
+            formatar_worksheet(ws, df_saida)
+            tempos.append(time.perf_counter() - inicio)
+        casos.append(caso("formatar_worksheet", tempos, linhas=len(df_saida)))
+
+        for dividir_por_uc in (False, True):
+            tempos = cronometrar(
+                lambda: processar_arquivos(caminhos, saida, dividir_por_uc=dividir_por_uc, usar_diario=False),
+                repeticoes,
+            )
+            nome = "processar_arquivos_por_uc" if dividir_por_uc else "processar_arquivos_consolidado"
+            casos.append(caso(nome, tempos, arquivos=len(caminhos)))
+
+    return {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ambiente": {
+            "senai_tools": __version__,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "openpyxl": openpyxl.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {
+            "arquivos": arquivos,
+            "linhas": linhas,
+            "atividades": atividades,
+            "formato": formato,
+            "repeticoes": repeticoes,
+            "geracao_s": geracao_s,
+        },
+        "casos": casos,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arquivos", type=int, default=50)
+    parser.add_argument("--linhas", type=int, default=40)
+    parser.add_argument("--atividades", type=int, default=30)
+    parser.add_argument("--formato", choices=["xlsx", "ods"], default="xlsx")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", help="arquivo de resultados (padrão: só imprime)")
+    args = parser.parse_args()
+
+    resultado = executar(args.arquivos, args.linhas, args.atividades, args.formato, args.repeticoes)
+
+    for item in resultado["casos"]:
+        print(f"{item['nome']:<32} {item['mediana_s'] * 1000:>10.1f} ms")
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Resultados gravados em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -17,4 +18,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Necessário para a leitura paralela no executável gerado pelo PyInstaller.
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+# Tipos de evento enviados pela tarefa para quem a acompanha (tipicamente a UI).
+EVENTO_LOG = "log"
+EVENTO_PROGRESSO = "progresso"
+EVENTO_CONCLUIDO = "concluido"
+EVENTO_ERRO = "erro"
+
+ESTADO_AGUARDANDO = "aguardando"
+ESTADO_EXECUTANDO = "executando"
+ESTADO_CONCLUIDA = "concluída"
+ESTADO_ERRO = "erro"
+ESTADO_CANCELADA = "cancelada"
+
+# Menor número = sai antes da fila; empates saem na ordem de envio.
+PRIORIDADE_ALTA = 0
+PRIORIDADE_NORMAL = 10
+PRIORIDADE_BAIXA = 20
+
+TAREFAS_SIMULTANEAS_PADRAO = 2
+# Tarefas terminadas mantidas na lista (painel "Tarefas") antes de as mais antigas saírem.
+HISTORICO_TAREFAS = 50
+
+AlvoTarefa = Callable[[Callable[[str], None], Callable[[int, int], None], threading.Event], object]
+
+
+@dataclass(frozen=True)
+class Evento:
+    tipo: str
+    dados: object = None
+
+
+class TarefaCancelada(Exception):
+    """Tarefa cancelada enquanto ainda aguardava na fila do agendador."""
+
+
+class TarefaAgendada:
+    """
+    Uma tarefa enviada ao `AgendadorTarefas`.
+
+    A função recebe (log, progresso, cancelar) e roda numa thread do
+    agendador, sem tocar na interface: mensagens e progresso viram eventos
+    numa fila própria da tarefa, esvaziada por quem a enviou com `drenar()`
+    (tipicamente num `after()` do Tk), e o fim gera um evento "concluido" (com o
+    retorno) ou "erro" (com a exceção; `TarefaCancelada` se ela foi cancelada
+    antes de começar). Estado, progresso e última mensagem ficam também em
+    atributos, lidos pelo painel de tarefas sem consumir os eventos.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        alvo: AlvoTarefa,
+        nome: str,
+        ferramenta: str,
+        prioridade: int,
+        ao_cancelar: Callable[[TarefaAgendada], None] | None = None,
+    ):
+        self.id = id
+        self.nome = nome
+        self.ferramenta = ferramenta
+        self.prioridade = prioridade
+        self.estado = ESTADO_AGUARDANDO
+        self.progresso: tuple[int, int] | None = None
+        self.ultima_mensagem = ""
+        self.enviada_em = time.time()
+        self.iniciada_em: float | None = None
+        self.terminada_em: float | None = None
+        self._alvo = alvo
+        self._fila: queue.SimpleQueue[Evento] = queue.SimpleQueue()
+        self._cancelar = threading.Event()
+        self._ao_cancelar = ao_cancelar
+
+    @property
+    def ativa(self) -> bool:
+        """Aguardando na fila ou em execução."""
+        return self.estado in (ESTADO_AGUARDANDO, ESTADO_EXECUTANDO)
+
+    @property
+    def cancelamento_solicitado(self) -> bool:
+        return self._cancelar.is_set()
+
+    def cancelar(self) -> None:
+        """
+        Pede a interrupção; cabe à função verificar o evento entre as etapas.
+        Uma tarefa ainda na fila sai dela sem começar.
+        """
+        self._cancelar.set()
+        if self._ao_cancelar is not None:
+            self._ao_cancelar(self)
+
+    def drenar(self) -> list[Evento]:
+        """Retorna (sem bloquear) todos os eventos acumulados desde a última chamada."""
+        eventos = []
+        while True:
+            try:
+                eventos.append(self._fila.get_nowait())
+            except queue.Empty:
+                return eventos
+
+    def _executar(self) -> None:
+        self.iniciada_em = time.time()
+        try:
+            resultado = self._alvo(self._log, self._progresso, self._cancelar)
+        except BaseException as e:
+            self._terminar(ESTADO_CANCELADA if self._cancelar.is_set() else ESTADO_ERRO, Evento(EVENTO_ERRO, e))
+        else:
+            self._terminar(ESTADO_CONCLUIDA, Evento(EVENTO_CONCLUIDO, resultado))
+
+    def _terminar(self, estado: str, evento: Evento) -> None:
+        self.terminada_em = time.time()
+        self.estado = estado
+        self._fila.put(evento)
+
+    def _log(self, mensagem: str) -> None:
+        self.ultima_mensagem = mensagem
+        self._fila.put(Evento(EVENTO_LOG, mensagem))
+
+    def _progresso(self, atual: int, total: int) -> None:
+        self.progresso = (atual, total)
+        self._fila.put(Evento(EVENTO_PROGRESSO, (atual, total)))
+
+
+class AgendadorTarefas:
+    """
+    Fila de tarefas com prioridade compartilhada por todas as ferramentas do app.
+
+    No máximo `max_simultaneas` tarefas rodam ao mesmo tempo, cada uma na sua
+    thread; as demais esperam na fila por prioridade e ordem de envio. O
+    trabalho pesado das tarefas vai para um único pool de processos
+    (`pool_processos`, com `max_processos`, por padrão um por núcleo), de modo
+    que várias consolidações juntas dividem os núcleos em vez de cada uma abrir
+    o seu pool.
+    """
+
+    def __init__(
+        self,
+        max_simultaneas: int = TAREFAS_SIMULTANEAS_PADRAO,
+        max_processos: int | None = None,
+    ):
+        if max_simultaneas < 1 or (max_processos is not None and max_processos < 1):
+            raise ValueError("O agendador exige ao menos 1 tarefa simultânea e 1 processo.")
+        self.max_simultaneas = max_simultaneas
+        self.max_processos = max_processos or os.cpu_count() or 1
+        self._fila: list[tuple[int, int, TarefaAgendada]] = []
+        self._tarefas: list[TarefaAgendada] = []
+        self._ids = itertools.count(1)
+        self._em_execucao = 0
+        self._trava = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._encerrado = False
+
+    def enviar(
+        self,
+        alvo: AlvoTarefa,
+        nome: str,
+        *,
+        ferramenta: str = "",
+        prioridade: int = PRIORIDADE_NORMAL,
+    ) -> TarefaAgendada:
+        """Coloca a tarefa na fila; ela começa assim que houver vaga."""
+        with self._trava:
+            if self._encerrado:
+                raise RuntimeError("O agendador de tarefas já foi encerrado.")
+            id_tarefa = next(self._ids)
+            tarefa = TarefaAgendada(id_tarefa, alvo, nome, ferramenta, prioridade, self._retirar_da_fila)
+            heapq.heappush(self._fila, (prioridade, id_tarefa, tarefa))
+            self._tarefas.append(tarefa)
+            self._aparar_historico()
+        self._despachar()
+        return tarefa
+
+    def tarefas(self) -> list[TarefaAgendada]:
+        """Tarefas na fila, em execução e as últimas terminadas, na ordem de envio."""
+        with self._trava:
+            return list(self._tarefas)
+
+    def ativas(self) -> list[TarefaAgendada]:
+        return [tarefa for tarefa in self.tarefas() if tarefa.ativa]
+
+    def limpar_terminadas(self) -> None:
+        with self._trava:
+            self._tarefas = [tarefa for tarefa in self._tarefas if tarefa.ativa]
+
+    def pool_processos(self) -> ProcessPoolExecutor:
+        """
+        Pool de processos compartilhado, criado no primeiro uso. Quem o usa não
+        deve encerrá-lo; quem receber BrokenProcessPool dele chama
+        `descartar_pool_quebrado`.
+        """
+        with self._trava:
+            if self._encerrado:
+                raise RuntimeError("O agendador de tarefas já foi encerrado.")
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_processos)
+            return self._pool
+
+    def descartar_pool_quebrado(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Descarta `pool` depois de um BrokenProcessPool (um processo morreu e
+        levou o pool junto), para que o próximo `pool_processos` crie outro.
+        Nada muda se ele já foi substituído por outra tarefa que também falhou.
+        """
+        with self._trava:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def encerrar(self, esperar: bool = False) -> None:
+        """Cancela todas as tarefas, esvazia a fila e encerra o pool de processos."""
+        with self._trava:
+            self._encerrado = True
+            pendentes = [tarefa for _, _, tarefa in self._fila]
+            self._fila.clear()
+            ativas = [tarefa for tarefa in self._tarefas if tarefa.ativa]
+            pool, self._pool = self._pool, None
+        for tarefa in pendentes:
+            tarefa._terminar(ESTADO_CANCELADA, Evento(EVENTO_ERRO, TarefaCancelada("Agendador encerrado.")))
+        for tarefa in ativas:
+            tarefa.cancelar()
+        if pool is not None:
+            pool.shutdown(wait=esperar, cancel_futures=True)
+
+    def _retirar_da_fila(self, tarefa: TarefaAgendada) -> None:
+        with self._trava:
+            if tarefa.estado != ESTADO_AGUARDANDO:
+                return
+            self._fila = [item for item in self._fila if item[2] is not tarefa]
+            heapq.heapify(self._fila)
+            tarefa._terminar(ESTADO_CANCELADA, Evento(EVENTO_ERRO, TarefaCancelada("Tarefa cancelada antes de começar.")))
+
+    def _despachar(self) -> None:
+        with self._trava:
+            while self._fila and self._em_execucao < self.max_simultaneas:
+                _, _, tarefa = heapq.heappop(self._fila)
+                tarefa.estado = ESTADO_EXECUTANDO
+                self._em_execucao += 1
+                threading.Thread(
+                    target=self._executar, args=(tarefa,), name=f"tarefa-{tarefa.id}", daemon=True
+                ).start()
+
+    def _executar(self, tarefa: TarefaAgendada) -> None:
+        try:
+            tarefa._executar()
+        finally:
+            with self._trava:
+                self._em_execucao -= 1
+            self._despachar()
+
+    def _aparar_historico(self) -> None:
+        terminadas = [tarefa for tarefa in self._tarefas if not tarefa.ativa]
+        excesso = len(terminadas) - HISTORICO_TAREFAS
+        if excesso > 0:
+            descartar = set(map(id, terminadas[:excesso]))
+            self._tarefas = [tarefa for tarefa in self._tarefas if id(tarefa) not in descartar]
+
+
+_agendador: AgendadorTarefas | None = None
+_trava_agendador = threading.Lock()
+
+
+def agendador_padrao() -> AgendadorTarefas:
+    """O agendador do app, compartilhado por todas as ferramentas (criado no primeiro uso)."""
+    global _agendador
+    with _trava_agendador:
+        if _agendador is None:
+            _agendador = AgendadorTarefas()
+        return _agendador
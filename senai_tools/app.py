@@ -1,22 +1,45 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from importlib import import_module
 from pathlib import Path
 import tkinter as tk
-from tkinter import ttk
-from typing import Callable
+from tkinter import messagebox, ttk
+from typing import Callable, Union
 
 from senai_tools import __app_name__
+from senai_tools.agendador import agendador_padrao
+from senai_tools.painel_tarefas import PainelTarefas
+
+
+FrameFactory = Callable[[tk.Misc], tk.Widget]
+
+# Intervalo entre as verificações das tarefas canceladas ao fechar o app.
+INTERVALO_ENCERRAMENTO_MS = 200
 
 
 @dataclass(frozen=True)
 class ToolDefinition:
-    """Metadados mínimos para registrar uma ferramenta na aplicação."""
+    """
+    Metadados mínimos para registrar uma ferramenta na aplicação.
+
+    `frame_factory` pode ser o próprio construtor do frame ou um caminho
+    "pacote.modulo:Classe"; nesse caso o módulo só é importado quando a aba
+    da ferramenta é aberta pela primeira vez. Trabalhos longos das ferramentas
+    vão para o agendador compartilhado (`senai_tools.agendador.agendador_padrao`),
+    acompanhado na aba "Tarefas".
+    """
 
     id: str
     name: str
     description: str
-    frame_factory: Callable[[tk.Misc], tk.Widget]
+    frame_factory: Union[FrameFactory, str]
+
+    def resolve_frame_factory(self) -> FrameFactory:
+        if not isinstance(self.frame_factory, str):
+            return self.frame_factory
+        modulo, _, atributo = self.frame_factory.partition(":")
+        return getattr(import_module(modulo), atributo)
 
 
 class SENAIToolsApp(tk.Tk):
@@ -27,9 +50,12 @@ class SENAIToolsApp(tk.Tk):
         self.minsize(780, 520)
 
         self._tools = tools
+        self.agendador = agendador_padrao()
+        self._encerrando = False
         self._configure_style()
         self._set_icon(icon_path)
         self._montar_shell()
+        self.protocol("WM_DELETE_WINDOW", self._on_fechar)
 
     def _configure_style(self) -> None:
         style = ttk.Style(self)
@@ -93,25 +119,88 @@ class SENAIToolsApp(tk.Tk):
             self.notebook.add(vazio, text="Sem ferramentas")
             return
 
+        # Cada aba começa com um marcador leve; o frame real é criado na primeira seleção.
+        self._abas: list[ttk.Frame] = []
+        self._carregadas: set[int] = set()
         for tool in self._tools:
-            frame = tool.frame_factory(self.notebook)
-            frame.configure(style="Tool.TFrame")
-            self.notebook.add(frame, text=tool.name)
+            aba = ttk.Frame(self.notebook, style="Tool.TFrame")
+            ttk.Label(aba, text="Carregando...", style="SubTitle.TLabel").pack(expand=True, pady=40)
+            self.notebook.add(aba, text=tool.name)
+            self._abas.append(aba)
+        self.notebook.add(PainelTarefas(self.notebook, self.agendador), text="Tarefas")
 
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_change)
         self._atualizar_descricao()
+        # Deixa a janela ser desenhada antes de importar a primeira ferramenta.
+        self.after_idle(self._carregar_aba_atual)
 
     def _on_tab_change(self, event) -> None:
         self._atualizar_descricao()
+        self._carregar_aba_atual()
+
+    def _carregar_aba_atual(self) -> None:
+        try:
+            idx = self.notebook.index("current")
+        except tk.TclError:
+            return
+        if idx in self._carregadas or idx >= len(self._tools):
+            return
+        self._carregadas.add(idx)
+
+        aba = self._abas[idx]
+        for filho in aba.winfo_children():
+            filho.destroy()
+        try:
+            frame = self._tools[idx].resolve_frame_factory()(aba)
+        except Exception as e:
+            ttk.Label(
+                aba, text=f"Não foi possível carregar a ferramenta:\n{e}", style="SubTitle.TLabel"
+            ).pack(expand=True, pady=40)
+            return
+        frame.configure(style="Tool.TFrame")
+        frame.pack(fill="both", expand=True)
 
     def _atualizar_descricao(self) -> None:
         try:
             idx = self.notebook.index("current")
+            if idx == len(self._tools):
+                self.desc_label.config(text="Tarefas em segundo plano de todas as ferramentas.")
+                return
             tool = self._tools[idx]
             self.desc_label.config(text=tool.description)
         except Exception:
             self.desc_label.config(text="")
 
+    def _on_fechar(self) -> None:
+        if self._encerrando:
+            # Segundo pedido enquanto espera: sair já. As saídas são gravadas em
+            # temporário e trocadas no fim, então o arquivo anterior fica intacto.
+            if messagebox.askyesno(
+                "Aguardando tarefas",
+                "Ainda há tarefas terminando.\n\nSair sem esperar? A gravação em andamento será perdida.",
+                parent=self,
+            ):
+                self.destroy()
+            return
+        ativas = self.agendador.ativas()
+        if ativas and not messagebox.askyesno(
+            "Tarefas em andamento",
+            f"{len(ativas)} tarefa(s) ainda em andamento ou na fila.\n\nCancelar e sair?",
+            parent=self,
+        ):
+            return
+        self._encerrando = True
+        self.agendador.encerrar()
+        self.title(f"{__app_name__} - encerrando...")
+        self._aguardar_tarefas()
+
+    def _aguardar_tarefas(self) -> None:
+        """Fecha a janela só quando as tarefas canceladas terminarem (threads daemon morrem com o app)."""
+        if self.agendador.ativas():
+            self.after(INTERVALO_ENCERRAMENTO_MS, self._aguardar_tarefas)
+            return
+        self.destroy()
+
 
 def run_app(tools: list[ToolDefinition], icon_path: Path | str | None = None) -> None:
     """Instancia o Tk e executa o loop principal."""
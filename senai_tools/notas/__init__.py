@@ -0,0 +1 @@
+"""Atalho para o modo linha de comando do consolidador de notas (`python -m senai_tools.notas`)."""
@@ -0,0 +1,6 @@
+import sys
+
+from senai_tools.tools.notas.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+
+from senai_tools.agendador import AgendadorTarefas, TarefaAgendada
+
+# O painel só lê atributos das tarefas; não precisa acompanhar cada quadro.
+INTERVALO_PAINEL_MS = 500
+
+COLUNAS_PAINEL = (
+    ("ferramenta", "Ferramenta", 150),
+    ("estado", "Estado", 90),
+    ("progresso", "Progresso", 90),
+    ("mensagem", "Última mensagem", 320),
+)
+
+
+class PainelTarefas(ttk.Frame):
+    """
+    Aba "Tarefas" do app: lista as tarefas do agendador compartilhado (na
+    fila, em execução e as últimas terminadas) com estado, progresso e a última
+    mensagem de log, e permite cancelar a tarefa selecionada.
+    """
+
+    def __init__(self, master: tk.Misc, agendador: AgendadorTarefas):
+        super().__init__(master, padding=10)
+        self.agendador = agendador
+
+        ttk.Label(
+            self,
+            text=(
+                f"Até {agendador.max_simultaneas} tarefa(s) ao mesmo tempo, dividindo "
+                f"{agendador.max_processos} processo(s); as demais aguardam na fila."
+            ),
+            style="SubTitle.TLabel",
+        ).pack(anchor="w", pady=(0, 5))
+
+        quadro = ttk.Frame(self)
+        quadro.pack(fill="both", expand=True)
+        self.tabela = ttk.Treeview(quadro, columns=[nome for nome, _, _ in COLUNAS_PAINEL], selectmode="browse")
+        self.tabela.heading("#0", text="Tarefa")
+        self.tabela.column("#0", width=220, stretch=True)
+        for nome, titulo, largura in COLUNAS_PAINEL:
+            self.tabela.heading(nome, text=titulo)
+            self.tabela.column(nome, width=largura, stretch=nome == "mensagem")
+        rolagem = ttk.Scrollbar(quadro, orient="vertical", command=self.tabela.yview)
+        self.tabela.configure(yscrollcommand=rolagem.set)
+        self.tabela.pack(side="left", fill="both", expand=True)
+        rolagem.pack(side="right", fill="y")
+
+        botoes = ttk.Frame(self)
+        botoes.pack(fill="x", pady=(8, 0))
+        ttk.Button(botoes, text="Cancelar tarefa", command=self.cancelar_selecionada).pack(side="left")
+        ttk.Button(botoes, text="Limpar terminadas", command=self.limpar_terminadas).pack(side="left", padx=(5, 0))
+
+        self._atualizar()
+
+    def cancelar_selecionada(self) -> None:
+        tarefa = self._selecionada()
+        if tarefa is not None and tarefa.ativa:
+            tarefa.cancelar()
+            self._atualizar_tabela()
+
+    def limpar_terminadas(self) -> None:
+        self.agendador.limpar_terminadas()
+        self._atualizar_tabela()
+
+    def _selecionada(self) -> TarefaAgendada | None:
+        selecao = self.tabela.selection()
+        if not selecao:
+            return None
+        return next((tarefa for tarefa in self.agendador.tarefas() if str(tarefa.id) == selecao[0]), None)
+
+    def _atualizar(self) -> None:
+        self._atualizar_tabela()
+        self.after(INTERVALO_PAINEL_MS, self._atualizar)
+
+    def _atualizar_tabela(self) -> None:
+        tarefas = self.agendador.tarefas()
+        atuais = {str(tarefa.id) for tarefa in tarefas}
+        for iid in self.tabela.get_children():
+            if iid not in atuais:
+                self.tabela.delete(iid)
+        for tarefa in tarefas:
+            valores = (tarefa.ferramenta, tarefa.estado, _texto_progresso(tarefa), tarefa.ultima_mensagem)
+            iid = str(tarefa.id)
+            if self.tabela.exists(iid):
+                self.tabela.item(iid, values=valores)
+            else:
+                self.tabela.insert("", "end", iid=iid, text=tarefa.nome, values=valores)
+
+
+def _texto_progresso(tarefa: TarefaAgendada) -> str:
+    if tarefa.progresso is None:
+        return ""
+    atual, total = tarefa.progresso
+    return f"{atual}/{total}"
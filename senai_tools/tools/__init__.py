@@ -1,17 +1,23 @@
 from __future__ import annotations
 
-from senai_tools.app import ToolDefinition
-from senai_tools.tools.notas import NotasConsolidadorFrame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from senai_tools.app import ToolDefinition
 
 
 def get_tools() -> list[ToolDefinition]:
     """Lista de ferramentas disponiveis no aplicativo."""
+    # Importado aqui para que o pacote possa ser usado sem tkinter (linha de comando).
+    # Os frames são indicados por caminho e só são importados ao abrir a aba.
+    from senai_tools.app import ToolDefinition
+
     return [
         ToolDefinition(
             id="consolidador_notas",
             name="Consolidador de Notas",
             description="Consolida relatorios de notas e aplica formatacao de desempenho.",
-            frame_factory=NotasConsolidadorFrame,
+            frame_factory="senai_tools.tools.notas.ui:NotasConsolidadorFrame",
         ),
     ]
 
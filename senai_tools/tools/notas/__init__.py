@@ -1,9 +1,43 @@
-from .ui import NotasConsolidadorFrame
-from .processor import extrair_nome_uc, formatar_worksheet, processar_arquivos
+from .destinos import Destino, DestinoColunar, DestinoMemoria, DestinoXlsx, alimentar_destinos
+from .entradas import extrair_nome_uc
+from .formatacao import formatar_worksheet
+from .ingestao import (
+    LeitorRelatorios,
+    ProcessamentoCancelado,
+    RelatorioLido,
+    concatenar_relatorios,
+    ler_notas,
+    montar_df_final,
+    para_planilha,
+    tipos_concatenados,
+)
+from .processor import processar_arquivos
 
 __all__ = [
+    "Destino",
+    "DestinoColunar",
+    "DestinoMemoria",
+    "DestinoXlsx",
+    "LeitorRelatorios",
     "NotasConsolidadorFrame",
+    "ProcessamentoCancelado",
+    "RelatorioLido",
+    "alimentar_destinos",
+    "concatenar_relatorios",
     "extrair_nome_uc",
     "formatar_worksheet",
+    "ler_notas",
+    "montar_df_final",
+    "para_planilha",
     "processar_arquivos",
+    "tipos_concatenados",
 ]
+
+
+def __getattr__(nome: str):
+    # A interface (tkinter) só é importada quando pedida, para o modo linha de comando.
+    if nome == "NotasConsolidadorFrame":
+        from .ui import NotasConsolidadorFrame
+
+        return NotasConsolidadorFrame
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+from typing import IO, Callable, Sequence
+
+from .entradas import abrir_entrada, tamanho_entrada
+
+ARQUIVOS_ANTECIPADOS_PADRAO = 4
+LIMITE_ANTECIPACAO_PADRAO_MB = 64
+
+AbrirEntrada = Callable[[str], IO[bytes]]
+
+
+class LeituraAntecipada:
+    """
+    Lê em threads, antes de serem pedidos, os bytes dos próximos arquivos da
+    lista (na ordem), para que a espera pelo disco ou pela rede (SMB/NFS) de um
+    relatório aconteça enquanto o anterior é interpretado.
+
+    Ficam no máximo `arquivos` leituras em andamento ou prontas à espera de
+    `obter`, somando no máximo `limite_mb` pelo tamanho informado pelo sistema
+    de arquivos; um arquivo maior que o limite só é lido quando não há outro
+    na frente. `obter` deve seguir a ordem da lista: leituras de arquivos
+    pulados são descartadas e um caminho fora da fila é lido na hora.
+
+    `abrir` troca a forma de abrir os arquivos (por padrão `abrir_entrada`,
+    que também entende membros de .zip), ex.: para simular latência de rede.
+    """
+
+    def __init__(
+        self,
+        caminhos: Sequence[str],
+        arquivos: int = ARQUIVOS_ANTECIPADOS_PADRAO,
+        limite_mb: int = LIMITE_ANTECIPACAO_PADRAO_MB,
+        abrir: AbrirEntrada = abrir_entrada,
+    ):
+        if arquivos < 1 or limite_mb < 1:
+            raise ValueError("A leitura antecipada exige ao menos 1 arquivo e 1 MB.")
+        self.arquivos = arquivos
+        self.limite_bytes = limite_mb * 1024 * 1024
+        self._abrir = abrir
+        self._fila: deque[str] = deque(map(str, caminhos))
+        self._leituras: deque[tuple[str, Future[bytes], int]] = deque()
+        self._reservado = 0
+        self._trava = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=arquivos, thread_name_prefix="leitura-antecipada")
+        self._agendar()
+
+    def __enter__(self) -> LeituraAntecipada:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.fechar()
+
+    def obter(self, caminho: str) -> bytes:
+        """Bytes do arquivo; espera a leitura antecipada terminar, se ainda estiver em andamento."""
+        caminho = str(caminho)
+        leitura = None
+        with self._trava:
+            if any(agendado == caminho for agendado, _, _ in self._leituras):
+                # Arquivos pulados pelo chamador (antes deste na fila) são descartados.
+                while leitura is None:
+                    agendado, futuro, tamanho = self._leituras.popleft()
+                    if agendado == caminho:
+                        leitura = futuro
+                    else:
+                        futuro.cancel()
+                        self._reservado -= tamanho
+            else:
+                try:
+                    self._fila.remove(caminho)
+                except ValueError:
+                    pass
+        if leitura is None:
+            return self._ler(caminho)
+
+        try:
+            return leitura.result()
+        finally:
+            with self._trava:
+                self._reservado -= tamanho
+            self._agendar()
+
+    def fechar(self) -> None:
+        """Cancela as leituras que ainda não começaram e descarta as prontas."""
+        with self._trava:
+            self._fila.clear()
+            for _, futuro, _ in self._leituras:
+                futuro.cancel()
+            self._leituras.clear()
+            self._reservado = 0
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _agendar(self) -> None:
+        with self._trava:
+            while self._fila and len(self._leituras) < self.arquivos:
+                caminho = self._fila[0]
+                try:
+                    tamanho = tamanho_entrada(caminho)
+                except OSError:
+                    # Arquivo inacessível: a leitura levanta o erro na hora de `obter`.
+                    tamanho = 0
+                if self._leituras and self._reservado + tamanho > self.limite_bytes:
+                    break
+                self._fila.popleft()
+                self._leituras.append((caminho, self._executor.submit(self._ler, caminho), tamanho))
+                self._reservado += tamanho
+
+    def _ler(self, caminho: str) -> bytes:
+        with self._abrir(caminho) as f:
+            return f.read()
+
+
+def abrir_com_latencia(
+    latencia_s: float,
+    mb_por_s: float | None = None,
+    abrir: AbrirEntrada = abrir_entrada,
+) -> AbrirEntrada:
+    """
+    Versão de `abrir_entrada` que simula um compartilhamento de rede lento:
+    `latencia_s` de espera ao abrir e a cada leitura e, com `mb_por_s`, a
+    taxa máxima de transferência. Para testes e benchmarks locais.
+    """
+
+    def abrir_lento(caminho: str) -> IO[bytes]:
+        _esperar(latencia_s)
+        return _ArquivoLento(abrir(caminho), latencia_s, mb_por_s)
+
+    return abrir_lento
+
+
+class _ArquivoLento:
+    def __init__(self, arquivo: IO[bytes], latencia_s: float, mb_por_s: float | None):
+        self._arquivo = arquivo
+        self._latencia_s = latencia_s
+        self._bytes_por_s = mb_por_s * 1024 * 1024 if mb_por_s else None
+
+    def __enter__(self) -> _ArquivoLento:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._arquivo.close()
+
+    def read(self, tamanho: int = -1) -> bytes:
+        dados = self._arquivo.read(tamanho)
+        _esperar(self._latencia_s + (len(dados) / self._bytes_por_s if self._bytes_por_s else 0.0))
+        return dados
+
+    def close(self) -> None:
+        self._arquivo.close()
+
+
+def _esperar(segundos: float) -> None:
+    # time.sleep libera o GIL, como a espera de uma leitura de rede de verdade.
+    if segundos > 0:
+        time.sleep(segundos)
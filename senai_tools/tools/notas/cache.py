@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+
+import pandas as pd
+
+from .compacto import juntar_total, separar_total
+from .entradas import abrir_entrada
+from .exportacao import COL_TOTAL, COL_TOTAL_TEXTO
+from .leitor import VERSAO_LEITOR
+
+LIMITE_CACHE_PADRAO_MB = 512
+
+_EXTENSAO = ".feather"
+_TAMANHO_BLOCO = 1024 * 1024
+
+
+def pasta_cache_padrao() -> Path:
+    """Pasta de cache do usuário (LOCALAPPDATA no Windows, ~/.cache nos demais)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    return Path(base or Path.home() / ".cache") / "senai_tools" / "notas"
+
+
+class CacheRelatorios:
+    """
+    Cache em disco dos relatórios já lidos.
+
+    A chave é o hash do conteúdo do arquivo mais a versão do leitor, então
+    renomear um relatório não invalida o cache e alterar o leitor invalida tudo.
+    Os dados ficam em Feather (Arrow IPC compactado). Quando a pasta passa do
+    limite, os itens usados há mais tempo são removidos (a data de modificação
+    é atualizada a cada acerto).
+    """
+
+    def __init__(self, diretorio: str | Path, limite_mb: int = LIMITE_CACHE_PADRAO_MB):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = limite_mb * 1024 * 1024
+        self.acertos = 0
+        self.falhas = 0
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def chave(self, caminho: str | Path, conteudo: bytes | None = None) -> str:
+        """Chave do relatório; com `conteudo` (bytes já lidos) o arquivo não é aberto de novo."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"leitor-v{VERSAO_LEITOR}\0".encode())
+        if conteudo is not None:
+            h.update(conteudo)
+            return h.hexdigest()
+        with abrir_entrada(caminho) as f:
+            while bloco := f.read(_TAMANHO_BLOCO):
+                h.update(bloco)
+        return h.hexdigest()
+
+    def obter(self, chave: str) -> pd.DataFrame | None:
+        arquivo = self._caminho(chave)
+        try:
+            df = pd.read_feather(arquivo)
+        except FileNotFoundError:
+            self.falhas += 1
+            return None
+        except Exception:
+            # Entrada corrompida (ex.: gravação interrompida): descarta e relê o relatório.
+            arquivo.unlink(missing_ok=True)
+            self.falhas += 1
+            return None
+
+        os.utime(arquivo)
+        self.acertos += 1
+        return _restaurar_total(df)
+
+    def guardar(self, chave: str, df: pd.DataFrame) -> None:
+        destino = self._caminho(chave)
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        os.close(fd)
+        try:
+            _separar_total(df).reset_index(drop=True).to_feather(temporario, compression="zstd")
+            os.replace(temporario, destino)
+        finally:
+            Path(temporario).unlink(missing_ok=True)
+
+    def aplicar_limite(self) -> int:
+        """Remove as entradas menos usadas até caber no limite. Retorna quantas saíram."""
+        entradas = []
+        total = 0
+        for arquivo in self.diretorio.glob(f"*{_EXTENSAO}"):
+            try:
+                info = arquivo.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, arquivo))
+            total += info.st_size
+
+        removidas = 0
+        for _, tamanho, arquivo in sorted(entradas, key=lambda e: e[0]):
+            if total <= self.limite_bytes:
+                break
+            arquivo.unlink(missing_ok=True)
+            total -= tamanho
+            removidas += 1
+        return removidas
+
+    def resumo(self) -> str:
+        consultas = self.acertos + self.falhas
+        taxa = (self.acertos / consultas * 100) if consultas else 0.0
+        return f"Cache: {self.acertos} acerto(s), {self.falhas} falha(s) ({taxa:.0f}% de acerto)."
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}{_EXTENSAO}"
+
+
+def _separar_total(df: pd.DataFrame) -> pd.DataFrame:
+    # Arrow não grava colunas com tipos mistos (ex.: notas e "-"): guarda nota
+    # e marcador separados, como na leitura (`separar_total`).
+    numeros, texto = separar_total(df[COL_TOTAL])
+    return df.assign(**{COL_TOTAL: numeros, COL_TOTAL_TEXTO: texto})
+
+
+def _restaurar_total(df: pd.DataFrame) -> pd.DataFrame:
+    if COL_TOTAL_TEXTO not in df.columns:
+        return df
+    texto = df.pop(COL_TOTAL_TEXTO)
+    df[COL_TOTAL] = juntar_total(df[COL_TOTAL], texto)
+    return df
@@ -0,0 +1,289 @@
+"""
+Modo linha de comando do consolidador de notas.
+
+Não importa tkinter: pode rodar em servidores sem interface gráfica (cron).
+Uso: python -m senai_tools.notas PASTA_OU_GLOB... -o saida.xlsx [opções]
+     python -m senai_tools.notas PASTA -o saida.xlsx --monitorar [--espera 3]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Sequence
+
+from .antecipacao import LIMITE_ANTECIPACAO_PADRAO_MB
+from .cache import LIMITE_CACHE_PADRAO_MB, pasta_cache_padrao
+from .destinos import MOTORES_ESCRITA
+from .entradas import expandir_entradas
+from .exportacao import FORMATOS_COLUNARES
+from .ingestao import ProcessamentoCancelado
+from .monitor import ESPERA_PADRAO_S, INTERVALO_PADRAO_S, MonitorPasta
+from .processor import processar_arquivos
+from .validacao import RelatoriosInvalidos
+
+SAIDA_OK = 0
+SAIDA_ERRO = 1
+SAIDA_USO = 2
+SAIDA_SEM_ARQUIVOS = 3
+SAIDA_INTERROMPIDO = 130
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m senai_tools.notas",
+        description="Consolida relatórios de notas (.xlsx/.ods) em uma planilha formatada.",
+    )
+    parser.add_argument("entradas", nargs="+", help="arquivos, pastas ou padrões glob (ex.: 'notas/**/*.xlsx')")
+    parser.add_argument("-o", "--saida", required=True, help="caminho do arquivo .xlsx gerado")
+    parser.add_argument("--dividir-por-uc", action="store_true", help="uma aba por UC em vez da aba 'Consolidado'")
+    parser.add_argument(
+        "--manter-nome-original",
+        action="store_true",
+        help="usa o nome do arquivo como nome da aba (com --dividir-por-uc)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="processos de leitura em paralelo (0 = todos os núcleos; padrão: 1)",
+    )
+    parser.add_argument(
+        "--matriz",
+        action="store_true",
+        help="acrescenta a aba 'Alunos x UC' (uma linha por aluno, uma coluna por UC)",
+    )
+    parser.add_argument(
+        "--linhas-por-aba",
+        type=int,
+        metavar="N",
+        help="divide o consolidado em abas de até N linhas, mantendo a ordem e sem separar UCs que caibam numa aba",
+    )
+    parser.add_argument(
+        "--linhas-por-arquivo",
+        type=int,
+        metavar="N",
+        help="divide o consolidado em arquivos <saida>_parteNN.xlsx de até N linhas (gravados em paralelo com -j)",
+    )
+    parser.add_argument("--motor", choices=MOTORES_ESCRITA, default="openpyxl", help="motor de escrita do xlsx")
+    parser.add_argument(
+        "--exportar",
+        action="append",
+        choices=list(FORMATOS_COLUNARES),
+        default=[],
+        metavar="FORMATO",
+        help="grava também o consolidado em parquet, arrow ou csv ao lado da saída (pode repetir)",
+    )
+    parser.add_argument("--sem-xlsx", action="store_true", help="não gera a planilha, só as saídas de --exportar")
+    parser.add_argument(
+        "--sem-validacao",
+        action="store_true",
+        help="não confere os cabeçalhos de todos os relatórios antes da leitura",
+    )
+    parser.add_argument(
+        "--ignorar-invalidos",
+        action="store_true",
+        help="pula relatórios com problema no cabeçalho em vez de interromper",
+    )
+    parser.add_argument(
+        "--sem-diario",
+        action="store_true",
+        help="não mantém o diário que permite retomar uma execução interrompida",
+    )
+    parser.add_argument(
+        "--recomecar",
+        action="store_true",
+        help="ignora o diário de uma execução interrompida e lê tudo de novo",
+    )
+    parser.add_argument(
+        "--antecipar",
+        type=int,
+        default=0,
+        metavar="N",
+        help="lê em segundo plano os bytes dos N próximos relatórios (entradas em rede lenta; padrão: 0)",
+    )
+    parser.add_argument(
+        "--limite-antecipacao-mb",
+        type=int,
+        default=LIMITE_ANTECIPACAO_PADRAO_MB,
+        help=f"memória máxima dos relatórios lidos antecipadamente (padrão: {LIMITE_ANTECIPACAO_PADRAO_MB})",
+    )
+    parser.add_argument("--cache-dir", help=f"pasta do cache de relatórios (padrão: {pasta_cache_padrao()})")
+    parser.add_argument("--sem-cache", action="store_true", help="não usa o cache de relatórios")
+    parser.add_argument("--cache-limite-mb", type=int, default=LIMITE_CACHE_PADRAO_MB)
+    parser.add_argument("--resumo-json", metavar="ARQUIVO", help="grava um resumo em JSON ('-' para a saída padrão)")
+    parser.add_argument(
+        "--monitorar",
+        action="store_true",
+        help="acompanha a pasta e atualiza só as partes afetadas da saída a cada mudança (Ctrl+C encerra)",
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=INTERVALO_PADRAO_S,
+        help=f"segundos entre varreduras da pasta (com --monitorar; padrão: {INTERVALO_PADRAO_S:g})",
+    )
+    parser.add_argument(
+        "--espera",
+        type=float,
+        default=ESPERA_PADRAO_S,
+        help=f"segundos sem novas mudanças antes de atualizar (com --monitorar; padrão: {ESPERA_PADRAO_S:g})",
+    )
+    parser.add_argument(
+        "--perfil",
+        action="store_true",
+        help="grava ao lado da saída um perfil da execução (.prof, pilhas para flamegraph e resumo)",
+    )
+    parser.add_argument("-q", "--silencioso", action="store_true", help="não mostra o log de execução")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    if args.workers < 0:
+        parser.error("--workers não pode ser negativo.")
+    if args.antecipar < 0 or args.limite_antecipacao_mb < 1:
+        parser.error("--antecipar não pode ser negativo e --limite-antecipacao-mb deve ser positivo.")
+    if not args.saida.lower().endswith(".xlsx"):
+        parser.error("A saída deve ter extensão .xlsx.")
+    if args.sem_xlsx and not args.exportar:
+        parser.error("--sem-xlsx exige ao menos um --exportar.")
+    if args.sem_xlsx and args.matriz:
+        parser.error("--matriz é gravada na planilha; não combina com --sem-xlsx.")
+    if (args.linhas_por_aba is not None and args.linhas_por_aba < 1) or (
+        args.linhas_por_arquivo is not None and args.linhas_por_arquivo < 1
+    ):
+        parser.error("--linhas-por-aba e --linhas-por-arquivo devem ser positivos.")
+    if args.dividir_por_uc and (args.linhas_por_aba or args.linhas_por_arquivo):
+        parser.error("--linhas-por-aba/--linhas-por-arquivo não combinam com --dividir-por-uc.")
+    if args.ignorar_invalidos and args.sem_validacao:
+        parser.error("--ignorar-invalidos não combina com --sem-validacao.")
+
+    def log(mensagem: str) -> None:
+        if not args.silencioso:
+            print(mensagem, file=sys.stderr, flush=True)
+
+    if args.monitorar:
+        if len(args.entradas) != 1 or not Path(args.entradas[0]).is_dir():
+            parser.error("--monitorar exige uma única pasta de entrada.")
+        if args.intervalo <= 0 or args.espera < 0:
+            parser.error("--intervalo deve ser positivo e --espera não pode ser negativo.")
+        # O monitor grava só o xlsx padrão e reprocessa por conta própria; em
+        # vez de ignorar estas opções em silêncio, recusa a combinação.
+        ignoradas = {
+            "--matriz": args.matriz,
+            "--motor": args.motor != "openpyxl",
+            "--exportar": args.exportar,
+            "--sem-xlsx": args.sem_xlsx,
+            "--linhas-por-aba": args.linhas_por_aba is not None,
+            "--linhas-por-arquivo": args.linhas_por_arquivo is not None,
+            "--perfil": args.perfil,
+            "--antecipar": args.antecipar,
+            "--sem-validacao": args.sem_validacao,
+            "--ignorar-invalidos": args.ignorar_invalidos,
+            "--sem-diario": args.sem_diario,
+            "--recomecar": args.recomecar,
+            "--resumo-json": args.resumo_json,
+        }
+        usadas = [opcao for opcao, usada in ignoradas.items() if usada]
+        if usadas:
+            parser.error(f"{', '.join(usadas)} não combina(m) com --monitorar.")
+        monitor = MonitorPasta(
+            args.entradas[0],
+            args.saida,
+            dividir_por_uc=args.dividir_por_uc,
+            manter_nome_original=args.manter_nome_original,
+            intervalo_s=args.intervalo,
+            espera_s=args.espera,
+            max_workers=args.workers or None,
+            cache_dir=None if args.sem_cache else (args.cache_dir or pasta_cache_padrao()),
+            cache_limite_mb=args.cache_limite_mb,
+            log_callback=log,
+        )
+        try:
+            monitor.executar()
+        except KeyboardInterrupt:
+            log("Monitoramento encerrado.")
+        return SAIDA_OK
+
+    resumo: dict[str, object] = {"saida": args.saida, "entradas": args.entradas}
+    arquivos = expandir_entradas(args.entradas)
+    resumo["arquivos"] = len(arquivos)
+
+    inicio = time.perf_counter()
+    if not arquivos:
+        log("Nenhum relatório encontrado nas entradas informadas.")
+        codigo = SAIDA_SEM_ARQUIVOS
+        resumo.update(status="sem_arquivos")
+    else:
+        try:
+            resultado = processar_arquivos(
+                arquivos,
+                args.saida,
+                dividir_por_uc=args.dividir_por_uc,
+                manter_nome_original=args.manter_nome_original,
+                log_callback=log,
+                max_workers=args.workers or None,
+                cache_dir=None if args.sem_cache else (args.cache_dir or pasta_cache_padrao()),
+                cache_limite_mb=args.cache_limite_mb,
+                motor_escrita=args.motor,
+                formatos_colunares=args.exportar,
+                gravar_xlsx=not args.sem_xlsx,
+                matriz_alunos=args.matriz,
+                validar_antes=not args.sem_validacao,
+                ignorar_invalidos=args.ignorar_invalidos,
+                usar_diario=not args.sem_diario,
+                retomar=not args.recomecar,
+                leitura_antecipada=args.antecipar,
+                limite_antecipacao_mb=args.limite_antecipacao_mb,
+                linhas_por_aba=args.linhas_por_aba,
+                linhas_por_arquivo=args.linhas_por_arquivo,
+                perfil=args.perfil,
+            )
+        except (KeyboardInterrupt, ProcessamentoCancelado):
+            log("Processamento interrompido.")
+            codigo = SAIDA_INTERROMPIDO
+            resumo.update(status="interrompido")
+        except RelatoriosInvalidos as e:
+            log(f"Erro: {e}")
+            codigo = SAIDA_ERRO
+            resumo.update(
+                status="erro",
+                erro=str(e),
+                tipo_erro=type(e).__name__,
+                problemas=[
+                    {"arquivo": problema.caminho, "tipo": problema.tipo, "mensagem": problema.mensagem}
+                    for problema in e.problemas
+                ],
+            )
+        except Exception as e:
+            log(f"Erro: {e}")
+            codigo = SAIDA_ERRO
+            resumo.update(status="erro", erro=str(e), tipo_erro=type(e).__name__)
+        else:
+            codigo = SAIDA_OK
+            resumo.update(
+                status="ok",
+                linhas=resultado.linhas,
+                abas=resultado.abas,
+                arquivos_ignorados=resultado.arquivos_ignorados,
+                saidas_colunares=resultado.saidas_colunares,
+                partes=resultado.partes,
+                arquivos_perfil=resultado.arquivos_perfil,
+            )
+    resumo["duracao_s"] = round(time.perf_counter() - inicio, 3)
+    resumo["codigo_saida"] = codigo
+
+    if args.resumo_json:
+        texto = json.dumps(resumo, ensure_ascii=False, indent=2)
+        if args.resumo_json == "-":
+            print(texto)
+        else:
+            Path(args.resumo_json).write_text(texto + "\n", encoding="utf-8")
+
+    return codigo
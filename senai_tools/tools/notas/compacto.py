@@ -0,0 +1,66 @@
+"""
+Tipos compactos das linhas dos relatórios, compartilhados pela leitura
+(`ingestao`) e pelo cache: 'Total do Curso' separado em nota e marcador de
+texto, e categorias que relatórios iguais dividem.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def separar_total(total: pd.Series) -> tuple[np.ndarray, pd.Categorical]:
+    """
+    Separa 'Total do Curso' em notas (numéricas, NaN onde havia texto) e
+    marcadores de texto ("-"), categóricos. `juntar_total` desfaz.
+    """
+    # Uma coluna que mistura notas e "-" fica em object: um objeto Python por
+    # linha. Separadas, a nota ocupa 8 bytes e o marcador 1 byte (código da
+    # categoria). float32 não entra aqui: não representa notas com duas casas
+    # exatamente (85.37 viraria 85.37000274658203 na planilha).
+    if pd.api.types.is_numeric_dtype(total):
+        return total.to_numpy(), _sem_texto(len(total))
+
+    valores = total.to_numpy(dtype=object)
+    eh_texto = np.fromiter((isinstance(v, str) for v in valores), dtype=bool, count=len(valores))
+    numeros = np.where(eh_texto, np.nan, valores).astype("float64")
+    if not eh_texto.any():
+        return numeros, _sem_texto(len(valores))
+
+    codigos_texto, categorias = pd.factorize(valores[eh_texto])
+    codigos = np.full(len(valores), -1, dtype=np.int8 if len(categorias) < 127 else np.int32)
+    codigos[eh_texto] = codigos_texto
+    return numeros, pd.Categorical.from_codes(codigos, dtype=tipo_categorico(tuple(categorias)))
+
+
+def juntar_total(numeros: pd.Series, texto: pd.Series) -> pd.Series:
+    """
+    'Total do Curso' com os mesmos valores que o leitor entrega: sem
+    marcadores, as notas como estão; com marcadores, uma coluna object em que
+    notas inteiras voltam a ser int.
+    """
+    if not texto.notna().any():
+        return numeros
+    valores = [
+        t if isinstance(t, str) else (int(n) if n == n and float(n).is_integer() else n)
+        for n, t in zip(numeros.tolist(), texto.astype(object).tolist())
+    ]
+    return pd.Series(valores, index=numeros.index, dtype=object, name=numeros.name)
+
+
+def _sem_texto(linhas: int) -> pd.Categorical:
+    return pd.Categorical.from_codes(np.full(linhas, -1, dtype=np.int8), dtype=tipo_categorico(()))
+
+
+@lru_cache(maxsize=4096)
+def tipo_categorico(categorias: tuple[str, ...]) -> pd.CategoricalDtype:
+    """
+    Tipo categórico compartilhado: relatórios da mesma UC (ou com os mesmos
+    marcadores) usam o mesmo tipo em vez de cada um carregar seu próprio
+    índice de categorias.
+    """
+    # Categorias sempre em object, para que union_categoricals aceite juntar
+    # relatórios com e sem marcadores.
+    return pd.CategoricalDtype(pd.Index(list(categorias), dtype=object))
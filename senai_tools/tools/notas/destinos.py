@@ -0,0 +1,577 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+import os
+from pathlib import Path
+import pickle
+import tempfile
+import time
+from typing import Callable, Iterable, Iterator, Protocol, Sequence
+
+import pandas as pd
+
+from .escrita import EscritorXlsxStreaming, gravar_substituindo
+from .execucao import usar_pool
+from .exportacao import FORMATOS_COLUNARES, EscritorColunar, caminho_saida_colunar, tabela_colunar
+from .formatacao import adicionar_regras_notas, calcular_larguras, formatar_worksheet
+from .ingestao import RelatorioLido, concatenar_relatorios, para_planilha, tipos_concatenados
+from .matriz import ABA_MATRIZ, MatrizAlunos, montar_matriz
+from .metricas import (
+    ETAPA_CONCAT,
+    ETAPA_ESCRITA,
+    ETAPA_EXPORTACAO,
+    ETAPA_FORMATACAO,
+    ETAPA_MATRIZ,
+    MetricaEtapa,
+    MetricsCallback,
+    medir_etapa,
+)
+from .particao import (
+    ABA_INDICE,
+    LINHAS_DADOS_XLSX,
+    ArquivoParticao,
+    AbaGravacao,
+    gravar_arquivo_particao,
+    partes_obsoletas,
+    planejar_particao,
+    tabela_indice,
+)
+
+MOTORES_ESCRITA = ("openpyxl", "streaming")
+
+
+class Destino(Protocol):
+    """
+    Saída alimentada por `LeitorRelatorios`. `receber` é chamado uma vez por
+    relatório, na ordem de entrada; `finalizar` grava o que falta depois do
+    último; `descartar` apaga o que ficou pela metade quando a leitura falha
+    ou é cancelada. `para_planilha` e `concatenar_relatorios` (em `ingestao`)
+    convertem e juntam os relatórios recebidos mantendo os tipos compactos.
+    """
+
+    def receber(self, relatorio: RelatorioLido) -> None: ...
+
+    def finalizar(self) -> None: ...
+
+    def descartar(self) -> None: ...
+
+
+def alimentar_destinos(relatorios: Iterable[RelatorioLido], destinos: Sequence[Destino]) -> int:
+    """
+    Entrega cada relatório a todos os destinos e depois finaliza cada um, na
+    ordem da lista. Retorna o total de linhas. Qualquer erro (inclusive
+    ProcessamentoCancelado) descarta os destinos antes de ser propagado.
+    """
+    linhas = 0
+    try:
+        for relatorio in relatorios:
+            for destino in destinos:
+                destino.receber(relatorio)
+            linhas += len(relatorio.df_final)
+        if not linhas:
+            raise ValueError("Nenhuma linha gerada.")
+        for destino in destinos:
+            destino.finalizar()
+    except BaseException:
+        for destino in destinos:
+            destino.descartar()
+        raise
+    return linhas
+
+
+class DestinoMemoria:
+    """Guarda os relatórios recebidos, para quem quer o consolidado em memória."""
+
+    def __init__(self) -> None:
+        self.relatorios: list[RelatorioLido] = []
+
+    def receber(self, relatorio: RelatorioLido) -> None:
+        self.relatorios.append(relatorio)
+
+    def finalizar(self) -> None:
+        pass
+
+    def descartar(self) -> None:
+        self.relatorios = []
+
+    def consolidado(self) -> pd.DataFrame:
+        """Todas as linhas numa tabela só, com os tipos compactos."""
+        if not self.relatorios:
+            raise ValueError("Nenhuma linha gerada.")
+        return concatenar_relatorios([relatorio.df_final for relatorio in self.relatorios])
+
+
+class DestinoColunar:
+    """
+    Saídas colunares ao lado da planilha ("parquet", "arrow", "csv"), gravadas
+    à medida que os relatórios chegam (ver `EscritorColunar`): nenhum
+    relatório fica guardado e o resultado é uma tabela única com todas as
+    linhas, como `tabela_colunar` do consolidado.
+    """
+
+    def __init__(
+        self,
+        arquivo_saida: str | Path,
+        formatos: Sequence[str],
+        *,
+        log_callback: Callable[[str], None] | None = None,
+        metrics_callback: MetricsCallback | None = None,
+    ):
+        formatos_invalidos = [f for f in formatos if f not in FORMATOS_COLUNARES]
+        if formatos_invalidos:
+            raise ValueError(f"Formato de saída inválido: {', '.join(formatos_invalidos)}")
+        self.arquivo_saida = arquivo_saida
+        self.formatos = list(dict.fromkeys(formatos))
+        self.log_callback = log_callback
+        self.metrics_callback = metrics_callback
+        self.arquivos: list[str] = []
+        self._escritores: list[EscritorColunar] = []
+        self._duracao_s = 0.0
+
+    def receber(self, relatorio: RelatorioLido) -> None:
+        inicio = time.perf_counter()
+        if not self._escritores:
+            self._escritores = [
+                EscritorColunar(caminho_saida_colunar(self.arquivo_saida, formato), formato)
+                for formato in self.formatos
+            ]
+        tabela = tabela_colunar(relatorio.df_final)
+        for escritor in self._escritores:
+            escritor.escrever(tabela)
+        self._duracao_s += time.perf_counter() - inicio
+
+    def finalizar(self) -> None:
+        inicio = time.perf_counter()
+        for escritor in self._escritores:
+            destino = escritor.fechar()
+            self.arquivos.append(str(destino))
+            if self.log_callback:
+                self.log_callback(f"Arquivo gerado: {destino}")
+        self._escritores = []
+        if self.metrics_callback:
+            self.metrics_callback(MetricaEtapa(ETAPA_EXPORTACAO, self._duracao_s + time.perf_counter() - inicio))
+
+    def descartar(self) -> None:
+        for escritor in self._escritores:
+            escritor.descartar()
+        self._escritores = []
+
+
+class DestinoXlsx:
+    """
+    Planilha consolidada (ver `processar_arquivos` para as opções).
+
+    Com o motor "streaming" e uma aba por UC, cada relatório vira uma aba
+    assim que chega e é liberado em seguida. No 'Consolidado' do mesmo motor
+    as larguras e os tipos das colunas dependem de todas as linhas, então os
+    relatórios esperam num arquivo temporário ao lado da saída (ver
+    `RelatoriosEmDisco`) e são relidos um por vez em `finalizar`. Nos demais
+    modos (motor openpyxl, divisão em abas/arquivos, matriz Aluno x UC) os
+    relatórios ficam guardados em memória, com os tipos compactos, até
+    `finalizar`.
+    """
+
+    def __init__(
+        self,
+        arquivo_saida: str | Path,
+        *,
+        dividir_por_uc: bool = False,
+        manter_nome_original: bool = False,
+        motor_escrita: str = "openpyxl",
+        matriz_alunos: bool = False,
+        linhas_por_aba: int | None = None,
+        linhas_por_arquivo: int | None = None,
+        max_workers: int | None = 1,
+        log_callback: Callable[[str], None] | None = None,
+        metrics_callback: MetricsCallback | None = None,
+        executor: Executor | None = None,
+    ):
+        if motor_escrita not in MOTORES_ESCRITA:
+            raise ValueError(f"Motor de escrita inválido: {motor_escrita}")
+
+        if (linhas_por_aba is not None and linhas_por_aba < 1) or (
+            linhas_por_arquivo is not None and linhas_por_arquivo < 1
+        ):
+            raise ValueError("Os limites de linhas por aba e por arquivo devem ser positivos.")
+
+        if dividir_por_uc and (linhas_por_aba or linhas_por_arquivo):
+            raise ValueError("A divisão por quantidade de linhas vale só para o consolidado (sem dividir por UC).")
+
+        self.arquivo_saida = str(arquivo_saida)
+        self.dividir_por_uc = dividir_por_uc
+        self.manter_nome_original = manter_nome_original
+        self.motor_escrita = motor_escrita
+        self.matriz_alunos = matriz_alunos
+        self.linhas_por_aba = linhas_por_aba
+        self.linhas_por_arquivo = linhas_por_arquivo
+        self.max_workers = max_workers
+        self.log_callback = log_callback
+        self.metrics_callback = metrics_callback
+        self.executor = executor
+        self.abas: list[str] = []
+        self.partes: list[str] = []
+        self._relatorios: list[pd.DataFrame] = []
+        self._em_disco: RelatoriosEmDisco | None = None
+        self._escritor: EscritorXlsxStreaming | None = None
+        self._nomes_usados: dict[str, int] = {}
+        self._escrita_s = 0.0
+
+    @property
+    def _aba_por_relatorio(self) -> bool:
+        return self.motor_escrita == "streaming" and self.dividir_por_uc
+
+    @property
+    def _consolidado_em_disco(self) -> bool:
+        return (
+            self.motor_escrita == "streaming"
+            and not self.dividir_por_uc
+            and not self.matriz_alunos
+            and not (self.linhas_por_aba or self.linhas_por_arquivo)
+        )
+
+    def receber(self, relatorio: RelatorioLido) -> None:
+        df_final = relatorio.df_final
+        if self._consolidado_em_disco:
+            if self._em_disco is None:
+                self._em_disco = RelatoriosEmDisco(Path(self.arquivo_saida).parent)
+            self._em_disco.guardar(df_final)
+            return
+        if self._aba_por_relatorio:
+            inicio = time.perf_counter()
+            if self._escritor is None:
+                self._escritor = EscritorXlsxStreaming(self.arquivo_saida)
+            sheet_name = _nome_aba(df_final, self.manter_nome_original, self._nomes_usados)
+            df_aba = para_planilha(df_final).drop(columns=["UC / Relatório"])
+            self._escritor.abrir_aba(sheet_name, list(df_aba.columns), calcular_larguras(df_aba))
+            self._escritor.escrever(df_aba)
+            self.abas.append(sheet_name)
+            self._escrita_s += time.perf_counter() - inicio
+            if not self.matriz_alunos:
+                return
+        self._relatorios.append(df_final)
+
+    def finalizar(self) -> None:
+        matriz = None
+        if self.matriz_alunos:
+            with medir_etapa(ETAPA_CONCAT, self.metrics_callback):
+                consolidado = concatenar_relatorios(self._relatorios)
+            with medir_etapa(ETAPA_MATRIZ, self.metrics_callback):
+                matriz = montar_matriz(consolidado)
+            del consolidado
+            if self.log_callback:
+                self.log_callback(f"Matriz Aluno x UC: {len(matriz.alunos)} alunos em {len(matriz.ucs)} UCs.")
+
+        if self._escritor is not None:
+            # Neste motor a formatação acontece junto da escrita; tudo conta como escrita.
+            inicio = time.perf_counter()
+            if matriz is not None:
+                _escrever_matriz_streaming(self._escritor, matriz, self.abas)
+            self._escritor.salvar()
+            self._escritor = None
+            if self.metrics_callback:
+                self.metrics_callback(MetricaEtapa(ETAPA_ESCRITA, self._escrita_s + time.perf_counter() - inicio))
+        else:
+            self._gravar(matriz)
+
+        if matriz is not None:
+            self.abas.append(_nome_aba_matriz(self.abas))
+        self._relatorios = []
+        self._fechar_em_disco()
+        if self.log_callback:
+            self.log_callback(f"Arquivo gerado: {self.arquivo_saida}")
+
+    def descartar(self) -> None:
+        # O write-only do openpyxl só cria o arquivo em `salvar`: basta soltar o escritor.
+        self._escritor = None
+        self._relatorios = []
+        self._fechar_em_disco()
+
+    def _fechar_em_disco(self) -> None:
+        if self._em_disco is not None:
+            self._em_disco.fechar()
+            self._em_disco = None
+
+    def _gravar(self, matriz: MatrizAlunos | None) -> None:
+        linhas_saida: Sequence[pd.DataFrame] | RelatoriosEmDisco = self._relatorios
+        if self._em_disco is not None:
+            linhas_saida = self._em_disco
+            tamanhos = self._em_disco.tamanhos
+        else:
+            tamanhos = [(str(df_final["UC / Relatório"].iloc[0]), len(df_final)) for df_final in linhas_saida]
+        total_linhas = sum(linhas for _, linhas in tamanhos)
+        plano: list[ArquivoParticao] | None = None
+        if not self.dividir_por_uc and (
+            self.linhas_por_aba or self.linhas_por_arquivo or total_linhas > LINHAS_DADOS_XLSX
+        ):
+            if self.log_callback and not (self.linhas_por_aba or self.linhas_por_arquivo):
+                self.log_callback(f"{total_linhas} linhas passam do limite de uma aba do Excel; o consolidado será dividido.")
+            plano = planejar_particao(tamanhos, self.arquivo_saida, self.linhas_por_aba, self.linhas_por_arquivo)
+
+        if plano is not None:
+            # A gravação das partes distribui os relatórios entre processos; os
+            # que esperavam em disco voltam para a memória.
+            linhas_saida = list(linhas_saida)
+            self.partes = _gravar_particionado(
+                linhas_saida,
+                self.arquivo_saida,
+                plano,
+                self.motor_escrita,
+                self.max_workers,
+                self.metrics_callback,
+                matriz,
+                self.log_callback,
+                self.executor,
+            )
+            self.abas = [ABA_INDICE]
+            if len(plano) == 1:
+                self.abas.extend(aba.nome for aba in plano[0].abas)
+        elif self.motor_escrita == "streaming":
+            _gravar_streaming(linhas_saida, self.arquivo_saida, self.metrics_callback, matriz)
+            self.abas = ["Consolidado"]
+        else:
+            _gravar_openpyxl(
+                linhas_saida,
+                self.arquivo_saida,
+                self.dividir_por_uc,
+                self.manter_nome_original,
+                self.metrics_callback,
+                matriz,
+            )
+            self.abas = (
+                list(nomes_abas(linhas_saida, self.manter_nome_original)) if self.dividir_por_uc else ["Consolidado"]
+            )
+
+
+def nomes_abas(linhas_saida: Sequence[pd.DataFrame], manter_nome_original: bool) -> Iterator[str]:
+    """Nome da aba de cada relatório no modo dividido por UC (até 31 caracteres, sem repetição)."""
+    usados: dict[str, int] = {}
+    for df_final in linhas_saida:
+        yield _nome_aba(df_final, manter_nome_original, usados)
+
+
+def _nome_aba(df_final: pd.DataFrame, manter_nome_original: bool, usados: dict[str, int]) -> str:
+    """Próximo nome de `nomes_abas`; `usados` conta os nomes já dados."""
+    nome_uc = df_final["UC / Relatório"].iloc[0]
+    base_name = (
+        Path(df_final.attrs.get("arquivo_origem", nome_uc)).stem
+        if manter_nome_original
+        else nome_uc
+    )
+
+    contador = usados.get(base_name, 0)
+    if contador == 0:
+        sheet_name = base_name[:31]
+    else:
+        sufixo = f"_{contador}"
+        sheet_name = f"{base_name[:31 - len(sufixo)]}{sufixo}"
+    usados[base_name] = contador + 1
+    return sheet_name
+
+
+def _nome_aba_matriz(abas: Sequence[str]) -> str:
+    """'Alunos x UC', com sufixo se alguma UC já usar esse nome."""
+    nome = ABA_MATRIZ
+    contador = 1
+    while nome in abas:
+        nome = f"{ABA_MATRIZ}_{contador}"
+        contador += 1
+    return nome
+
+
+def _gravar_openpyxl(
+    linhas_saida: Sequence[pd.DataFrame],
+    arquivo_saida: str,
+    dividir_por_uc: bool,
+    manter_nome_original: bool,
+    metrics_callback: MetricsCallback | None = None,
+    matriz: MatrizAlunos | None = None,
+) -> None:
+    with gravar_substituindo(arquivo_saida) as temporario, pd.ExcelWriter(temporario, engine="openpyxl") as writer:
+        if dividir_por_uc:
+            for df_final, sheet_name in zip(linhas_saida, nomes_abas(linhas_saida, manter_nome_original)):
+                df_aba = para_planilha(df_final).drop(columns=["UC / Relatório"])
+                with medir_etapa(ETAPA_ESCRITA, metrics_callback):
+                    df_aba.to_excel(writer, sheet_name=sheet_name, index=False)
+                ws = writer.sheets[sheet_name]
+                with medir_etapa(ETAPA_FORMATACAO, metrics_callback):
+                    formatar_worksheet(ws, df_aba)
+        else:
+            with medir_etapa(ETAPA_CONCAT, metrics_callback):
+                df_saida = concatenar_relatorios([para_planilha(df) for df in linhas_saida])
+            sheet_name = "Consolidado"
+            with medir_etapa(ETAPA_ESCRITA, metrics_callback):
+                df_saida.to_excel(writer, sheet_name=sheet_name, index=False)
+            ws = writer.sheets[sheet_name]
+            with medir_etapa(ETAPA_FORMATACAO, metrics_callback):
+                formatar_worksheet(ws, df_saida)
+        if matriz is not None:
+            sheet_name = _nome_aba_matriz(list(writer.sheets))
+            df_matriz = matriz.para_planilha()
+            with medir_etapa(ETAPA_ESCRITA, metrics_callback):
+                df_matriz.to_excel(writer, sheet_name=sheet_name, index=False)
+            ws = writer.sheets[sheet_name]
+            with medir_etapa(ETAPA_FORMATACAO, metrics_callback):
+                formatar_worksheet(ws, df_matriz)
+                adicionar_regras_notas(ws, _colunas_notas_matriz(matriz), ws.max_row)
+        # O xlsx é serializado ao fechar o writer; essa parte também conta como escrita.
+        inicio_gravacao = time.perf_counter()
+    if metrics_callback:
+        metrics_callback(MetricaEtapa(ETAPA_ESCRITA, time.perf_counter() - inicio_gravacao))
+
+
+def _gravar_streaming(
+    linhas_saida: Sequence[pd.DataFrame] | RelatoriosEmDisco,
+    arquivo_saida: str,
+    metrics_callback: MetricsCallback | None = None,
+    matriz: MatrizAlunos | None = None,
+) -> None:
+    """Aba 'Consolidado' no motor streaming (a divisão por UC é gravada por `DestinoXlsx.receber`)."""
+    # Neste motor a formatação acontece junto da escrita; tudo conta como escrita.
+    with medir_etapa(ETAPA_ESCRITA, metrics_callback), EscritorXlsxStreaming(arquivo_saida) as escritor:
+        # Sem concatenar: cada relatório recebe os tipos que o concat daria
+        # e a largura final é o máximo das larguras de cada um. As partes
+        # no formato da planilha são refeitas a cada passada (tipos, larguras,
+        # escrita) em vez de ficarem todas em memória.
+        tipos = tipos_concatenados([para_planilha(df).head(0) for df in linhas_saida])
+
+        def partes() -> Iterator[pd.DataFrame]:
+            for df_final in linhas_saida:
+                yield para_planilha(df_final).astype(tipos)
+
+        larguras = [max(col) for col in zip(*(calcular_larguras(df) for df in partes()))]
+        escritor.abrir_aba("Consolidado", list(tipos.index), larguras)
+        for df_final in partes():
+            escritor.escrever(df_final)
+        if matriz is not None:
+            _escrever_matriz_streaming(escritor, matriz, ["Consolidado"])
+
+
+class RelatoriosEmDisco:
+    """
+    Relatórios recebidos guardados em sequência (pickle, com os tipos
+    compactos e `attrs`) num arquivo temporário que some ao fechar. Cada
+    iteração relê o arquivo do começo, um relatório por vez; `tamanhos` tem a
+    UC e a quantidade de linhas de cada um, para planejar a divisão sem reler.
+    """
+
+    def __init__(self, pasta: str | Path):
+        self._arquivo = tempfile.TemporaryFile(dir=pasta, prefix=".~relatorios", suffix=".tmp")
+        self.tamanhos: list[tuple[str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.tamanhos)
+
+    def guardar(self, df_final: pd.DataFrame) -> None:
+        self._arquivo.seek(0, os.SEEK_END)
+        pickle.dump(df_final, self._arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tamanhos.append((str(df_final["UC / Relatório"].iloc[0]), len(df_final)))
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        # Uma iteração por vez: todas usam o mesmo arquivo.
+        self._arquivo.seek(0)
+        for _ in self.tamanhos:
+            yield pickle.load(self._arquivo)
+
+    def fechar(self) -> None:
+        self._arquivo.close()
+
+
+def _escrever_matriz_streaming(escritor: EscritorXlsxStreaming, matriz: MatrizAlunos, abas: Sequence[str]) -> None:
+    df_matriz = matriz.para_planilha()
+    escritor.abrir_aba(
+        _nome_aba_matriz(abas),
+        list(df_matriz.columns),
+        calcular_larguras(df_matriz),
+        colunas_notas=matriz.colunas_notas,
+    )
+    escritor.escrever(df_matriz)
+
+
+def _gravar_particionado(
+    linhas_saida: Sequence[pd.DataFrame],
+    arquivo_saida: str,
+    plano: Sequence[ArquivoParticao],
+    motor_escrita: str,
+    max_workers: int | None,
+    metrics_callback: MetricsCallback | None,
+    matriz: MatrizAlunos | None,
+    log_callback: Callable[[str], None] | None,
+    executor: Executor | None = None,
+) -> list[str]:
+    """
+    Grava o consolidado conforme `plano` (ver `planejar_particao`). Com um só
+    arquivo, tudo vai para `arquivo_saida`; com vários, cada parte é gravada em
+    um processo (do `executor` compartilhado, se houver) e `arquivo_saida` fica
+    com o índice (e a matriz). Retorna os caminhos das partes, vazio quando há
+    um só arquivo. Partes de uma execução anterior que não estão no plano
+    são apagadas, para que o diretório não misture gerações diferentes.
+    """
+
+    def abas_do(arquivo: ArquivoParticao) -> list[AbaGravacao]:
+        abas: list[AbaGravacao] = []
+        for aba in arquivo.abas:
+            trechos = [
+                para_planilha(linhas_saida[trecho.parte].iloc[trecho.inicio : trecho.fim]) for trecho in aba.trechos
+            ]
+            abas.append((aba.nome, concatenar_relatorios(trechos), None))
+        return abas
+
+    principais: list[AbaGravacao] = [(ABA_INDICE, tabela_indice(plano), ())]
+    extras: list[AbaGravacao] = []
+    if matriz is not None:
+        nomes = [ABA_INDICE, *(aba.nome for arquivo in plano for aba in arquivo.abas)]
+        extras.append((_nome_aba_matriz(nomes), matriz.para_planilha(), matriz.colunas_notas))
+
+    for caminho in partes_obsoletas(arquivo_saida, plano):
+        try:
+            caminho.unlink()
+        except OSError as e:
+            if log_callback:
+                log_callback(f"Aviso: parte de uma execução anterior não pôde ser apagada: {caminho} ({e})")
+        else:
+            if log_callback:
+                log_callback(f"Parte de uma execução anterior apagada: {caminho}")
+
+    with medir_etapa(ETAPA_ESCRITA, metrics_callback):
+        if len(plano) == 1:
+            gravar_arquivo_particao(arquivo_saida, [*principais, *abas_do(plano[0]), *extras], motor_escrita)
+            return []
+
+        workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        workers = min(max(workers, 1), len(plano))
+        if log_callback:
+            log_callback(f"Gravando {len(plano)} partes com {workers} processo(s).")
+
+        if workers == 1:
+            for arquivo in plano:
+                gravar_arquivo_particao(arquivo.caminho, abas_do(arquivo), motor_escrita)
+                if log_callback:
+                    log_callback(f"Parte gerada: {arquivo.caminho}")
+        else:
+            with usar_pool(executor, workers) as pool:
+                # No máximo `workers` partes montadas em memória ao mesmo tempo.
+                em_andamento: set[Future] = set()
+                for arquivo in plano:
+                    if len(em_andamento) >= workers:
+                        concluidos, em_andamento = wait(em_andamento, return_when=FIRST_COMPLETED)
+                        _registrar_partes(concluidos, log_callback)
+                    em_andamento.add(
+                        pool.submit(gravar_arquivo_particao, arquivo.caminho, abas_do(arquivo), motor_escrita)
+                    )
+                _registrar_partes(wait(em_andamento).done, log_callback)
+
+        gravar_arquivo_particao(arquivo_saida, [*principais, *extras], motor_escrita)
+    return [str(arquivo.caminho) for arquivo in plano]
+
+
+def _registrar_partes(concluidos: Iterable[Future], log_callback: Callable[[str], None] | None) -> None:
+    for futuro in concluidos:
+        caminho = futuro.result()
+        if log_callback:
+            log_callback(f"Parte gerada: {caminho}")
+
+
+def _colunas_notas_matriz(matriz: MatrizAlunos) -> list[int]:
+    """Índices (a partir de 1) das colunas da matriz que recebem as cores das notas."""
+    notas = set(matriz.colunas_notas)
+    return [idx for idx, coluna in enumerate(matriz.colunas, start=1) if coluna in notas]
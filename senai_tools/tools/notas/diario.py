@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Sequence
+
+import pandas as pd
+
+from .cache import CacheRelatorios
+from .entradas import expandir_zips, separar_membro_zip
+from .leitor import VERSAO_LEITOR
+
+VERSAO_DIARIO = 1
+_ARQUIVO_DIARIO = "diario.jsonl"
+
+
+def pasta_diario(arquivo_saida: str | Path) -> Path:
+    """Pasta oculta, ao lado da saída, com o diário e os relatórios já lidos."""
+    saida = Path(arquivo_saida)
+    return saida.with_name(f".~{saida.stem}.retomada")
+
+
+class DiarioProcessamento:
+    """
+    Diário de uma consolidação: cada relatório lido é gravado (Feather, no
+    formato do cache) e registrado numa linha de diario.jsonl. Se a execução
+    cair ou for cancelada, rodar de novo com as mesmas entradas e a mesma saída
+    reaproveita o que já foi lido e refaz só os relatórios faltantes e a escrita.
+
+    O cabeçalho do diário guarda caminho, tamanho e data de modificação de
+    cada entrada; qualquer diferença descarta o diário e recomeça do zero.
+    Linhas incompletas (queda no meio da gravação) são ignoradas.
+    """
+
+    def __init__(self, arquivo_saida: str | Path, lista_arquivos: Sequence[str]):
+        self.pasta = pasta_diario(arquivo_saida)
+        self._cabecalho = {
+            "versao": VERSAO_DIARIO,
+            "leitor": VERSAO_LEITOR,
+            "saida": str(Path(arquivo_saida).resolve()),
+            "entradas": [[str(caminho), *_assinatura(caminho)] for caminho in lista_arquivos],
+        }
+        self._chaves = {entrada[0]: _chave(entrada) for entrada in self._cabecalho["entradas"]}
+        self._concluidos: set[str] = set()
+        self._dados: CacheRelatorios | None = None
+
+    def abrir(self, retomar: bool = True) -> int:
+        """
+        Carrega o diário existente, se compatível e `retomar` for True; senão
+        descarta o antigo (o novo só é criado no primeiro registro). Retorna
+        quantos relatórios já estavam lidos.
+        """
+        if retomar:
+            self._concluidos = _ler_concluidos(self.pasta, self._cabecalho) or set()
+        if self._concluidos:
+            self._dados = CacheRelatorios(self.pasta)
+        else:
+            shutil.rmtree(self.pasta, ignore_errors=True)
+        return len(self._concluidos)
+
+    def ja_lido(self, caminho: str) -> bool:
+        return str(caminho) in self._concluidos
+
+    def obter(self, caminho: str) -> pd.DataFrame | None:
+        """Relatório já lido nesta consolidação (formato de `ler_notas`), ou None."""
+        if self._dados is None or not self.ja_lido(caminho):
+            return None
+        return self._dados.obter(self._chaves[str(caminho)])
+
+    def registrar(self, caminho: str, df_notas: pd.DataFrame) -> None:
+        """Grava o relatório lido e só então o marca como concluído no diário."""
+        if self._dados is None:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            with open(self.pasta / _ARQUIVO_DIARIO, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self._cabecalho, ensure_ascii=False) + "\n")
+            self._dados = CacheRelatorios(self.pasta)
+        self._dados.guardar(self._chaves[str(caminho)], df_notas)
+        with open(self.pasta / _ARQUIVO_DIARIO, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"caminho": str(caminho)}, ensure_ascii=False) + "\n")
+        self._concluidos.add(str(caminho))
+
+    def encerrar(self) -> None:
+        """Apaga o diário depois que a saída foi gravada com sucesso."""
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        self._dados = None
+
+
+def verificar_diario(arquivo_saida: str | Path, lista_arquivos: Sequence[str]) -> tuple[int, int] | None:
+    """
+    (relatórios já lidos, total) se existir um processamento interrompido
+    compatível com estas entradas e esta saída; None caso contrário.
+    """
+    if not pasta_diario(arquivo_saida).is_dir():
+        return None
+    try:
+        lista = expandir_zips(lista_arquivos)
+    except ValueError:
+        # .zip ilegível: o processamento acusa o erro.
+        return None
+    diario = DiarioProcessamento(arquivo_saida, lista)
+    concluidos = _ler_concluidos(diario.pasta, diario._cabecalho)
+    if not concluidos:
+        return None
+    return len(concluidos), len(lista)
+
+
+def descartar_diario(arquivo_saida: str | Path) -> None:
+    shutil.rmtree(pasta_diario(arquivo_saida), ignore_errors=True)
+
+
+def _ler_concluidos(pasta: Path, cabecalho: dict) -> set[str] | None:
+    try:
+        with open(pasta / _ARQUIVO_DIARIO, encoding="utf-8") as f:
+            linhas = f.read().splitlines()
+    except OSError:
+        return None
+    try:
+        if not linhas or json.loads(linhas[0]) != cabecalho:
+            return None
+    except ValueError:
+        return None
+
+    concluidos: set[str] = set()
+    for linha in linhas[1:]:
+        try:
+            concluidos.add(json.loads(linha)["caminho"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return concluidos
+
+
+def _assinatura(caminho: str) -> tuple[int, int]:
+    """Tamanho e data de modificação (ns) do arquivo; para membros de zip, os do .zip."""
+    membro = separar_membro_zip(caminho)
+    try:
+        info = os.stat(membro[0] if membro else caminho)
+    except OSError:
+        # Arquivo inexistente: a validação/leitura acusa o problema.
+        return -1, -1
+    return info.st_size, info.st_mtime_ns
+
+
+def _chave(entrada: Sequence[object]) -> str:
+    return hashlib.blake2b(json.dumps(entrada, ensure_ascii=False).encode(), digest_size=20).hexdigest()
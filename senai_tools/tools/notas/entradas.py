@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import glob
+import io
+from pathlib import Path, PurePosixPath
+from typing import IO, Sequence
+import zipfile
+
+EXTENSOES_RELATORIO = {".xlsx", ".xlsm", ".xls", ".ods"}
+EXTENSAO_ZIP = ".zip"
+
+# Relatórios dentro de um .zip são identificados como "curso.zip!/pasta/relatorio.xlsx":
+# Path(...).name e .suffix continuam sendo os do membro.
+SEPARADOR_ZIP = "!/"
+
+# Nomes de membros sem a flag UTF-8 (bit 0x800) chegam do zipfile decodificados
+# em cp437; zips criados pelo Windows costumam gravá-los em UTF-8 ou cp1252.
+_CODIFICACOES_NOME_ZIP = ("utf-8", "cp1252", "cp850")
+_FLAG_NOME_UTF8 = 0x800
+
+
+def eh_relatorio(caminho: Path) -> bool:
+    """Extensão de relatório e não é arquivo de trava do Excel/LibreOffice (~$arquivo.xlsx, .~lock)."""
+    return caminho.suffix.lower() in EXTENSOES_RELATORIO and not caminho.name.startswith(("~$", ".~"))
+
+
+def expandir_entradas(entradas: Sequence[str]) -> list[str]:
+    """
+    Converte arquivos, pastas (percorridas recursivamente) e padrões glob
+    na lista de relatórios, sem repetição e na ordem em que foram informados.
+    """
+    encontrados: dict[str, None] = {}
+    for entrada in entradas:
+        caminho = Path(entrada)
+        if caminho.is_dir():
+            candidatos = sorted(p for p in caminho.rglob("*") if p.is_file())
+        elif caminho.is_file():
+            candidatos = [caminho]
+        else:
+            candidatos = [Path(p) for p in sorted(glob.glob(entrada, recursive=True))]
+
+        for candidato in candidatos:
+            if eh_relatorio(candidato):
+                encontrados.setdefault(str(candidato), None)
+            elif candidato.suffix.lower() == EXTENSAO_ZIP:
+                for membro in listar_zip(candidato):
+                    encontrados.setdefault(membro, None)
+    return list(encontrados)
+
+
+def expandir_zips(lista_arquivos: Sequence[str]) -> list[str]:
+    """Troca cada .zip da lista pelos relatórios que ele contém, mantendo a ordem."""
+    expandida: list[str] = []
+    for caminho in map(str, lista_arquivos):
+        if Path(caminho).suffix.lower() == EXTENSAO_ZIP and separar_membro_zip(caminho) is None:
+            expandida.extend(listar_zip(caminho))
+        else:
+            expandida.append(caminho)
+    return expandida
+
+
+def listar_zip(caminho_zip: str | Path) -> list[str]:
+    """Relatórios contidos no .zip (em qualquer pasta dele), em ordem de nome."""
+    try:
+        with zipfile.ZipFile(caminho_zip) as zf:
+            membros = [
+                nome
+                for nome, info in _membros_zip(zf).items()
+                if not info.is_dir()
+                and not nome.startswith("__MACOSX/")
+                and eh_relatorio(PurePosixPath(nome))
+            ]
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Arquivo zip inválido: {Path(caminho_zip).name} ({e})") from e
+    return [f"{caminho_zip}{SEPARADOR_ZIP}{membro}" for membro in sorted(membros)]
+
+
+def _nome_membro(info: zipfile.ZipInfo) -> str:
+    """Nome do membro como o usuário o vê, corrigindo a decodificação cp437 do zipfile."""
+    if info.flag_bits & _FLAG_NOME_UTF8:
+        return info.filename
+    try:
+        bruto = info.filename.encode("cp437")
+    except UnicodeEncodeError:
+        return info.filename
+    for codificacao in _CODIFICACOES_NOME_ZIP:
+        try:
+            return bruto.decode(codificacao)
+        except UnicodeDecodeError:
+            continue
+    return info.filename
+
+
+def _membros_zip(zf: zipfile.ZipFile) -> dict[str, zipfile.ZipInfo]:
+    """Membros do zip pelo nome corrigido (o que aparece em "x.zip!/membro")."""
+    return {_nome_membro(info): info for info in zf.infolist()}
+
+
+def _info_membro(zf: zipfile.ZipFile, nome: str) -> zipfile.ZipInfo:
+    info = _membros_zip(zf).get(nome)
+    # Caminhos gravados antes da correção dos nomes (ex.: no diário) usam o nome cru.
+    return info if info is not None else zf.getinfo(nome)
+
+
+def separar_membro_zip(caminho: str | Path) -> tuple[str, str] | None:
+    """("curso.zip", "pasta/relatorio.xlsx") para um membro de zip; None para arquivos comuns."""
+    texto = str(caminho)
+    marcador = EXTENSAO_ZIP + SEPARADOR_ZIP
+    posicao = texto.lower().find(marcador)
+    if posicao < 0:
+        return None
+    fim_zip = posicao + len(EXTENSAO_ZIP)
+    return texto[:fim_zip], texto[fim_zip + len(SEPARADOR_ZIP):]
+
+
+def abrir_entrada(caminho: str | Path) -> IO[bytes]:
+    """
+    Abre um relatório para leitura binária. Membros de zip são descompactados
+    direto do arquivo para a memória, sem arquivo temporário: xlsx e ods são
+    eles mesmos zips e precisam de acesso aleatório, que o fluxo do membro não tem.
+    """
+    membro = separar_membro_zip(caminho)
+    if membro is None:
+        return open(caminho, "rb")
+    caminho_zip, nome = membro
+    with zipfile.ZipFile(caminho_zip) as zf:
+        return io.BytesIO(zf.read(_info_membro(zf, nome)))
+
+
+def tamanho_entrada(caminho: str | Path) -> int:
+    """Tamanho em bytes do relatório (descompactado, para membros de zip)."""
+    membro = separar_membro_zip(caminho)
+    if membro is None:
+        return Path(caminho).stat().st_size
+    caminho_zip, nome = membro
+    with zipfile.ZipFile(caminho_zip) as zf:
+        return _info_membro(zf, nome).file_size
+
+
+def extrair_nome_uc(nome_arquivo: str) -> str:
+    """
+    Retorna somente o nome da UC (sem código e sem o sufixo 'Notas').
+    Exemplo: '1035754 - Banco de Dados Notas.xlsx' -> 'Banco de Dados'
+    """
+    base = Path(nome_arquivo).stem
+    if base.endswith(" Notas"):
+        base = base[:-6]
+    if " - " in base:
+        return base.split(" - ", 1)[1]
+    return base
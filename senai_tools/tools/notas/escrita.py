@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import math
+import os
+from pathlib import Path
+import tempfile
+from typing import Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from .formatacao import (
+    ESTILO_CABECALHO,
+    ESTILO_NUMERO,
+    ESTILO_TEXTO,
+    adicionar_regras_notas,
+    registrar_estilos,
+)
+
+
+@contextmanager
+def gravar_substituindo(destino: str | Path) -> Iterator[Path]:
+    """
+    Caminho temporário ao lado de `destino`, que o substitui de uma vez
+    (os.replace) quando o bloco termina sem erro. Uma gravação interrompida
+    deixa o arquivo anterior intacto em vez de um xlsx pela metade.
+    """
+    destino = Path(destino)
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=f".~{destino.stem}", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield Path(temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+class EscritorXlsxStreaming:
+    """
+    Grava o consolidado em modo write-only do openpyxl: cada linha vai para o
+    disco assim que é escrita, com a mesma formatação de `formatar_worksheet`.
+
+    O formato xlsx exige as larguras das colunas antes das linhas, por isso
+    elas são informadas ao abrir a aba (ver `calcular_larguras`). A memória
+    usada não cresce com o número de linhas.
+    """
+
+    def __init__(self, arquivo_saida: str | Path):
+        self.arquivo_saida = arquivo_saida
+        self._wb = Workbook(write_only=True)
+        estilos = registrar_estilos(self._wb)
+        self._estilo_texto = estilos[ESTILO_TEXTO]
+        self._estilo_numero = estilos[ESTILO_NUMERO]
+        self._ws = None
+        self._celulas: list[WriteOnlyCell] = []
+        self._linhas = 0
+        self._cols_notas: list[int] = []
+
+    def __enter__(self) -> EscritorXlsxStreaming:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.salvar()
+
+    def abrir_aba(
+        self,
+        nome: str,
+        colunas: Sequence[str],
+        larguras: Sequence[int],
+        colunas_notas: Sequence[str] | None = None,
+    ) -> None:
+        """
+        Cria a aba com cabeçalho e larguras. `colunas_notas` recebe as regras de
+        cor das notas; por padrão, só 'Total do Curso'.
+        """
+        self.fechar_aba()
+        self._ws = self._wb.create_sheet(title=nome)
+        for col_idx, largura in enumerate(larguras, start=1):
+            self._ws.column_dimensions[get_column_letter(col_idx)].width = largura
+
+        cabecalho = []
+        for coluna in colunas:
+            cell = WriteOnlyCell(self._ws, value=coluna)
+            cell.style = ESTILO_CABECALHO
+            cabecalho.append(cell)
+        self._ws.append(cabecalho)
+
+        # Uma célula reaproveitada por coluna: cada linha é gravada no append.
+        self._celulas = [WriteOnlyCell(self._ws) for _ in colunas]
+        self._linhas = 1
+        notas = {"Total do Curso"} if colunas_notas is None else {str(c).strip() for c in colunas_notas}
+        self._cols_notas = [idx for idx, coluna in enumerate(colunas, start=1) if str(coluna).strip() in notas]
+
+    def escrever(self, df: pd.DataFrame) -> None:
+        """Acrescenta as linhas de `df` na aba aberta (colunas na mesma ordem do cabeçalho)."""
+        ws = self._ws
+        celulas = self._celulas
+        texto = self._estilo_texto
+        numero = self._estilo_numero
+        # `_style` direto, sem a busca por nome de `cell.style` (ver `registrar_estilos`).
+        for linha in df.itertuples(index=False, name=None):
+            for cell, valor in zip(celulas, linha):
+                valor = valor_excel(valor)
+                cell.value = valor
+                cell._style = texto if isinstance(valor, str) else numero
+            ws.append(celulas)
+        self._linhas += len(df)
+
+    def fechar_aba(self) -> None:
+        if self._ws is None:
+            return
+        adicionar_regras_notas(self._ws, self._cols_notas, self._linhas)
+        self._ws = None
+
+    def salvar(self) -> None:
+        self.fechar_aba()
+        with gravar_substituindo(self.arquivo_saida) as temporario:
+            self._wb.save(temporario)
+
+
+def valor_excel(valor: object) -> object:
+    # Mesmas conversões do to_excel do pandas: NaN vira "" e infinito vira texto.
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return ""
+        if math.isinf(valor):
+            return "inf" if valor > 0 else "-inf"
+    elif valor is pd.NA or valor is pd.NaT:
+        return ""
+    return valor
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import ContextManager
+
+
+def usar_pool(executor: Executor | None, workers: int) -> ContextManager[Executor]:
+    """
+    `executor` (ex.: o pool compartilhado do agendador do app), que continua
+    aberto ao sair do `with`; sem ele, um ProcessPoolExecutor próprio com
+    `workers` processos, encerrado ao sair.
+    """
+    if executor is not None:
+        return nullcontext(executor)
+    return ProcessPoolExecutor(max_workers=workers)
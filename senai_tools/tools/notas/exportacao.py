@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+
+import pandas as pd
+
+COL_TOTAL = "Total do Curso"
+COL_TOTAL_TEXTO = "Total do Curso (texto)"
+
+# Formato -> extensão do arquivo gerado ao lado da planilha.
+FORMATOS_COLUNARES = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "csv": ".csv",
+}
+
+
+def caminho_saida_colunar(arquivo_saida: str | Path, formato: str) -> Path:
+    """Mesmo nome da planilha, com a extensão do formato (notas.xlsx -> notas.parquet)."""
+    return Path(arquivo_saida).with_suffix(FORMATOS_COLUNARES[formato])
+
+
+def tabela_colunar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versão do consolidado com esquema fixo para Parquet/Arrow/CSV.
+
+    'Total do Curso' mistura notas e textos como "-"; formatos colunares
+    exigem um tipo por coluna. A nota vai como float (vazia quando é texto) e o
+    texto original em 'Total do Curso (texto)', presente sempre, para que o
+    esquema não mude de uma execução para outra.
+    """
+    tabela = df.copy()
+    if COL_TOTAL_TEXTO in tabela.columns:
+        # Já separada pelo processador (tipos compactos).
+        tabela[COL_TOTAL] = tabela[COL_TOTAL].astype("float64")
+        tabela[COL_TOTAL_TEXTO] = tabela[COL_TOTAL_TEXTO].astype(object).astype("string")
+        for coluna in tabela.columns:
+            if isinstance(tabela[coluna].dtype, pd.CategoricalDtype):
+                tabela[coluna] = tabela[coluna].astype(object).astype("str")
+        return tabela.reset_index(drop=True)
+
+    total = tabela[COL_TOTAL]
+    if pd.api.types.is_numeric_dtype(total):
+        eh_texto = pd.Series(False, index=total.index)
+    elif pd.api.types.is_object_dtype(total):
+        eh_texto = total.map(lambda v: isinstance(v, str))
+    else:
+        eh_texto = total.notna()
+
+    tabela[COL_TOTAL] = pd.to_numeric(total.where(~eh_texto), errors="coerce").astype("float64")
+    tabela[COL_TOTAL_TEXTO] = total.where(eh_texto).astype("string")
+    return tabela.reset_index(drop=True)
+
+
+# Parquet/Arrow: trechos acumulados até este número de linhas viram um grupo
+# de linhas (Parquet) ou um lote (Arrow), em vez de um por relatório.
+LINHAS_POR_GRUPO = 65_536
+
+
+class EscritorColunar:
+    """
+    Grava uma saída colunar aos poucos: cada `escrever` recebe um trecho no
+    formato de `tabela_colunar` e só o grupo de linhas em formação fica em
+    memória. Tudo vai para um temporário ao lado do destino, que só toma o
+    lugar dele em `fechar`; `descartar` apaga o temporário (erro ou
+    cancelamento no meio da consolidação).
+
+    O Arrow IPC sai sem compressão para poder ser aberto com memory-map
+    (pyarrow.ipc.open_file / pyarrow.memory_map) sem copiar os dados.
+    """
+
+    def __init__(self, destino: str | Path, formato: str):
+        if formato not in FORMATOS_COLUNARES:
+            raise ValueError(f"Formato de saída inválido: {formato}")
+        self.destino = Path(destino)
+        self.formato = formato
+        fd, temporario = tempfile.mkstemp(dir=self.destino.parent, prefix=f".~{self.destino.stem}", suffix=".tmp")
+        os.close(fd)
+        self._temporario = Path(temporario)
+        self._escritor = None
+        self._esquema = None
+        self._pendentes: list = []
+        self._linhas_pendentes = 0
+
+    def escrever(self, tabela: pd.DataFrame) -> None:
+        if self.formato == "csv":
+            primeiro = self._escritor is None
+            if primeiro:
+                # newline="" como no to_csv com caminho: o pandas decide o fim de linha.
+                self._escritor = open(self._temporario, "w", encoding="utf-8", newline="")
+            tabela.to_csv(self._escritor, index=False, header=primeiro)
+            return
+
+        import pyarrow as pa
+
+        lote = pa.Table.from_pandas(tabela, preserve_index=False)
+        if self._esquema is None:
+            self._esquema = lote.schema
+        else:
+            lote = lote.cast(self._esquema)
+        self._pendentes.append(lote)
+        self._linhas_pendentes += lote.num_rows
+        if self._linhas_pendentes >= LINHAS_POR_GRUPO:
+            self._descarregar()
+
+    def fechar(self) -> Path:
+        """Grava o que falta e move o arquivo para o destino."""
+        self._descarregar()
+        if self._escritor is None:
+            raise ValueError("Nenhuma linha para gravar.")
+        self._escritor.close()
+        self._escritor = None
+        os.replace(self._temporario, self.destino)
+        return self.destino
+
+    def descartar(self) -> None:
+        if self._escritor is not None:
+            try:
+                self._escritor.close()
+            except Exception:
+                pass
+            self._escritor = None
+        self._pendentes = []
+        self._temporario.unlink(missing_ok=True)
+
+    def _descarregar(self) -> None:
+        if not self._pendentes:
+            return
+        import pyarrow as pa
+
+        tabela = pa.concat_tables(self._pendentes)
+        self._pendentes = []
+        self._linhas_pendentes = 0
+        if self._escritor is None:
+            if self.formato == "parquet":
+                import pyarrow.parquet as pq
+
+                self._escritor = pq.ParquetWriter(self._temporario, self._esquema, compression="zstd")
+            else:
+                # Sem compressão, para o memory-map (ver a docstring da classe).
+                self._escritor = pa.ipc.new_file(str(self._temporario), self._esquema)
+        self._escritor.write_table(tabela)
@@ -0,0 +1,536 @@
+"""
+Leitura dos relatórios para a consolidação.
+
+`LeitorRelatorios` entrega um relatório por vez, já normalizado e com tipos
+compactos, para ser consumido por um ou mais destinos (ver `destinos.py`)
+ou por outras ferramentas que precisem só da leitura. `ler_notas` e
+`montar_df_final` são as duas etapas da leitura de um relatório;
+`para_planilha`, `concatenar_relatorios` e `tipos_concatenados` são as
+operações que um destino precisa sobre esses relatórios.
+"""
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .antecipacao import LIMITE_ANTECIPACAO_PADRAO_MB, AbrirEntrada, LeituraAntecipada
+from .cache import LIMITE_CACHE_PADRAO_MB, CacheRelatorios
+from .compacto import juntar_total, separar_total, tipo_categorico
+from .diario import DiarioProcessamento
+from .entradas import EXTENSAO_ZIP, abrir_entrada, expandir_zips, extrair_nome_uc, tamanho_entrada
+from .execucao import usar_pool
+from .exportacao import COL_TOTAL_TEXTO
+from .leitor import COL_NOME, COL_SOBRENOME, COL_TOTAL, ler_relatorio
+from .metricas import ETAPA_VALIDACAO, MetricaArquivo, MetricsCallback, medir_etapa
+from .validacao import RelatoriosInvalidos, validar_relatorios
+
+
+class ProcessamentoCancelado(Exception):
+    """Levantada quando o processamento é interrompido pelo usuário entre dois arquivos."""
+
+
+def ler_notas(caminho: str) -> pd.DataFrame:
+    """
+    Lê um relatório e devolve as colunas 'Aluno' e 'Total do Curso'.
+    Função de módulo para poder ser executada em processos separados.
+    """
+    return _normalizar_notas(ler_relatorio(caminho))
+
+
+def _normalizar_notas(df: pd.DataFrame) -> pd.DataFrame:
+    df["Aluno"] = df[COL_NOME].astype(str).str.strip() + " " + df[COL_SOBRENOME].astype(str).str.strip()
+
+    df_notas = df[["Aluno", COL_TOTAL]].copy()
+    return df_notas.rename(columns={COL_TOTAL: "Total do Curso"})
+
+
+def _ler_notas_medindo(caminho: str, conteudo: bytes | None = None) -> tuple[pd.DataFrame, float, float]:
+    """
+    Como `ler_notas`, devolvendo também os tempos de leitura e de transformação.
+    Com `conteudo` (bytes já lidos) o arquivo não é aberto.
+    """
+    inicio = time.perf_counter()
+    df = ler_relatorio(caminho, conteudo)
+    lido = time.perf_counter()
+    df_notas = _normalizar_notas(df)
+    return df_notas, lido - inicio, time.perf_counter() - lido
+
+
+def montar_df_final(df_notas: pd.DataFrame, nome_arquivo: str) -> pd.DataFrame:
+    """
+    Monta as linhas de um relatório já com tipos compactos:
+    - 'UC / Relatório' categórica (um código por linha, não uma cópia do nome);
+    - 'Aluno' em texto Arrow;
+    - 'Total do Curso' numérico, com os marcadores de texto ("-") separados em
+      'Total do Curso (texto)' (categórica). `para_planilha` junta as duas de
+      volta na hora de gravar.
+    """
+    uc = pd.Categorical.from_codes(
+        np.zeros(len(df_notas), dtype=np.int8), dtype=tipo_categorico((extrair_nome_uc(nome_arquivo),))
+    )
+    numeros, texto = separar_total(df_notas["Total do Curso"])
+    # Arrays em vez de Series: um relatório tem poucas dezenas de linhas e o
+    # custo fixo de cada Series/referência pesaria mais que os dados.
+    return pd.DataFrame(
+        {
+            "UC / Relatório": uc,
+            "Aluno": _texto_compacto(df_notas["Aluno"]).array,
+            "Total do Curso": numeros,
+            COL_TOTAL_TEXTO: texto,
+        },
+        index=df_notas.index,
+        copy=False,
+    )
+
+
+def _texto_compacto(serie: pd.Series) -> pd.Series:
+    if isinstance(serie.dtype, pd.StringDtype) and serie.dtype.storage == "pyarrow":
+        return serie
+    try:
+        return serie.astype("string[pyarrow]")
+    except ImportError:
+        return serie
+
+
+def para_planilha(df_final: pd.DataFrame) -> pd.DataFrame:
+    """
+    Colunas como vão para a planilha: nota e marcador voltam a ser uma coluna
+    só, com os mesmos valores que o leitor entrega (notas inteiras como int).
+    """
+    if COL_TOTAL_TEXTO not in df_final.columns:
+        return df_final
+    texto = df_final[COL_TOTAL_TEXTO]
+    df = df_final.drop(columns=[COL_TOTAL_TEXTO])
+    if not texto.notna().any():
+        return df
+    df["Total do Curso"] = juntar_total(df["Total do Curso"], texto)
+    return df
+
+
+def tipos_concatenados(partes: Sequence[pd.DataFrame]) -> pd.Series:
+    """
+    Tipos que `pd.concat(partes)` daria, exceto que uma coluna categórica em
+    todas as partes continua categórica (com a união das categorias) em vez
+    de virar object.
+    """
+    tipos = {}
+    for coluna in partes[0].columns:
+        series = [df[coluna] for df in partes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            categorias = pd.unique(np.concatenate([serie.cat.categories.to_numpy(dtype=object) for serie in series]))
+            tipos[coluna] = pd.CategoricalDtype(pd.Index(categorias))
+        else:
+            tipos[coluna] = pd.concat([serie.head(0) for serie in series]).dtype
+    return pd.Series(tipos, dtype=object)
+
+
+def concatenar_relatorios(partes: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    `pd.concat` coluna a coluna que mantém os tipos compactos de
+    `montar_df_final`: colunas categóricas são unidas pelos códigos.
+    """
+    colunas = {}
+    for coluna in partes[0].columns:
+        series = [df[coluna] for df in partes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            colunas[coluna] = union_categoricals(series)
+        else:
+            colunas[coluna] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(colunas)
+
+
+@dataclass
+class RelatorioLido:
+    """
+    Um relatório lido: `df_final` tem as colunas 'UC / Relatório', 'Aluno',
+    'Total do Curso' e 'Total do Curso (texto)' com os tipos compactos de
+    `montar_df_final`; `idx` é a posição do arquivo na lista de entrada.
+    """
+
+    idx: int
+    caminho: str
+    df_final: pd.DataFrame
+    leitura_s: float
+    transformacao_s: float
+    cache: bool = False
+
+    @property
+    def nome(self) -> str:
+        return Path(self.caminho).name
+
+
+def _iterar_relatorios(
+    lista_arquivos: Sequence[str],
+    max_workers: int | None,
+    log_callback: Callable[[str], None] | None,
+    cache: CacheRelatorios | None = None,
+    diario: DiarioProcessamento | None = None,
+    antecipada: LeituraAntecipada | None = None,
+    executor: Executor | None = None,
+) -> Iterator[RelatorioLido]:
+    """
+    Gera os relatórios à medida que cada um termina de ser lido.
+    Em modo paralelo a ordem de conclusão pode diferir da ordem de entrada;
+    o índice permite ao chamador reordenar o resultado.
+    Relatórios já lidos numa execução interrompida (diário) ou encontrados no
+    cache são devolvidos antes dos que precisam de leitura; todo relatório
+    obtido é registrado no diário.
+
+    Com `antecipada` (que deve conter, na ordem, os relatórios fora do diário)
+    a lista é percorrida uma vez só: os bytes de cada relatório servem para a
+    chave do cache e para a leitura, e o arquivo não é aberto de novo.
+
+    `executor` é um pool de processos compartilhado, usado (sem ser encerrado)
+    no lugar de um pool próprio quando há leitura paralela.
+    """
+    if antecipada is not None:
+        yield from _iterar_antecipando(lista_arquivos, max_workers, log_callback, cache, diario, antecipada, executor)
+        return
+
+    pendentes: list[tuple[int, str, str | None]] = []
+    for idx, caminho in enumerate(lista_arquivos):
+        nome = Path(caminho).name
+        inicio = time.perf_counter()
+        origem = "retomado"
+        df_notas = diario.obter(caminho) if diario else None
+        if df_notas is None:
+            origem = "cache"
+            chave = cache.chave(caminho) if cache else None
+            df_notas = cache.obter(chave) if cache and chave else None
+            if df_notas is None:
+                pendentes.append((idx, str(caminho), chave))
+                continue
+            if diario:
+                diario.registrar(caminho, df_notas)
+        if log_callback:
+            log_callback(f"Processando: {nome} ({origem})")
+        lido = time.perf_counter()
+        df_final = montar_df_final(df_notas, nome)
+        yield RelatorioLido(idx, str(caminho), df_final, lido - inicio, time.perf_counter() - lido, cache=True)
+
+    if not pendentes:
+        return
+
+    workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+    workers = min(max(workers, 1), len(pendentes))
+
+    if workers == 1:
+        for idx, caminho, chave in pendentes:
+            if log_callback:
+                log_callback(f"Processando: {Path(caminho).name}")
+            yield _concluir_leitura(idx, caminho, chave, _ler_notas_medindo(caminho), cache, diario)
+        return
+
+    if log_callback:
+        log_callback(f"Leitura paralela com {workers} processos.")
+
+    with usar_pool(executor, workers) as pool:
+        futuros = {
+            pool.submit(_ler_notas_medindo, caminho): (idx, caminho, chave)
+            for idx, caminho, chave in pendentes
+        }
+        try:
+            for futuro in as_completed(futuros):
+                idx, caminho, chave = futuros[futuro]
+                lido = futuro.result()
+                if log_callback:
+                    log_callback(f"Processado: {Path(caminho).name}")
+                yield _concluir_leitura(idx, caminho, chave, lido, cache, diario)
+        except BaseException:
+            # Interrompe a fila para não continuar lendo após o primeiro erro.
+            for pendente in futuros:
+                pendente.cancel()
+            raise
+
+
+def _iterar_antecipando(
+    lista_arquivos: Sequence[str],
+    max_workers: int | None,
+    log_callback: Callable[[str], None] | None,
+    cache: CacheRelatorios | None,
+    diario: DiarioProcessamento | None,
+    antecipada: LeituraAntecipada,
+    executor: Executor | None = None,
+) -> Iterator[RelatorioLido]:
+    workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+    workers = min(max(workers, 1), len(lista_arquivos))
+    pool: Executor | None = None
+    futuros: dict[Future, tuple[int, str, str | None, float]] = {}
+
+    def colher(concluidos: Iterable[Future]) -> Iterator[RelatorioLido]:
+        for futuro in concluidos:
+            idx, caminho, chave, espera_s = futuros.pop(futuro)
+            lido = futuro.result()
+            if log_callback:
+                log_callback(f"Processado: {Path(caminho).name}")
+            yield _concluir_leitura(idx, caminho, chave, lido, cache, diario, espera_s)
+
+    try:
+        for idx, caminho in enumerate(map(str, lista_arquivos)):
+            nome = Path(caminho).name
+            inicio = time.perf_counter()
+            origem = "retomado"
+            conteudo = chave = None
+            df_notas = diario.obter(caminho) if diario else None
+            if df_notas is None:
+                origem = "cache"
+                conteudo = antecipada.obter(caminho)
+                chave = cache.chave(caminho, conteudo) if cache else None
+                df_notas = cache.obter(chave) if cache and chave else None
+                if df_notas is not None and diario:
+                    diario.registrar(caminho, df_notas)
+            if df_notas is not None:
+                if log_callback:
+                    log_callback(f"Processando: {nome} ({origem})")
+                lido = time.perf_counter()
+                df_final = montar_df_final(df_notas, nome)
+                yield RelatorioLido(idx, caminho, df_final, lido - inicio, time.perf_counter() - lido, cache=True)
+                continue
+
+            # Espera pelos bytes (e hash do cache) conta como tempo de leitura.
+            espera_s = time.perf_counter() - inicio
+            if workers == 1:
+                if log_callback:
+                    log_callback(f"Processando: {nome}")
+                lido = _ler_notas_medindo(caminho, conteudo)
+                yield _concluir_leitura(idx, caminho, chave, lido, cache, diario, espera_s)
+                continue
+
+            if pool is None:
+                if log_callback:
+                    log_callback(f"Leitura paralela com {workers} processos.")
+                pool = executor or ProcessPoolExecutor(max_workers=workers)
+            futuros[pool.submit(_ler_notas_medindo, caminho, conteudo)] = (idx, caminho, chave, espera_s)
+            del conteudo
+            # Fila curta: os processos continuam ocupados sem acumular bytes de
+            # relatórios esperando leitura (o limite é o da leitura antecipada).
+            if len(futuros) >= 2 * workers:
+                yield from colher(wait(futuros, return_when=FIRST_COMPLETED).done)
+            else:
+                yield from colher([futuro for futuro in futuros if futuro.done()])
+
+        while futuros:
+            yield from colher(wait(futuros, return_when=FIRST_COMPLETED).done)
+    except BaseException:
+        for pendente in futuros:
+            pendente.cancel()
+        raise
+    finally:
+        # O pool compartilhado continua aberto; os futuros desta leitura já foram cancelados.
+        if pool is not None and pool is not executor:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _concluir_leitura(
+    idx: int,
+    caminho: str,
+    chave: str | None,
+    lido: tuple[pd.DataFrame, float, float],
+    cache: CacheRelatorios | None,
+    diario: DiarioProcessamento | None,
+    espera_s: float = 0.0,
+) -> RelatorioLido:
+    """Guarda no cache e no diário o relatório recém-lido e monta suas linhas."""
+    df_notas, leitura_s, transformacao_s = lido
+    if cache and chave:
+        cache.guardar(chave, df_notas)
+    if diario:
+        diario.registrar(caminho, df_notas)
+    inicio = time.perf_counter()
+    df_final = montar_df_final(df_notas, Path(caminho).name)
+    transformacao_s += time.perf_counter() - inicio
+    return RelatorioLido(idx, caminho, df_final, espera_s + leitura_s, transformacao_s)
+
+
+class LeitorRelatorios:
+    """
+    Lê os relatórios e os entrega um por vez (`RelatorioLido`), na ordem da
+    lista de entrada, para quem consome decidir o que guardar: um relatório
+    que não é mais referenciado é liberado antes do próximo.
+
+    Cuida de tudo que vem antes da escrita: .zip, validação prévia, diário de
+    retomada, cache, leitura paralela, métricas por arquivo, progresso e
+    cancelamento (ver `processar_arquivos` para cada opção). Em leitura
+    paralela, um relatório que termina antes dos anteriores espera por eles.
+
+    Relatórios sem linhas de dados não são entregues; eles e os descartados
+    pela validação ficam em `ignorados`. O diário (quando `arquivo_diario` é
+    informado) só é apagado por `concluir`, depois que as saídas foram gravadas.
+    """
+
+    def __init__(
+        self,
+        lista_arquivos: Sequence[str],
+        *,
+        max_workers: int | None = 1,
+        cache_dir: str | Path | None = None,
+        cache_limite_mb: int = LIMITE_CACHE_PADRAO_MB,
+        validar_antes: bool = False,
+        ignorar_invalidos: bool = False,
+        arquivo_diario: str | Path | None = None,
+        retomar: bool = True,
+        leitura_antecipada: int = 0,
+        limite_antecipacao_mb: int = LIMITE_ANTECIPACAO_PADRAO_MB,
+        abrir: AbrirEntrada = abrir_entrada,
+        log_callback: Callable[[str], None] | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        cancelar: threading.Event | None = None,
+        metrics_callback: MetricsCallback | None = None,
+        executor: Executor | None = None,
+    ):
+        if ignorar_invalidos and not validar_antes:
+            raise ValueError("ignorar_invalidos exige validar_antes.")
+
+        if leitura_antecipada < 0 or limite_antecipacao_mb < 1:
+            raise ValueError("A leitura antecipada exige valores positivos.")
+
+        if not lista_arquivos:
+            raise FileNotFoundError("Nenhum arquivo selecionado.")
+
+        compactados = sum(1 for caminho in lista_arquivos if Path(caminho).suffix.lower() == EXTENSAO_ZIP)
+        self.arquivos = expandir_zips(lista_arquivos)
+        if compactados and log_callback:
+            log_callback(f"{compactados} arquivo(s) .zip com {len(self.arquivos)} relatório(s) no total.")
+        if not self.arquivos:
+            raise FileNotFoundError("Nenhum relatório encontrado nos arquivos .zip selecionados.")
+
+        if log_callback:
+            log_callback(f"Total de arquivos selecionados: {len(self.arquivos)}")
+
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache_limite_mb = cache_limite_mb
+        self.validar_antes = validar_antes
+        self.ignorar_invalidos = ignorar_invalidos
+        self.retomar = retomar
+        self.leitura_antecipada = leitura_antecipada
+        self.limite_antecipacao_mb = limite_antecipacao_mb
+        self.abrir = abrir
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+        self.cancelar = cancelar
+        self.metrics_callback = metrics_callback
+        self.executor = executor
+        self.ignorados: list[str] = []
+        self.entregues = 0
+        self._diario = DiarioProcessamento(arquivo_diario, self.arquivos) if arquivo_diario else None
+
+    def __iter__(self) -> Iterator[RelatorioLido]:
+        log_callback = self.log_callback
+        lista_arquivos = self.arquivos
+        if self._diario:
+            retomados = self._diario.abrir(self.retomar)
+            if retomados and log_callback:
+                log_callback(
+                    f"Retomando processamento interrompido: {retomados} de {len(lista_arquivos)} relatório(s) já lido(s)."
+                )
+
+        if self.validar_antes:
+            lista_arquivos = self._validar(lista_arquivos)
+
+        total_arquivos = len(lista_arquivos)
+        cache = CacheRelatorios(self.cache_dir, self.cache_limite_mb) if self.cache_dir else None
+        prontos: dict[int, RelatorioLido | None] = {}
+        proximo = 0
+
+        antecipada = None
+        if self.leitura_antecipada:
+            diario = self._diario
+            antecipada = LeituraAntecipada(
+                [caminho for caminho in lista_arquivos if not (diario and diario.ja_lido(caminho))],
+                self.leitura_antecipada,
+                self.limite_antecipacao_mb,
+                self.abrir,
+            )
+        try:
+            for concluidos, lido in enumerate(
+                _iterar_relatorios(
+                    lista_arquivos, self.max_workers, log_callback, cache, self._diario, antecipada, self.executor
+                ),
+                start=1,
+            ):
+                prontos[lido.idx] = self._registrar(lido)
+
+                if self.progress_callback:
+                    self.progress_callback(concluidos, total_arquivos)
+
+                if self.cancelar is not None and self.cancelar.is_set():
+                    raise ProcessamentoCancelado("Processamento cancelado pelo usuário.")
+
+                while proximo in prontos:
+                    relatorio = prontos.pop(proximo)
+                    proximo += 1
+                    if relatorio is not None:
+                        self.entregues += 1
+                        yield relatorio
+        finally:
+            if antecipada is not None:
+                antecipada.fechar()
+
+        if cache:
+            cache.aplicar_limite()
+            if log_callback:
+                log_callback(cache.resumo())
+
+    def concluir(self) -> None:
+        """Apaga o diário de retomada; chamar depois que as saídas foram gravadas."""
+        if self._diario:
+            self._diario.encerrar()
+
+    def _validar(self, lista_arquivos: list[str]) -> list[str]:
+        log_callback = self.log_callback
+        diario = self._diario
+        # Relatórios já lidos numa execução anterior não precisam ser conferidos de novo.
+        a_validar = [caminho for caminho in lista_arquivos if not (diario and diario.ja_lido(caminho))]
+        with medir_etapa(ETAPA_VALIDACAO, self.metrics_callback):
+            problemas = validar_relatorios(a_validar, self.max_workers, log_callback, self.executor) if a_validar else []
+        invalidos = [problema for problema in problemas if problema.grave]
+        if invalidos and not self.ignorar_invalidos:
+            raise RelatoriosInvalidos(invalidos)
+        if log_callback:
+            for problema in problemas:
+                log_callback(f"{'Ignorado' if problema.grave else 'Aviso'}: {problema}")
+        if not invalidos:
+            return lista_arquivos
+
+        descartados = {problema.caminho for problema in invalidos}
+        lista_arquivos = [caminho for caminho in lista_arquivos if str(caminho) not in descartados]
+        self.ignorados.extend(Path(problema.caminho).name for problema in invalidos)
+        if log_callback:
+            log_callback(f"{len(invalidos)} relatório(s) com problema ignorado(s).")
+        if not lista_arquivos:
+            raise ValueError("Nenhum relatório válido para processar.")
+        return lista_arquivos
+
+    def _registrar(self, lido: RelatorioLido) -> RelatorioLido | None:
+        """Emite a métrica do arquivo; relatórios vazios viram None (ignorados)."""
+        df_final = lido.df_final
+        if self.metrics_callback:
+            self.metrics_callback(
+                MetricaArquivo(
+                    arquivo=lido.nome,
+                    leitura_s=lido.leitura_s,
+                    transformacao_s=lido.transformacao_s,
+                    linhas=len(df_final),
+                    bytes_arquivo=tamanho_entrada(lido.caminho),
+                    bytes_memoria=int(df_final.memory_usage(deep=True).sum()),
+                    cache=lido.cache,
+                )
+            )
+
+        if df_final.empty:
+            if self.log_callback:
+                self.log_callback(f"Nenhuma linha de dados em {lido.nome}; arquivo ignorado.")
+            self.ignorados.append(lido.nome)
+            return None
+        df_final.attrs["arquivo_origem"] = lido.nome
+        return lido
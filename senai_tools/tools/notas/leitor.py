@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import io
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Sequence
+import xml.etree.ElementTree as ET
+import zipfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from .entradas import abrir_entrada
+
+COL_NOME = "Nome"
+COL_SOBRENOME = "Sobrenome"
+COL_TOTAL = "Total do curso (Real)"
+COLUNAS_OBRIGATORIAS = (COL_NOME, COL_SOBRENOME, COL_TOTAL)
+
+# Versão do formato lido/normalizado; altere ao mudar a leitura para invalidar o cache.
+VERSAO_LEITOR = 1
+
+# Quantas linhas do topo da planilha são inspecionadas à procura do cabeçalho.
+LINHAS_BUSCA_CABECALHO = 20
+
+EXTENSOES_XLSX = {".xlsx", ".xlsm"}
+EXTENSOES_ODS = {".ods"}
+
+_NS_TABLE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+_NS_OFFICE = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+_NS_TEXT = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+_ODS_TABELA = f"{{{_NS_TABLE}}}table"
+_ODS_LINHA = f"{{{_NS_TABLE}}}table-row"
+_ODS_CELULAS = {f"{{{_NS_TABLE}}}table-cell", f"{{{_NS_TABLE}}}covered-table-cell"}
+_ODS_LINHAS_REPETIDAS = f"{{{_NS_TABLE}}}number-rows-repeated"
+_ODS_COLUNAS_REPETIDAS = f"{{{_NS_TABLE}}}number-columns-repeated"
+_ODS_TIPO = f"{{{_NS_OFFICE}}}value-type"
+_ODS_VALOR = f"{{{_NS_OFFICE}}}value"
+_ODS_VALOR_TEXTO = f"{{{_NS_OFFICE}}}string-value"
+_ODS_VALOR_BOOLEANO = f"{{{_NS_OFFICE}}}boolean-value"
+_ODS_VALOR_DATA = f"{{{_NS_OFFICE}}}date-value"
+_ODS_PARAGRAFO = f"{{{_NS_TEXT}}}p"
+_ODS_ESPACO = f"{{{_NS_TEXT}}}s"
+_ODS_ESPACO_QTD = f"{{{_NS_TEXT}}}c"
+_ODS_TAB = f"{{{_NS_TEXT}}}tab"
+_ODS_QUEBRA = f"{{{_NS_TEXT}}}line-break"
+
+
+def ler_relatorio(caminho: str | Path, conteudo: bytes | None = None) -> pd.DataFrame:
+    """
+    Lê somente as colunas obrigatórias de um relatório de notas.
+
+    O DataFrame retornado tem exatamente as colunas 'Nome', 'Sobrenome' e
+    'Total do curso (Real)'. Levanta ValueError se alguma delas não existir.
+    `caminho` pode ser um membro de zip (ver `entradas.SEPARADOR_ZIP`).
+    Com `conteudo` (bytes do arquivo já lidos, ex.: pela leitura antecipada)
+    o arquivo não é aberto; `caminho` só define o nome e o formato.
+    """
+    nome = Path(caminho).name
+    sufixo = Path(caminho).suffix.lower()
+    with (abrir_entrada(caminho) if conteudo is None else io.BytesIO(conteudo)) as fonte:
+        if sufixo in EXTENSOES_XLSX:
+            return _ler_xlsx(fonte, nome)
+        if sufixo in EXTENSOES_ODS:
+            return _ler_ods(fonte, nome)
+        return _ler_pandas(fonte, nome)
+
+
+def localizar_cabecalho(
+    linhas: Iterable[Sequence[object]], nome_arquivo: str
+) -> tuple[int, list[int]]:
+    """
+    Procura, nas primeiras linhas, a linha de cabeçalho com as colunas obrigatórias.
+
+    Retorna (índice da linha de cabeçalho, índices das colunas obrigatórias na
+    ordem de COLUNAS_OBRIGATORIAS). Sem cabeçalho completo, acusa a primeira
+    coluna ausente da primeira linha não vazia, como a leitura via pandas faria.
+    """
+    primeira_nao_vazia: list[str] | None = None
+
+    for idx_linha, linha in enumerate(islice(linhas, LINHAS_BUSCA_CABECALHO)):
+        nomes = ["" if valor is None else str(valor).strip() for valor in linha]
+        if not any(nomes):
+            continue
+        if primeira_nao_vazia is None:
+            primeira_nao_vazia = nomes
+        if all(col in nomes for col in COLUNAS_OBRIGATORIAS):
+            return idx_linha, [nomes.index(col) for col in COLUNAS_OBRIGATORIAS]
+
+    nomes = primeira_nao_vazia or []
+    faltante = next(col for col in COLUNAS_OBRIGATORIAS if col not in nomes)
+    raise ValueError(f"Coluna obrigatória '{faltante}' não encontrada em: {nome_arquivo}")
+
+
+def ler_cabecalho(caminho: str | Path) -> list[str] | None:
+    """
+    Lê só o topo do relatório e devolve a linha de cabeçalho: a que tem todas
+    as colunas obrigatórias ou, sem ela, a primeira linha não vazia (que é a
+    que a leitura acusaria). None quando a primeira planilha está vazia.
+    """
+    sufixo = Path(caminho).suffix.lower()
+    with abrir_entrada(caminho) as fonte:
+        if sufixo in EXTENSOES_XLSX:
+            wb = load_workbook(fonte, read_only=True, data_only=True)
+            try:
+                ws = wb.worksheets[0]
+                return _escolher_cabecalho(ws.iter_rows(max_row=LINHAS_BUSCA_CABECALHO, values_only=True))
+            finally:
+                wb.close()
+        if sufixo in EXTENSOES_ODS:
+            with zipfile.ZipFile(fonte) as zf, zf.open("content.xml") as conteudo:
+                return _escolher_cabecalho(_iterar_linhas_ods(conteudo, []))
+        colunas = pd.read_excel(fonte, sheet_name=0, nrows=0).columns
+    nomes = ["" if str(col).startswith("Unnamed:") else str(col).strip() for col in colunas]
+    return nomes if any(nomes) else None
+
+
+def _escolher_cabecalho(linhas: Iterable[Sequence[object]]) -> list[str] | None:
+    primeira_nao_vazia: list[str] | None = None
+    for linha in islice(linhas, LINHAS_BUSCA_CABECALHO):
+        nomes = ["" if valor is None else str(valor).strip() for valor in linha]
+        if not any(nomes):
+            continue
+        if all(col in nomes for col in COLUNAS_OBRIGATORIAS):
+            return nomes
+        if primeira_nao_vazia is None:
+            primeira_nao_vazia = nomes
+    return primeira_nao_vazia
+
+
+def montar_dataframe(linhas: Iterable[Sequence[object]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame das colunas obrigatórias a partir de linhas já projetadas
+    (Nome, Sobrenome, Total). Linhas vazias no fim da planilha são descartadas.
+    """
+    dados: list[tuple[object, ...]] = []
+    ultima_preenchida = 0
+    for linha in linhas:
+        valores = tuple(_converter_celula(valor) for valor in linha)
+        dados.append(valores)
+        if any(valor is not None for valor in valores):
+            ultima_preenchida = len(dados)
+    del dados[ultima_preenchida:]
+
+    df = pd.DataFrame.from_records(dados, columns=list(COLUNAS_OBRIGATORIAS))
+    return df.where(df.notna(), np.nan)
+
+
+def _converter_celula(valor: object) -> object:
+    # Mesmas conversões do leitor do pandas: vazio vira NaN e float inteiro vira int.
+    if valor == "":
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _ler_xlsx(fonte: IO[bytes], nome: str) -> pd.DataFrame:
+    wb = load_workbook(fonte, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        idx_cabecalho, indices = localizar_cabecalho(ws.iter_rows(values_only=True), nome)
+
+        # Lê apenas a faixa de colunas que contém as obrigatórias.
+        min_col = min(indices)
+        max_col = max(indices)
+        projetar = itemgetter(*(idx - min_col for idx in indices))
+        linhas = ws.iter_rows(
+            min_row=idx_cabecalho + 2,
+            min_col=min_col + 1,
+            max_col=max_col + 1,
+            values_only=True,
+        )
+        return montar_dataframe(projetar(linha) for linha in linhas)
+    finally:
+        wb.close()
+
+
+def _ler_ods(fonte: IO[bytes], nome: str) -> pd.DataFrame:
+    """
+    Lê a primeira tabela do content.xml em fluxo, sem montar o DOM inteiro
+    como o odfpy faz. Depois do cabeçalho, só as colunas obrigatórias são convertidas.
+    """
+    with zipfile.ZipFile(fonte) as zf, zf.open("content.xml") as conteudo:
+        indices: list[int] = []
+        linhas = _iterar_linhas_ods(conteudo, indices)
+        _, encontrados = localizar_cabecalho(linhas, nome)
+        # A partir daqui o gerador passa a devolver apenas as colunas projetadas.
+        indices.extend(encontrados)
+        return montar_dataframe(linhas)
+
+
+def _iterar_linhas_ods(conteudo: IO[bytes], indices: list[int]) -> Iterator[Sequence[object]]:
+    """
+    Gera as linhas da primeira tabela do documento.
+
+    Enquanto `indices` estiver vazio cada linha vem completa (busca do
+    cabeçalho); depois, apenas os valores das colunas em `indices`.
+    Linhas em branco repetidas só são emitidas se houver dados depois delas,
+    o que evita expandir as milhares de linhas vazias que o LibreOffice grava no fim.
+    """
+    tabela: ET.Element | None = None
+    brancas_pendentes = 0
+
+    for evento, elem in ET.iterparse(conteudo, events=("start", "end")):
+        if elem.tag == _ODS_TABELA:
+            if evento == "end" or tabela is not None:
+                return
+            tabela = elem
+            continue
+        if evento != "end" or elem.tag != _ODS_LINHA or tabela is None:
+            continue
+
+        repeticoes = int(elem.get(_ODS_LINHAS_REPETIDAS, 1))
+        if not indices:
+            valores = _valores_linha_ods(elem)
+            repeticoes = min(repeticoes, LINHAS_BUSCA_CABECALHO)
+        else:
+            valores = _valores_projetados_ods(elem, indices)
+            if all(valor is None for valor in valores):
+                brancas_pendentes += repeticoes
+                repeticoes = 0
+            else:
+                vazia = (None,) * len(indices)
+                for _ in range(brancas_pendentes):
+                    yield vazia
+                brancas_pendentes = 0
+
+        # Libera a memória das linhas já consumidas.
+        elem.clear()
+        tabela.clear()
+
+        for _ in range(repeticoes):
+            yield valores
+
+
+def _valores_linha_ods(linha: ET.Element) -> list[object]:
+    valores: list[object] = []
+    for celula in linha:
+        if celula.tag not in _ODS_CELULAS:
+            continue
+        repeticoes = int(celula.get(_ODS_COLUNAS_REPETIDAS, 1))
+        valores.extend([_valor_celula_ods(celula)] * repeticoes)
+    while valores and valores[-1] is None:
+        valores.pop()
+    return valores
+
+
+def _valores_projetados_ods(linha: ET.Element, indices: list[int]) -> tuple[object, ...]:
+    valores: list[object] = [None] * len(indices)
+    ultima = max(indices)
+    coluna = 0
+    for celula in linha:
+        if celula.tag not in _ODS_CELULAS:
+            continue
+        repeticoes = int(celula.get(_ODS_COLUNAS_REPETIDAS, 1))
+        fim = coluna + repeticoes
+        posicoes = [pos for pos, idx in enumerate(indices) if coluna <= idx < fim]
+        if posicoes:
+            valor = _valor_celula_ods(celula)
+            for pos in posicoes:
+                valores[pos] = valor
+        coluna = fim
+        if coluna > ultima:
+            break
+    return tuple(valores)
+
+
+def _valor_celula_ods(celula: ET.Element) -> object:
+    tipo = celula.get(_ODS_TIPO)
+    if tipo is None:
+        return None
+    if tipo in ("float", "percentage", "currency"):
+        return float(celula.get(_ODS_VALOR, "nan"))
+    if tipo == "boolean":
+        return celula.get(_ODS_VALOR_BOOLEANO) == "true"
+    if tipo == "date":
+        return pd.Timestamp(celula.get(_ODS_VALOR_DATA))
+    texto = celula.get(_ODS_VALOR_TEXTO)
+    if texto is not None:
+        return texto
+    return "\n".join(_texto_ods(p) for p in celula.iterfind(_ODS_PARAGRAFO))
+
+
+def _texto_ods(elem: ET.Element) -> str:
+    partes = [elem.text or ""]
+    for filho in elem:
+        if filho.tag == _ODS_ESPACO:
+            partes.append(" " * int(filho.get(_ODS_ESPACO_QTD, 1)))
+        elif filho.tag == _ODS_TAB:
+            partes.append("\t")
+        elif filho.tag == _ODS_QUEBRA:
+            partes.append("\n")
+        else:
+            partes.append(_texto_ods(filho))
+        partes.append(filho.tail or "")
+    return "".join(partes)
+
+
+def _ler_pandas(fonte: IO[bytes], nome: str) -> pd.DataFrame:
+    df = pd.read_excel(fonte, sheet_name=0)
+    for col in COLUNAS_OBRIGATORIAS:
+        if col not in df.columns:
+            raise ValueError(f"Coluna obrigatória '{col}' não encontrada em: {nome}")
+    return df[list(COLUNAS_OBRIGATORIAS)].copy()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .exportacao import COL_TOTAL, COL_TOTAL_TEXTO
+
+ABA_MATRIZ = "Alunos x UC"
+COL_ALUNO = "Aluno"
+COL_UC = "UC / Relatório"
+COLUNAS_AGREGADAS = ("UCs com nota", "Média", "Mínima", "Máxima")
+
+# Limite de colunas do xlsx (XFD).
+MAX_COLUNAS_XLSX = 16384
+
+
+@dataclass
+class MatrizAlunos:
+    """
+    Uma linha por aluno e uma coluna por UC com o 'Total do Curso'.
+
+    `notas` é float (NaN onde o aluno não tem nota na UC); `textos` guarda o
+    valor textual (ex.: "-") das células em que o relatório trouxe só texto.
+    """
+
+    alunos: np.ndarray
+    ucs: list[str]
+    notas: np.ndarray
+    textos: dict[tuple[int, int], str]
+
+    @property
+    def colunas(self) -> list[str]:
+        return [COL_ALUNO, *self.ucs, *COLUNAS_AGREGADAS]
+
+    @property
+    def colunas_notas(self) -> list[str]:
+        """Colunas com valores de nota, que recebem as cores de 'Total do Curso'."""
+        return [*self.ucs, "Média", "Mínima", "Máxima"]
+
+    def agregados(self) -> dict[str, np.ndarray]:
+        """Quantidade de UCs com nota, média, mínima e máxima de cada aluno."""
+        notas = self.notas
+        com_nota = ~np.isnan(notas)
+        quantidade = com_nota.sum(axis=1)
+        soma = np.where(com_nota, notas, 0.0).sum(axis=1)
+        media = np.full(len(notas), np.nan)
+        np.divide(soma, quantidade, out=media, where=quantidade > 0)
+        return {
+            "UCs com nota": quantidade,
+            "Média": np.round(media, 2),
+            # fmin/fmax ignoram NaN e não emitem aviso quando a linha é toda vazia.
+            "Mínima": np.fmin.reduce(notas, axis=1) if notas.shape[1] else np.full(len(notas), np.nan),
+            "Máxima": np.fmax.reduce(notas, axis=1) if notas.shape[1] else np.full(len(notas), np.nan),
+        }
+
+    def para_planilha(self) -> pd.DataFrame:
+        """DataFrame na ordem de `colunas`, com os textos de volta nas células sem nota."""
+        # Só as colunas que têm texto viram object; as demais continuam float.
+        com_texto: dict[int, list[tuple[int, str]]] = {}
+        for (linha, coluna), texto in self.textos.items():
+            com_texto.setdefault(coluna, []).append((linha, texto))
+
+        dados: dict[str, object] = {COL_ALUNO: self.alunos}
+        for idx, uc in enumerate(self.ucs):
+            valores = self.notas[:, idx]
+            if idx in com_texto:
+                valores = valores.astype(object)
+                for linha, texto in com_texto[idx]:
+                    valores[linha] = texto
+            dados[uc] = valores
+        dados.update(self.agregados())
+        return pd.DataFrame(dados, columns=self.colunas)
+
+
+def normalizar_nome(nome: str) -> str:
+    """Chave de comparação do aluno: sem espaços extras, sem acentos e sem diferença de caixa."""
+    decomposto = unicodedata.normalize("NFKD", " ".join(nome.split()).casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def indexar_alunos(nomes: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Código de cada linha no índice de alunos e o nome exibido de cada código.
+
+    Os nomes distintos são normalizados uma única vez (não por linha) e
+    agrupados por hash; o nome exibido é a primeira grafia encontrada, sem
+    espaços extras.
+    Linhas sem nome recebem código -1.
+    """
+    codigos, distintos = pd.factorize(nomes, use_na_sentinel=True)
+    chaves = [normalizar_nome(str(nome)) for nome in distintos]
+    codigos_chave, chaves_unicas = pd.factorize(pd.Index(chaves, dtype=object))
+
+    # Ordena os alunos pela chave normalizada (acentos e caixa não mudam a ordem).
+    ordem = np.argsort(np.asarray(chaves_unicas, dtype=object), kind="stable")
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    codigos_chave = posicao[codigos_chave]
+
+    primeira = np.full(len(chaves_unicas), -1, dtype=np.intp)
+    # Percorre de trás para frente: a última atribuição é a primeira ocorrência.
+    primeira[codigos_chave[::-1]] = np.arange(len(codigos_chave))[::-1]
+    nomes_exibidos = np.array([" ".join(str(distintos[i]).split()) for i in primeira], dtype=object)
+
+    por_linha = np.where(codigos >= 0, codigos_chave[np.maximum(codigos, 0)], -1)
+    return por_linha, nomes_exibidos
+
+
+def montar_matriz(consolidado: pd.DataFrame) -> MatrizAlunos:
+    """
+    Monta a matriz Aluno x UC a partir do consolidado (uma linha por aluno e relatório).
+
+    A tabela é preenchida por indexação direta (linha do aluno, coluna da UC),
+    sem laço por linha. Quando o mesmo aluno aparece mais de uma vez na mesma
+    UC (ex.: dois relatórios da mesma UC), vale a maior nota.
+    """
+    linha_aluno, alunos = indexar_alunos(consolidado[COL_ALUNO])
+
+    uc = consolidado[COL_UC]
+    if isinstance(uc.dtype, pd.CategoricalDtype):
+        coluna_uc = uc.cat.remove_unused_categories()
+        ucs = [str(nome) for nome in coluna_uc.cat.categories]
+        coluna_uc = coluna_uc.cat.codes.to_numpy()
+    else:
+        coluna_uc, distintas = pd.factorize(uc)
+        ucs = [str(nome) for nome in distintas]
+    if len(ucs) + 1 + len(COLUNAS_AGREGADAS) > MAX_COLUNAS_XLSX:
+        raise ValueError(f"UCs demais para a matriz Aluno x UC: {len(ucs)}.")
+
+    numeros, texto = _separar(consolidado)
+    validas = (linha_aluno >= 0) & (coluna_uc >= 0)
+
+    notas = np.full((len(alunos), len(ucs)), np.nan)
+    com_nota = validas & ~np.isnan(numeros)
+    np.fmax.at(notas, (linha_aluno[com_nota], coluna_uc[com_nota]), numeros[com_nota])
+
+    textos: dict[tuple[int, int], str] = {}
+    com_texto = validas & texto.notna().to_numpy()
+    if com_texto.any():
+        linhas = linha_aluno[com_texto]
+        colunas = coluna_uc[com_texto]
+        for linha, coluna, valor in zip(linhas, colunas, texto[com_texto]):
+            if np.isnan(notas[linha, coluna]):
+                textos.setdefault((int(linha), int(coluna)), str(valor))
+
+    return MatrizAlunos(alunos=alunos, ucs=ucs, notas=notas, textos=textos)
+
+
+def _separar(consolidado: pd.DataFrame) -> tuple[np.ndarray, pd.Series]:
+    """Nota numérica (float, NaN quando não há) e o texto de 'Total do Curso' de cada linha."""
+    total = consolidado[COL_TOTAL]
+    if COL_TOTAL_TEXTO in consolidado.columns:
+        return total.to_numpy(dtype="float64", na_value=np.nan), consolidado[COL_TOTAL_TEXTO].reset_index(drop=True)
+
+    eh_texto = total.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    numeros = pd.to_numeric(total.where(~eh_texto), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return numeros, total.where(eh_texto).reset_index(drop=True)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+import time
+from typing import Callable, Iterator, Union
+
+ETAPA_CONCAT = "concat"
+ETAPA_ESCRITA = "escrita"
+ETAPA_EXPORTACAO = "exportacao"
+ETAPA_FORMATACAO = "formatacao"
+ETAPA_MATRIZ = "matriz"
+ETAPA_VALIDACAO = "validacao"
+
+NOMES_ETAPAS = {
+    ETAPA_VALIDACAO: "Validação dos cabeçalhos",
+    ETAPA_CONCAT: "Concatenação",
+    ETAPA_ESCRITA: "Escrita do xlsx",
+    ETAPA_FORMATACAO: "Formatação (formatar_worksheet)",
+    ETAPA_EXPORTACAO: "Saídas colunares",
+    ETAPA_MATRIZ: "Matriz Aluno x UC",
+}
+
+
+@dataclass(frozen=True)
+class MetricaArquivo:
+    """Tempo de leitura/transformação, linhas e tamanho de um relatório."""
+
+    arquivo: str
+    leitura_s: float
+    transformacao_s: float
+    linhas: int
+    bytes_arquivo: int
+    bytes_memoria: int
+    cache: bool = False
+
+
+@dataclass(frozen=True)
+class MetricaEtapa:
+    """Tempo de uma etapa da gravação (ver ETAPA_*)."""
+
+    etapa: str
+    duracao_s: float
+
+
+@dataclass(frozen=True)
+class MetricaMemoria:
+    """Pico de memória alocada pelo Python no processo principal (tracemalloc)."""
+
+    pico_bytes: int
+
+
+Metrica = Union[MetricaArquivo, MetricaEtapa, MetricaMemoria]
+MetricsCallback = Callable[[Metrica], None]
+
+
+@contextmanager
+def medir_etapa(etapa: str, callback: MetricsCallback | None) -> Iterator[None]:
+    """Envia uma MetricaEtapa com a duração do bloco, se houver callback."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if callback:
+            callback(MetricaEtapa(etapa, time.perf_counter() - inicio))
+
+
+class ColetorMetricas:
+    """Acumula as métricas de uma execução; pode ser passado direto como metrics_callback."""
+
+    CAMPOS_CSV = (
+        "tipo",
+        "nome",
+        "leitura_s",
+        "transformacao_s",
+        "duracao_s",
+        "linhas",
+        "bytes_arquivo",
+        "bytes_memoria",
+        "cache",
+    )
+
+    def __init__(self) -> None:
+        self.arquivos: list[MetricaArquivo] = []
+        self.etapas: dict[str, float] = {}
+        self.pico_memoria_bytes: int | None = None
+
+    def __call__(self, metrica: Metrica) -> None:
+        if isinstance(metrica, MetricaArquivo):
+            self.arquivos.append(metrica)
+        elif isinstance(metrica, MetricaEtapa):
+            self.etapas[metrica.etapa] = self.etapas.get(metrica.etapa, 0.0) + metrica.duracao_s
+        elif isinstance(metrica, MetricaMemoria):
+            self.pico_memoria_bytes = metrica.pico_bytes
+
+    @property
+    def vazio(self) -> bool:
+        return not (self.arquivos or self.etapas or self.pico_memoria_bytes is not None)
+
+    def resumo(self, mais_lentos: int = 5) -> list[tuple[str, str, str, str]]:
+        """Linhas (item, tempo, linhas, tamanho) já formatadas para exibição."""
+        linhas: list[tuple[str, str, str, str]] = []
+        total_linhas = sum(m.linhas for m in self.arquivos)
+        total_bytes = sum(m.bytes_arquivo for m in self.arquivos)
+        linhas.append(
+            (
+                f"Leitura ({len(self.arquivos)} arquivos)",
+                _segundos(sum(m.leitura_s for m in self.arquivos)),
+                str(total_linhas),
+                _tamanho(total_bytes),
+            )
+        )
+        linhas.append(("Transformação", _segundos(sum(m.transformacao_s for m in self.arquivos)), "", ""))
+        for etapa, duracao in self.etapas.items():
+            linhas.append((NOMES_ETAPAS.get(etapa, etapa), _segundos(duracao), "", ""))
+        if self.pico_memoria_bytes is not None:
+            linhas.append(("Pico de memória", "", "", _tamanho(self.pico_memoria_bytes)))
+
+        lentos = sorted(self.arquivos, key=lambda m: m.leitura_s + m.transformacao_s, reverse=True)
+        for m in lentos[:mais_lentos]:
+            linhas.append(
+                (
+                    f"  {m.arquivo}" + (" (cache)" if m.cache else ""),
+                    _segundos(m.leitura_s + m.transformacao_s),
+                    str(m.linhas),
+                    _tamanho(m.bytes_arquivo),
+                )
+            )
+        return linhas
+
+    def exportar_csv(self, destino: str | Path) -> None:
+        with open(destino, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.DictWriter(f, fieldnames=self.CAMPOS_CSV)
+            escritor.writeheader()
+            for m in self.arquivos:
+                escritor.writerow(
+                    {
+                        "tipo": "arquivo",
+                        "nome": m.arquivo,
+                        "leitura_s": f"{m.leitura_s:.6f}",
+                        "transformacao_s": f"{m.transformacao_s:.6f}",
+                        "duracao_s": f"{m.leitura_s + m.transformacao_s:.6f}",
+                        "linhas": m.linhas,
+                        "bytes_arquivo": m.bytes_arquivo,
+                        "bytes_memoria": m.bytes_memoria,
+                        "cache": int(m.cache),
+                    }
+                )
+            for etapa, duracao in self.etapas.items():
+                escritor.writerow({"tipo": "etapa", "nome": etapa, "duracao_s": f"{duracao:.6f}"})
+            if self.pico_memoria_bytes is not None:
+                escritor.writerow({"tipo": "memoria", "nome": "pico", "bytes_memoria": self.pico_memoria_bytes})
+
+
+def _segundos(valor: float) -> str:
+    return f"{valor:.3f} s"
+
+
+def _tamanho(valor: int) -> str:
+    if valor < 1024:
+        return f"{valor} B"
+    for unidade in ("KB", "MB"):
+        valor /= 1024
+        if valor < 1024:
+            return f"{valor:.1f} {unidade}"
+    return f"{valor / 1024:.1f} GB"
@@ -0,0 +1,340 @@
+"""
+Monitoramento de pasta do consolidador de notas.
+
+A pasta é varrida periodicamente (polling, sem depender de inotify/FSEvents).
+Quando relatórios são adicionados, alterados ou removidos, só eles são lidos
+de novo e só as abas correspondentes (modo por UC) ou os blocos de linhas
+correspondentes (aba "Consolidado") são reescritos. A planilha fica em
+memória entre as atualizações e é gravada a cada mudança.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import stat
+import threading
+import time
+from typing import Callable, Iterable, Sequence
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.formatting import ConditionalFormattingList
+from openpyxl.utils import get_column_letter
+
+from .cache import LIMITE_CACHE_PADRAO_MB
+from .destinos import nomes_abas
+from .entradas import eh_relatorio
+from .escrita import valor_excel
+from .formatacao import (
+    ESTILO_CABECALHO,
+    adicionar_regras_total,
+    calcular_larguras,
+    formatar_linhas,
+    formatar_worksheet,
+    registrar_estilos,
+)
+from .ingestao import LeitorRelatorios, para_planilha, tipos_concatenados
+
+INTERVALO_PADRAO_S = 2.0
+ESPERA_PADRAO_S = 3.0
+
+# (data de modificação em ns, tamanho em bytes)
+Assinatura = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Mudancas:
+    """Diferença entre duas varreduras da pasta."""
+
+    novos: tuple[str, ...] = ()
+    alterados: tuple[str, ...] = ()
+    removidos: tuple[str, ...] = ()
+
+    @property
+    def vazia(self) -> bool:
+        return not (self.novos or self.alterados or self.removidos)
+
+    def descrever(self) -> str:
+        return (
+            f"{len(self.novos)} novo(s), {len(self.alterados)} alterado(s), "
+            f"{len(self.removidos)} removido(s)"
+        )
+
+
+def varrer_pasta(pasta: str | Path, ignorar: Iterable[str | Path] = ()) -> dict[str, Assinatura]:
+    """Relatórios da pasta (recursivo, em ordem) com a assinatura de cada um."""
+    ignorados = {os.path.abspath(caminho) for caminho in ignorar}
+    encontrados: dict[str, Assinatura] = {}
+    for caminho in sorted(Path(pasta).rglob("*")):
+        if not eh_relatorio(caminho) or os.path.abspath(caminho) in ignorados:
+            continue
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            # Removido entre a listagem e o stat.
+            continue
+        if stat.S_ISREG(info.st_mode):
+            encontrados[str(caminho)] = (info.st_mtime_ns, info.st_size)
+    return encontrados
+
+
+def comparar_varreduras(anterior: dict[str, Assinatura], atual: dict[str, Assinatura]) -> Mudancas:
+    return Mudancas(
+        novos=tuple(c for c in atual if c not in anterior),
+        alterados=tuple(c for c in atual if c in anterior and atual[c] != anterior[c]),
+        removidos=tuple(c for c in anterior if c not in atual),
+    )
+
+
+class MonitorPasta:
+    """
+    Mantém `arquivo_saida` sincronizado com os relatórios de `pasta`.
+
+    `verificar()` faz uma varredura. A primeira gera a planilha completa; as
+    seguintes só aplicam mudanças depois que a pasta passa `espera_s` sem
+    novas alterações, então uma cópia de vários arquivos vira uma única
+    atualização. `executar()` repete a verificação a cada `intervalo_s` até
+    `parar` ser sinalizado.
+    """
+
+    def __init__(
+        self,
+        pasta: str | Path,
+        arquivo_saida: str | Path,
+        *,
+        dividir_por_uc: bool = False,
+        manter_nome_original: bool = False,
+        intervalo_s: float = INTERVALO_PADRAO_S,
+        espera_s: float = ESPERA_PADRAO_S,
+        max_workers: int | None = 1,
+        cache_dir: str | Path | None = None,
+        cache_limite_mb: int = LIMITE_CACHE_PADRAO_MB,
+        log_callback: Callable[[str], None] | None = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.pasta = Path(pasta)
+        self.arquivo_saida = Path(arquivo_saida)
+        self.dividir_por_uc = dividir_por_uc
+        self.manter_nome_original = manter_nome_original
+        self.intervalo_s = intervalo_s
+        self.espera_s = espera_s
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache_limite_mb = cache_limite_mb
+        self.log_callback = log_callback
+        self._relogio = relogio
+
+        self._visto: dict[str, Assinatura] | None = None
+        self._ultima_mudanca = 0.0
+        self._aplicado: dict[str, Assinatura] = {}
+        self._relatorios: dict[str, pd.DataFrame] = {}
+        self._wb: Workbook | None = None
+        # Modo por UC: aba de cada relatório.
+        self._abas: dict[str, str] = {}
+        # Modo Consolidado: (relatório, linhas) na ordem em que aparecem na aba.
+        self._blocos: list[tuple[str, int]] = []
+        self._gravacao_pendente = False
+
+    def _log(self, mensagem: str) -> None:
+        if self.log_callback:
+            self.log_callback(mensagem)
+
+    def verificar(self) -> Mudancas | None:
+        """Faz uma varredura e devolve as mudanças aplicadas, se houver."""
+        agora = self._relogio()
+        atual = varrer_pasta(self.pasta, ignorar=[self.arquivo_saida])
+        primeira = self._visto is None
+        if atual != self._visto:
+            self._visto = atual
+            self._ultima_mudanca = agora
+
+        if self._gravacao_pendente:
+            self._salvar()
+
+        if not primeira and (atual == self._aplicado or agora - self._ultima_mudanca < self.espera_s):
+            return None
+
+        mudancas = comparar_varreduras(self._aplicado, atual)
+        self.aplicar(mudancas, atual)
+        return mudancas
+
+    def executar(self, parar: threading.Event | None = None) -> None:
+        """Verifica a pasta a cada `intervalo_s` até `parar` ser sinalizado."""
+        parar = parar or threading.Event()
+        self._log(f"Monitorando {self.pasta} (varredura a cada {self.intervalo_s:g} s).")
+        while not parar.is_set():
+            try:
+                self.verificar()
+            except Exception as e:
+                # Um erro de gravação (planilha aberta no Excel, disco cheio)
+                # não encerra o monitoramento; a próxima varredura tenta de novo.
+                self._log(f"Erro: {e}")
+            parar.wait(self.intervalo_s)
+
+    def aplicar(self, mudancas: Mudancas, atual: dict[str, Assinatura]) -> None:
+        """Relê os relatórios novos/alterados e reescreve só as partes afetadas da planilha."""
+        if not mudancas.vazia:
+            self._log(f"Mudanças detectadas: {mudancas.descrever()}.")
+
+        afetados = set(mudancas.removidos)
+        for caminho in mudancas.removidos:
+            self._relatorios.pop(caminho, None)
+
+        for caminho, df_final in self._ler([*mudancas.novos, *mudancas.alterados]).items():
+            afetados.add(caminho)
+            if df_final is None:
+                self._relatorios.pop(caminho, None)
+            else:
+                self._relatorios[caminho] = df_final
+        # Arquivos que falharam também contam como aplicados: só são relidos quando mudarem de novo.
+        self._aplicado = atual
+
+        ordem = [caminho for caminho in atual if caminho in self._relatorios]
+        if not ordem:
+            self._log("Nenhuma linha gerada; a planilha de saída não foi alterada.")
+            return
+        if self._wb is not None and not afetados:
+            return
+
+        if self._wb is None:
+            self._wb = Workbook()
+            self._wb.remove(self._wb.active)
+        if self.dividir_por_uc:
+            self._atualizar_abas(ordem, afetados)
+        else:
+            self._atualizar_consolidado(ordem, afetados)
+        self._salvar()
+
+    def _ler(self, caminhos: Sequence[str]) -> dict[str, pd.DataFrame | None]:
+        """Linhas de cada relatório lido; None para os que não têm linhas de dados."""
+        lidos: dict[str, pd.DataFrame | None] = {}
+        if not caminhos:
+            return lidos
+        try:
+            lidos.update(self._ler_lote(caminhos, self.max_workers))
+        except Exception:
+            # Um arquivo com problema (ex.: ainda sendo copiado) não pode parar o
+            # monitoramento: os restantes são lidos um a um para isolar o erro.
+            for caminho in caminhos:
+                if caminho in lidos:
+                    continue
+                try:
+                    lidos.update(self._ler_lote([caminho], 1))
+                except Exception as e:
+                    self._log(f"Erro ao ler {Path(caminho).name}: {e}. Mantida a versão anterior.")
+        return lidos
+
+    def _ler_lote(self, caminhos: Sequence[str], max_workers: int | None) -> dict[str, pd.DataFrame | None]:
+        leitor = LeitorRelatorios(
+            caminhos,
+            max_workers=max_workers,
+            cache_dir=self.cache_dir,
+            cache_limite_mb=self.cache_limite_mb,
+            log_callback=self.log_callback,
+        )
+        # O leitor não entrega relatórios vazios: os que faltarem no fim ficam sem linhas.
+        lidos: dict[str, pd.DataFrame | None] = {lido.caminho: lido.df_final for lido in leitor}
+        return {caminho: lidos.get(caminho) for caminho in caminhos}
+
+    def _atualizar_abas(self, ordem: list[str], afetados: set[str]) -> None:
+        wb = self._wb
+        dfs = [self._relatorios[caminho] for caminho in ordem]
+        nomes = dict(zip(ordem, nomes_abas(dfs, self.manter_nome_original)))
+
+        for caminho in [c for c in self._abas if c not in nomes or c in afetados]:
+            wb.remove(wb[self._abas.pop(caminho)])
+
+        # Uma aba pode mudar de nome quando outra com a mesma UC entra ou sai
+        # (sufixos _1, _2...). Renomeia em duas etapas para não colidir com um
+        # nome ainda em uso; o conteúdo não é reescrito.
+        renomear = [c for c, nome in self._abas.items() if nomes[c] != nome]
+        for i, caminho in enumerate(renomear):
+            wb[self._abas[caminho]].title = self._abas[caminho] = f"__renomeando_{i}"
+        for caminho in renomear:
+            wb[self._abas[caminho]].title = self._abas[caminho] = nomes[caminho]
+
+        for caminho in ordem:
+            if caminho in self._abas:
+                continue
+            df_aba = para_planilha(self._relatorios[caminho]).drop(columns=["UC / Relatório"])
+            ws = wb.create_sheet(nomes[caminho])
+            ws.append(list(df_aba.columns))
+            for valores in df_aba.itertuples(index=False, name=None):
+                ws.append([valor_excel(valor) for valor in valores])
+            formatar_worksheet(ws, df_aba)
+            self._abas[caminho] = nomes[caminho]
+            self._log(f"Aba atualizada: {nomes[caminho]}")
+
+        for posicao, caminho in enumerate(ordem):
+            ws = wb[self._abas[caminho]]
+            wb.move_sheet(ws, posicao - wb.index(ws))
+        wb.active = 0
+
+    def _atualizar_consolidado(self, ordem: list[str], afetados: set[str]) -> None:
+        wb = self._wb
+        dfs = [para_planilha(self._relatorios[caminho]) for caminho in ordem]
+        planilhas = dict(zip(ordem, dfs))
+        colunas = list(dfs[0].columns)
+        if "Consolidado" not in wb.sheetnames:
+            ws = wb.create_sheet("Consolidado")
+            ws.append(colunas)
+            registrar_estilos(wb)
+            for cell in ws[1]:
+                cell.style = ESTILO_CABECALHO
+        ws = wb["Consolidado"]
+
+        # Só o trecho entre o primeiro e o último bloco afetado é reescrito;
+        # os blocos antes dele ficam intactos e os depois são apenas deslocados.
+        antigos = self._blocos
+        novos = [(caminho, len(df)) for caminho, df in zip(ordem, dfs)]
+
+        def intacto(antigo: tuple[str, int], novo: tuple[str, int]) -> bool:
+            return antigo == novo and antigo[0] not in afetados
+
+        limite = min(len(antigos), len(novos))
+        inicio = 0
+        while inicio < limite and intacto(antigos[inicio], novos[inicio]):
+            inicio += 1
+        fim = 0
+        while fim < limite - inicio and intacto(antigos[-1 - fim], novos[-1 - fim]):
+            fim += 1
+
+        linha = 2 + sum(n for _, n in antigos[:inicio])
+        qtd_antiga = sum(n for _, n in antigos[inicio:len(antigos) - fim])
+        reescritos = novos[inicio:len(novos) - fim]
+        qtd_nova = sum(n for _, n in reescritos)
+        if qtd_nova > qtd_antiga:
+            ws.insert_rows(linha + qtd_antiga, qtd_nova - qtd_antiga)
+        elif qtd_nova < qtd_antiga:
+            ws.delete_rows(linha + qtd_nova, qtd_antiga - qtd_nova)
+
+        # Mesmos tipos que o pd.concat da gravação completa daria.
+        tipos = tipos_concatenados(dfs)
+        atual = linha
+        for caminho, _ in reescritos:
+            for valores in planilhas[caminho].astype(tipos).itertuples(index=False, name=None):
+                for col_idx, valor in enumerate(valores, start=1):
+                    ws.cell(row=atual, column=col_idx, value=valor_excel(valor))
+                atual += 1
+        formatar_linhas(ws, linha, linha + qtd_nova - 1)
+        self._blocos = novos
+        if reescritos or qtd_antiga:
+            self._log(f"Linhas reescritas: {qtd_nova} (de {linha} a {linha + qtd_nova - 1}).")
+
+        # Larguras e regras condicionais dependem da aba inteira.
+        larguras = [max(col) for col in zip(*(calcular_larguras(df.astype(tipos)) for df in dfs))]
+        for col_idx, largura in enumerate(larguras, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = largura
+        ws.conditional_formatting = ConditionalFormattingList()
+        adicionar_regras_total(ws, colunas.index("Total do Curso") + 1, 1 + sum(n for _, n in novos))
+
+    def _salvar(self) -> None:
+        # Grava em um temporário e troca de uma vez: quem abrir a planilha
+        # durante a gravação vê a versão anterior, nunca um arquivo pela metade.
+        self._gravacao_pendente = True
+        temporario = self.arquivo_saida.with_name(f".~{self.arquivo_saida.name}.tmp")
+        self._wb.save(temporario)
+        os.replace(temporario, self.arquivo_saida)
+        self._gravacao_pendente = False
+        self._log(f"Arquivo atualizado: {self.arquivo_saida}")
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import groupby
+from pathlib import Path
+import re
+from typing import Sequence
+
+import pandas as pd
+
+from .escrita import EscritorXlsxStreaming, gravar_substituindo
+from .formatacao import adicionar_regras_notas, calcular_larguras, formatar_worksheet
+
+# Linhas de uma planilha do Excel; a primeira é o cabeçalho.
+LIMITE_LINHAS_XLSX = 1_048_576
+LINHAS_DADOS_XLSX = LIMITE_LINHAS_XLSX - 1
+
+ABA_INDICE = "Índice"
+COLUNAS_INDICE = ("Arquivo", "Aba", "UC / Relatório", "Linha inicial", "Linha final", "Linhas")
+
+
+@dataclass(frozen=True)
+class Trecho:
+    """Linhas `inicio`..`fim` (exclusivo) do relatório `parte` da lista consolidada."""
+
+    uc: str
+    parte: int
+    inicio: int
+    fim: int
+
+    @property
+    def linhas(self) -> int:
+        return self.fim - self.inicio
+
+
+@dataclass
+class AbaParticao:
+    nome: str
+    trechos: list[Trecho] = field(default_factory=list)
+
+    @property
+    def linhas(self) -> int:
+        return sum(trecho.linhas for trecho in self.trechos)
+
+
+@dataclass
+class ArquivoParticao:
+    caminho: Path
+    abas: list[AbaParticao] = field(default_factory=list)
+
+    @property
+    def linhas(self) -> int:
+        return sum(aba.linhas for aba in self.abas)
+
+
+def planejar_particao(
+    tamanhos: Sequence[tuple[str, int]],
+    arquivo_saida: str | Path,
+    linhas_por_aba: int | None = None,
+    linhas_por_arquivo: int | None = None,
+) -> list[ArquivoParticao]:
+    """
+    Distribui os relatórios (UC, linhas) em abas e arquivos sem passar dos limites.
+
+    As linhas ficam na ordem de entrada, a mesma do consolidado sem divisão.
+    Uma aba nova começa entre dois relatórios: relatórios seguidos da mesma
+    UC vão juntos para a aba seguinte quando não cabem no que resta da atual,
+    e só são divididos quando sozinhos passam do limite de uma aba. Com um
+    único arquivo ele é o próprio `arquivo_saida`; com vários, as partes se
+    chamam <nome>_parte01.xlsx, <nome>_parte02.xlsx...
+    """
+    por_aba = min(linhas_por_aba or LINHAS_DADOS_XLSX, LINHAS_DADOS_XLSX)
+    por_arquivo = linhas_por_arquivo or None
+    if por_aba < 1 or (por_arquivo is not None and por_arquivo < 1):
+        raise ValueError("Os limites de linhas por aba e por arquivo devem ser positivos.")
+    if por_arquivo is not None:
+        por_aba = min(por_aba, por_arquivo)
+
+    # Sequências de relatórios seguidos da mesma UC, na ordem de entrada.
+    grupos = [
+        (uc, [idx for idx, _ in grupo])
+        for uc, grupo in groupby(enumerate(tamanhos), key=lambda item: item[1][0])
+    ]
+
+    arquivos: list[list[list[Trecho]]] = [[[]]]
+    linhas_aba = 0
+    linhas_arquivo = 0
+
+    def nova_aba(novo_arquivo: bool) -> None:
+        nonlocal linhas_aba, linhas_arquivo
+        if novo_arquivo:
+            arquivos.append([[]])
+            linhas_arquivo = 0
+        else:
+            arquivos[-1].append([])
+        linhas_aba = 0
+
+    for uc, indices in grupos:
+        total_uc = sum(tamanhos[idx][1] for idx in indices)
+        if linhas_aba and linhas_aba + total_uc > por_aba:
+            nova_aba(por_arquivo is not None and linhas_arquivo + total_uc > por_arquivo)
+        elif linhas_arquivo and por_arquivo is not None and linhas_arquivo + total_uc > por_arquivo:
+            nova_aba(True)
+
+        for idx in indices:
+            inicio, total = 0, tamanhos[idx][1]
+            while inicio < total:
+                if linhas_aba >= por_aba:
+                    nova_aba(por_arquivo is not None and linhas_arquivo >= por_arquivo)
+                elif por_arquivo is not None and linhas_arquivo >= por_arquivo:
+                    nova_aba(True)
+                cabe = por_aba - linhas_aba
+                if por_arquivo is not None:
+                    cabe = min(cabe, por_arquivo - linhas_arquivo)
+                fim = min(total, inicio + cabe)
+                arquivos[-1][-1].append(Trecho(uc, idx, inicio, fim))
+                linhas_aba += fim - inicio
+                linhas_arquivo += fim - inicio
+                inicio = fim
+
+    arquivos = [[trechos for trechos in abas if trechos] for abas in arquivos]
+    arquivos = [abas for abas in arquivos if abas]
+    saida = Path(arquivo_saida)
+    varios_arquivos = len(arquivos) > 1
+    largura = max(2, len(str(len(arquivos))))
+    total_abas = sum(len(abas) for abas in arquivos)
+    plano: list[ArquivoParticao] = []
+    numero_aba = 0
+    for numero, abas in enumerate(arquivos, start=1):
+        caminho = saida.with_name(f"{saida.stem}_parte{numero:0{largura}d}{saida.suffix}") if varios_arquivos else saida
+        arquivo = ArquivoParticao(caminho)
+        for trechos in abas:
+            numero_aba += 1
+            nome = "Consolidado" if total_abas == 1 else f"Consolidado_{numero_aba}"
+            arquivo.abas.append(AbaParticao(nome, trechos))
+        plano.append(arquivo)
+    return plano
+
+
+def partes_obsoletas(arquivo_saida: str | Path, plano: Sequence[ArquivoParticao]) -> list[Path]:
+    """
+    Arquivos <nome>_parteNN.xlsx ao lado da saída que não pertencem a `plano`,
+    ex.: sobras de uma execução anterior dividida em mais partes.
+    """
+    saida = Path(arquivo_saida)
+    padrao = re.compile(rf"{re.escape(saida.stem)}_parte\d+{re.escape(saida.suffix)}", re.IGNORECASE)
+    atuais = {Path(arquivo.caminho).name.lower() for arquivo in plano}
+    if not saida.parent.is_dir():
+        return []
+    return sorted(
+        caminho
+        for caminho in saida.parent.iterdir()
+        if padrao.fullmatch(caminho.name) and caminho.name.lower() not in atuais and caminho.is_file()
+    )
+
+
+def tabela_indice(plano: Sequence[ArquivoParticao]) -> pd.DataFrame:
+    """Uma linha por UC em cada aba, com as linhas da planilha (cabeçalho = linha 1)."""
+    registros = []
+    for arquivo in plano:
+        for aba in arquivo.abas:
+            linha = 2
+            for trecho in aba.trechos:
+                if registros and registros[-1][:3] == [arquivo.caminho.name, aba.nome, trecho.uc]:
+                    # Relatórios seguidos da mesma UC viram uma única linha no índice.
+                    registros[-1][4] += trecho.linhas
+                    registros[-1][5] += trecho.linhas
+                else:
+                    registros.append(
+                        [arquivo.caminho.name, aba.nome, trecho.uc, linha, linha + trecho.linhas - 1, trecho.linhas]
+                    )
+                linha += trecho.linhas
+    return pd.DataFrame(registros, columns=list(COLUNAS_INDICE))
+
+
+AbaGravacao = tuple[str, pd.DataFrame, Sequence[str] | None]
+
+
+def gravar_arquivo_particao(
+    destino: str | Path,
+    abas: Sequence[AbaGravacao],
+    motor_escrita: str = "openpyxl",
+) -> str:
+    """
+    Grava um arquivo com as abas (nome, DataFrame já no formato da planilha,
+    colunas com as cores das notas ou None para só 'Total do Curso'),
+    formatadas como `formatar_worksheet`. Função de módulo para poder rodar em
+    outro processo.
+    """
+    if motor_escrita == "streaming":
+        with EscritorXlsxStreaming(destino) as escritor:
+            for nome, df, colunas_notas in abas:
+                escritor.abrir_aba(nome, list(df.columns), calcular_larguras(df), colunas_notas=colunas_notas)
+                escritor.escrever(df)
+    else:
+        with gravar_substituindo(destino) as temporario, pd.ExcelWriter(temporario, engine="openpyxl") as writer:
+            for nome, df, colunas_notas in abas:
+                df.to_excel(writer, sheet_name=nome, index=False)
+                ws = writer.sheets[nome]
+                formatar_worksheet(ws, df)
+                if colunas_notas is not None:
+                    notas = set(colunas_notas)
+                    indices = [idx for idx, coluna in enumerate(df.columns, start=1) if coluna in notas]
+                    adicionar_regras_notas(ws, indices, ws.max_row)
+    return str(destino)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+import cProfile
+from datetime import datetime
+from pathlib import Path
+import platform
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Callable
+
+FUNCOES_RESUMO_PADRAO = 30
+# O tracemalloc deixa o Python algumas vezes mais lento: as alocações são
+# rastreadas só em janelas curtas, uma a cada intervalo.
+INTERVALO_ALOCACOES_PADRAO_S = 2.0
+JANELA_ALOCACOES_S = 0.25
+# Caminhos da pilha abaixo desta fração do tempo total não entram nas pilhas colapsadas.
+FRACAO_MINIMA_PILHA = 1e-4
+
+Funcao = tuple[str, int, str]
+
+
+def caminhos_perfil(arquivo_saida: str | Path) -> tuple[Path, Path, Path]:
+    """(.prof do cProfile, pilhas colapsadas, resumo) ao lado da saída."""
+    saida = Path(arquivo_saida)
+    base = f"{saida.stem}_perfil"
+    return (
+        saida.with_name(f"{base}.prof"),
+        saida.with_name(f"{base}_pilhas.txt"),
+        saida.with_name(f"{base}_resumo.txt"),
+    )
+
+
+class PerfilExecucao:
+    """
+    Perfil de uma execução real, para diagnosticar lentidão sem pedir os
+    relatórios (confidenciais) de quem a relatou.
+
+    Enquanto ativo, mede com cProfile a thread que o iniciou e, com
+    `alocacoes`, liga o tracemalloc por JANELA_ALOCACOES_S a cada
+    `intervalo_alocacoes_s` e soma, por linha de código, a memória alocada
+    em cada janela que ainda estava em uso no fim dela. Se o tracemalloc já
+    estiver ligado por outro motivo (ex.: `medir_memoria`), não há amostras.
+    Ao encerrar grava, ao lado de `arquivo_saida` (ver `caminhos_perfil`):
+    o .prof (pstats, snakeviz...), as pilhas colapsadas para flamegraph.pl /
+    speedscope (peso em microssegundos) e um resumo com as `funcoes` mais
+    lentas. Os arquivos só têm nomes de funções e linhas de código, nada dos
+    relatórios. Também grava quando a execução falha ou é cancelada.
+
+    Leitura em processos paralelos não é medida por dentro: aparece como
+    espera na thread principal.
+    """
+
+    def __init__(
+        self,
+        arquivo_saida: str | Path,
+        *,
+        funcoes: int = FUNCOES_RESUMO_PADRAO,
+        alocacoes: bool = True,
+        intervalo_alocacoes_s: float = INTERVALO_ALOCACOES_PADRAO_S,
+        log_callback: Callable[[str], None] | None = None,
+    ):
+        if funcoes < 1 or intervalo_alocacoes_s <= 0:
+            raise ValueError("O perfil exige ao menos 1 função no resumo e intervalo positivo.")
+        self.arquivo_prof, self.arquivo_pilhas, self.arquivo_resumo = caminhos_perfil(arquivo_saida)
+        self.funcoes = funcoes
+        self.alocacoes = alocacoes
+        self.intervalo_alocacoes_s = intervalo_alocacoes_s
+        self.log_callback = log_callback
+        self.arquivos: list[str] = []
+        self._profiler: cProfile.Profile | None = None
+        self._parar = threading.Event()
+        self._amostrador: threading.Thread | None = None
+        self._amostras = 0
+        self._alocado_por_linha: Counter[str] = Counter()
+        self._blocos_por_linha: Counter[str] = Counter()
+        self._inicio = 0.0
+        self._duracao_s = 0.0
+
+    def __enter__(self) -> PerfilExecucao:
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.encerrar()
+
+    def iniciar(self) -> None:
+        if self.alocacoes:
+            self._amostrador = threading.Thread(target=self._amostrar_periodicamente, name="perfil-alocacoes", daemon=True)
+            self._amostrador.start()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Só um perfil por vez a partir do Python 3.12 (sys.monitoring).
+            if self.log_callback:
+                self.log_callback("Outro perfil já está ativo; esta execução segue sem o cProfile.")
+        else:
+            self._profiler = profiler
+        self._inicio = time.perf_counter()
+
+    def encerrar(self) -> None:
+        """Para a medição e grava os arquivos; falhas de gravação só vão para o log."""
+        self._duracao_s = time.perf_counter() - self._inicio
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._amostrador is not None:
+            self._parar.set()
+            self._amostrador.join()
+
+        stats = pstats.Stats(self._profiler).stats if self._profiler is not None else {}
+        try:
+            if self._profiler is not None:
+                self._profiler.dump_stats(self.arquivo_prof)
+                self.arquivos.append(str(self.arquivo_prof))
+                self.arquivo_pilhas.write_text(_texto_pilhas(stats), encoding="utf-8")
+                self.arquivos.append(str(self.arquivo_pilhas))
+            self.arquivo_resumo.write_text(self._texto_resumo(stats), encoding="utf-8")
+            self.arquivos.append(str(self.arquivo_resumo))
+        except OSError as e:
+            if self.log_callback:
+                self.log_callback(f"Não foi possível gravar o perfil de desempenho: {e}")
+            return
+        finally:
+            self._profiler = None
+        if self.log_callback:
+            self.log_callback(f"Perfil de desempenho gravado em: {self.arquivo_resumo.parent}")
+
+    def _amostrar_periodicamente(self) -> None:
+        while not self._parar.wait(self.intervalo_alocacoes_s):
+            if tracemalloc.is_tracing():
+                continue
+            tracemalloc.start()
+            try:
+                self._parar.wait(JANELA_ALOCACOES_S)
+                snapshot = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            for estatistica in snapshot.statistics("lineno"):
+                quadro = estatistica.traceback[0]
+                linha = f"{_caminho_curto(quadro.filename)}:{quadro.lineno}"
+                self._alocado_por_linha[linha] += estatistica.size
+                self._blocos_por_linha[linha] += estatistica.count
+            self._amostras += 1
+
+    def _texto_resumo(self, stats: dict) -> str:
+        linhas = [
+            "Perfil de desempenho do Consolidador de Notas",
+            f"Gerado em: {datetime.now():%Y-%m-%d %H:%M:%S}",
+            f"Python {platform.python_version()} ({platform.system()} {platform.release()}, {platform.machine()})",
+            f"Duração: {self._duracao_s:.2f} s",
+        ]
+        if self.alocacoes:
+            linhas.append(
+                f"Amostras de alocação: {self._amostras} (janelas de {JANELA_ALOCACOES_S:g} s "
+                f"a cada {self.intervalo_alocacoes_s:g} s)"
+                + ("; nenhuma: execução curta ou tracemalloc já em uso" if not self._amostras else "")
+            )
+        linhas.append("Só a thread que iniciou o perfil é medida; processos de leitura paralela aparecem como espera.")
+
+        if stats:
+            for titulo, indice in (("tempo próprio", 2), ("tempo acumulado", 3)):
+                linhas += ["", f"Funções com mais {titulo} (top {self.funcoes}):"]
+                linhas.append(f"{'próprio (s)':>12} {'acumulado (s)':>14} {'chamadas':>10}  função")
+                ordenadas = sorted(stats.items(), key=lambda item: item[1][indice], reverse=True)
+                for funcao, (_, chamadas, proprio, acumulado, _) in ordenadas[: self.funcoes]:
+                    linhas.append(f"{proprio:>12.3f} {acumulado:>14.3f} {chamadas:>10}  {_rotulo(funcao)}")
+
+        if self._alocado_por_linha:
+            linhas += ["", f"Linhas que mais alocaram memória nas amostras (top {self.funcoes}):"]
+            linhas.append(f"{'MB':>10} {'blocos':>10}  linha")
+            for linha, tamanho in self._alocado_por_linha.most_common(self.funcoes):
+                linhas.append(f"{tamanho / 1024 / 1024:>10.2f} {self._blocos_por_linha[linha]:>10}  {linha}")
+        return "\n".join(linhas) + "\n"
+
+
+def _texto_pilhas(stats: dict) -> str:
+    """
+    Pilhas colapsadas ("raiz;...;função microssegundos") reconstruídas do
+    grafo de chamadas do cProfile: o tempo de cada função é repartido entre
+    os caminhos na proporção do tempo que chegou por cada chamador.
+    """
+    chamados: dict[Funcao, dict[Funcao, tuple]] = defaultdict(dict)
+    for funcao, (_, _, _, _, chamadores) in stats.items():
+        for chamador, aresta in chamadores.items():
+            chamados[chamador][funcao] = aresta
+    raizes = [funcao for funcao, dados in stats.items() if not dados[4]]
+    limiar = max(sum(stats[raiz][3] for raiz in raizes) * FRACAO_MINIMA_PILHA, 1e-6)
+    pilhas: Counter[str] = Counter()
+
+    def visitar(funcao: Funcao, pilha: list[str], ativas: set[Funcao], proprio: float, acumulado: float) -> None:
+        pilha.append(_rotulo(funcao).replace(";", ","))
+        ativas.add(funcao)
+        total = stats[funcao][3]
+        fator = acumulado / total if total else 0.0
+        for chamado, (_, _, tempo_proprio, tempo_acumulado) in chamados.get(funcao, {}).items():
+            if chamado in ativas:
+                # Recursão: o tempo da chamada interna já está no acumulado da externa.
+                continue
+            if tempo_acumulado * fator >= limiar:
+                visitar(chamado, pilha, ativas, tempo_proprio * fator, tempo_acumulado * fator)
+            else:
+                # Caminhos curtos demais somam no chamador, para o total bater com a duração.
+                proprio += tempo_acumulado * fator
+        pilhas[";".join(pilha)] += round(proprio * 1_000_000)
+        ativas.discard(funcao)
+        pilha.pop()
+
+    for raiz in raizes:
+        if stats[raiz][3] >= limiar:
+            visitar(raiz, [], set(), stats[raiz][2], stats[raiz][3])
+    return "".join(f"{pilha} {peso}\n" for pilha, peso in pilhas.items() if peso > 0)
+
+
+def _rotulo(funcao: Funcao) -> str:
+    arquivo, linha, nome = funcao
+    if arquivo == "~":
+        # Funções embutidas: o nome já vem como "<built-in method ...>".
+        return nome
+    return f"{_caminho_curto(arquivo)}:{linha}({nome})"
+
+
+def _caminho_curto(arquivo: str) -> str:
+    """Pasta e arquivo, sem o começo do caminho (que pode ter o nome do usuário)."""
+    partes = Path(arquivo).parts
+    return "/".join(partes[-2:])
@@ -1,104 +1,36 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Iterable, Sequence
-
-import pandas as pd
-from openpyxl.formatting.rule import CellIsRule
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-
-
-def extrair_nome_uc(nome_arquivo: str) -> str:
-    """
-    Retorna somente o nome da UC (sem código e sem o sufixo 'Notas').
-    Exemplo: '1035754 - Banco de Dados Notas.xlsx' -> 'Banco de Dados'
-    """
-    base = Path(nome_arquivo).stem
-    if base.endswith(" Notas"):
-        base = base[:-6]
-    if " - " in base:
-        return base.split(" - ", 1)[1]
-    return base
-
-
-def formatar_worksheet(ws) -> None:
-    """
-    Formatação básica:
-    - Cabeçalho em negrito, fundo cinza claro, centralizado
-    - Bordas em toda a tabela
-    - Largura de colunas ajustada
-    - Formatação condicional em 'Total do Curso'
-    """
-    max_row = ws.max_row
-    max_col = ws.max_column
-
-    # Estilos básicos
-    header_font = Font(bold=True)
-    header_fill = PatternFill("solid", fgColor="DDDDDD")
-    header_align = Alignment(horizontal="center", vertical="center")
-    thin_side = Side(border_style="thin", color="000000")
-    border = Border(top=thin_side, left=thin_side, right=thin_side, bottom=thin_side)
-
-    # Cabeçalho
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_align
-        cell.border = border
-
-    # Bordas e alinhamento das linhas de dados
-    for row in ws.iter_rows(min_row=2, max_row=max_row, max_col=max_col):
-        for cell in row:
-            cell.border = border
-            if isinstance(cell.value, str):
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-            else:
-                cell.alignment = Alignment(horizontal="right", vertical="center")
-
-    # Ajuste de largura de colunas
-    for col_idx in range(1, max_col + 1):
-        col_letter = get_column_letter(col_idx)
-        max_len = 0
-        for row in range(1, max_row + 1):
-            cell = ws[f"{col_letter}{row}"]
-            value = "" if cell.value is None else str(cell.value)
-            max_len = max(max_len, len(value))
-        ws.column_dimensions[col_letter].width = max_len + 2
-
-    # Formatação condicional para 'Total do Curso'
-    total_col_idx = None
-    for cell in ws[1]:
-        if str(cell.value).strip() == "Total do Curso":
-            total_col_idx = cell.column
-            break
-
-    if total_col_idx and max_row >= 2:
-        col_letter = get_column_letter(total_col_idx)
-        cell_range = f"{col_letter}2:{col_letter}{max_row}"
-
-        regra_verde = CellIsRule(
-            operator="greaterThanOrEqual",
-            formula=["60"],
-            stopIfTrue=False,
-            fill=PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
-        )
-        regra_amarela = CellIsRule(
-            operator="between",
-            formula=["40", "59"],
-            stopIfTrue=False,
-            fill=PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid"),
-        )
-        regra_vermelha = CellIsRule(
-            operator="lessThan",
-            formula=["40"],
-            stopIfTrue=False,
-            fill=PatternFill(start_color="F2DCDB", end_color="F2DCDB", fill_type="solid"),
-        )
-
-        ws.conditional_formatting.add(cell_range, regra_verde)
-        ws.conditional_formatting.add(cell_range, regra_amarela)
-        ws.conditional_formatting.add(cell_range, regra_vermelha)
+import threading
+import tracemalloc
+from typing import Callable, Sequence
+
+from .antecipacao import LIMITE_ANTECIPACAO_PADRAO_MB, AbrirEntrada
+from .cache import LIMITE_CACHE_PADRAO_MB
+from .destinos import Destino, DestinoColunar, DestinoXlsx, alimentar_destinos
+# extrair_nome_uc e formatar_worksheet continuam importáveis daqui, como antes.
+from .entradas import abrir_entrada, extrair_nome_uc
+from .formatacao import formatar_worksheet
+from .ingestao import LeitorRelatorios
+from .metricas import MetricaMemoria, MetricsCallback
+from .perfil import PerfilExecucao
+
+
+@dataclass
+class ResumoProcessamento:
+    """Resultado de `processar_arquivos`."""
+
+    arquivo_saida: str
+    arquivos: int
+    linhas: int
+    abas: list[str] = field(default_factory=list)
+    arquivos_ignorados: list[str] = field(default_factory=list)
+    saidas_colunares: list[str] = field(default_factory=list)
+    partes: list[str] = field(default_factory=list)
+    arquivos_perfil: list[str] = field(default_factory=list)
 
 
 def processar_arquivos(
@@ -109,98 +41,182 @@ def processar_arquivos(
     manter_nome_original: bool = False,
     log_callback: Callable[[str], None] | None = None,
     progress_callback: Callable[[int, int], None] | None = None,
-) -> None:
+    max_workers: int | None = 1,
+    cache_dir: str | Path | None = None,
+    cache_limite_mb: int = LIMITE_CACHE_PADRAO_MB,
+    motor_escrita: str = "openpyxl",
+    cancelar: threading.Event | None = None,
+    metrics_callback: MetricsCallback | None = None,
+    medir_memoria: bool = False,
+    formatos_colunares: Sequence[str] = (),
+    gravar_xlsx: bool = True,
+    matriz_alunos: bool = False,
+    validar_antes: bool = False,
+    ignorar_invalidos: bool = False,
+    usar_diario: bool = False,
+    retomar: bool = True,
+    linhas_por_aba: int | None = None,
+    linhas_por_arquivo: int | None = None,
+    leitura_antecipada: int = 0,
+    limite_antecipacao_mb: int = LIMITE_ANTECIPACAO_PADRAO_MB,
+    abrir: AbrirEntrada = abrir_entrada,
+    executor: Executor | None = None,
+    perfil: bool = False,
+) -> ResumoProcessamento:
     """
     Consolida os relatórios em um único arquivo Excel.
 
+    Composição de `LeitorRelatorios` (leitura) com `DestinoColunar` e
+    `DestinoXlsx` (saídas); outras ferramentas podem combinar as mesmas peças.
+
     Args:
-        lista_arquivos: caminhos dos relatórios .xlsx/.ods.
+        lista_arquivos: caminhos dos relatórios .xlsx/.ods. Um .zip entra com
+            todos os relatórios que contém, lidos direto do arquivo compactado.
         arquivo_saida: caminho completo do arquivo consolidado.
         dividir_por_uc: cria uma aba por UC quando True.
         manter_nome_original: usa o nome do arquivo como nome da aba quando True.
         log_callback: função para registrar mensagens no UI.
         progress_callback: função para atualizar progresso (atual, total).
+        max_workers: quantidade de processos usados na leitura dos relatórios.
+            1 (padrão) lê em sequência; None usa todos os núcleos disponíveis.
+        cache_dir: pasta do cache de relatórios já lidos; None desativa o cache.
+        cache_limite_mb: tamanho máximo do cache antes de descartar os itens mais antigos.
+        motor_escrita: "openpyxl" monta a planilha em memória e formata no fim;
+            "streaming" grava linha a linha já formatada. Nele a memória não
+            cresce com o número de linhas: com `dividir_por_uc` cada relatório
+            vira uma aba assim que é lido; no 'Consolidado' os relatórios
+            esperam a gravação num arquivo temporário ao lado da saída. Com
+            `matriz_alunos` ou a divisão em abas/arquivos eles ficam em memória.
+        cancelar: evento verificado entre os arquivos; quando sinalizado, o
+            processamento para sem gravar a saída e levanta ProcessamentoCancelado.
+        metrics_callback: recebe métricas estruturadas (MetricaArquivo por
+            relatório, MetricaEtapa para concat/escrita/formatação e MetricaMemoria).
+        medir_memoria: mede o pico de memória com tracemalloc (deixa a execução
+            mais lenta; não inclui os processos de leitura paralela).
+        formatos_colunares: saídas extras gravadas ao lado da planilha à medida
+            que os relatórios são lidos ("parquet", "arrow", "csv"), sempre com
+            todas as linhas em uma única tabela.
+        gravar_xlsx: False pula a planilha (e sua formatação) quando só as
+            saídas colunares interessam; `arquivo_saida` ainda define o nome delas.
+        matriz_alunos: acrescenta a aba 'Alunos x UC', com uma linha por aluno
+            (nome comparado sem acentos, caixa ou espaços extras), o 'Total do
+            Curso' de cada UC em colunas e quantidade/média/mínima/máxima.
+        validar_antes: antes da leitura completa, confere o cabeçalho de todos
+            os relatórios (com os mesmos `max_workers`) e aponta de uma vez
+            arquivos ilegíveis, planilhas vazias, colunas ausentes e UCs repetidas.
+            Desligado por padrão, porque abre cada relatório uma vez a mais; a
+            interface e a linha de comando o ligam.
+        ignorar_invalidos: com `validar_antes`, pula os relatórios com problema
+            (listados em `arquivos_ignorados`) em vez de levantar RelatoriosInvalidos.
+        usar_diario: mantém, ao lado da saída, um diário com cada relatório já
+            lido (ver DiarioProcessamento), apagado quando a saída é gravada.
+            Desligado por padrão, porque grava uma cópia de cada relatório em
+            disco; a interface e a linha de comando o ligam.
+        retomar: com `usar_diario`, reaproveita o diário de uma execução
+            interrompida com as mesmas entradas e saída; False recomeça do zero.
+        linhas_por_aba / linhas_por_arquivo: divide o consolidado (sem
+            `dividir_por_uc`) em abas 'Consolidado_N' e, se preciso, em arquivos
+            <saida>_parteNN.xlsx gravados em paralelo (até `max_workers`). As
+            linhas mantêm a ordem do consolidado sem divisão e as quebras caem
+            entre relatórios, sem separar relatórios seguidos da mesma UC que
+            caibam numa aba. A saída ganha a aba 'Índice' com a UC de cada
+            aba/arquivo. Acima do limite de linhas do Excel a
+            divisão por aba acontece mesmo sem esses parâmetros.
+        leitura_antecipada: quantos arquivos seguintes têm os bytes lidos em
+            segundo plano enquanto o atual é interpretado (0 desativa). Para
+            entradas em compartilhamentos de rede lentos; cada arquivo é lido
+            uma vez só, também para a chave do cache.
+        limite_antecipacao_mb: memória máxima ocupada pelos arquivos lidos antecipadamente.
+        abrir: como a leitura antecipada abre os arquivos (padrão
+            `abrir_entrada`); ex.: `abrir_com_latencia` para simular um
+            compartilhamento de rede lento.
+        executor: pool de processos compartilhado (ex.: `pool_processos` do
+            agendador do app) usado na validação, na leitura e na gravação das
+            partes no lugar de um pool próprio, e que continua aberto no fim;
+            `max_workers` deve ser o tamanho dele.
+        perfil: grava ao lado da saída um perfil da execução (cProfile,
+            pilhas colapsadas para flamegraph e resumo com as funções mais
+            lentas e as linhas que mais alocam memória, sem estas com
+            `medir_memoria`; ver PerfilExecucao), mesmo quando ela falha ou é
+            cancelada.
+
+    Returns:
+        ResumoProcessamento com as abas geradas e a contagem de linhas.
     """
-    if not lista_arquivos:
-        raise FileNotFoundError("Nenhum arquivo selecionado.")
-
-    if log_callback:
-        log_callback(f"Total de arquivos selecionados: {len(lista_arquivos)}")
-
-    linhas_saida: list[pd.DataFrame] = []
-    total_arquivos = len(lista_arquivos)
-
-    for idx, caminho in enumerate(lista_arquivos, start=1):
-        arquivo = Path(caminho)
-        if log_callback:
-            log_callback(f"Processando: {arquivo.name}")
-
-        nome_uc = extrair_nome_uc(arquivo.name)
-        df = pd.read_excel(arquivo, sheet_name=0)
-
-        col_nome = "Nome"
-        col_sobrenome = "Sobrenome"
-        col_total_original = "Total do curso (Real)"
-
-        for col in (col_nome, col_sobrenome, col_total_original):
-            if col not in df.columns:
-                raise ValueError(f"Coluna obrigatória '{col}' não encontrada em: {arquivo.name}")
-
-        df["Aluno"] = df[col_nome].astype(str).str.strip() + " " + df[col_sobrenome].astype(str).str.strip()
-
-        df_final = df[["Aluno", col_total_original]].copy()
-        df_final = df_final.rename(columns={col_total_original: "Total do Curso"})
-        df_final["UC / Relatório"] = nome_uc
-
-        colunas_ordem = ["UC / Relatório", "Aluno", "Total do Curso"]
-        df_final = df_final[colunas_ordem]
-
-        if df_final.empty:
-            if log_callback:
-                log_callback(f"Nenhuma linha de dados em {arquivo.name}; arquivo ignorado.")
-            if progress_callback:
-                progress_callback(idx, total_arquivos)
-            continue
-
-        df_final.attrs["arquivo_origem"] = arquivo.name
-        linhas_saida.append(df_final)
-
-        if progress_callback:
-            progress_callback(idx, total_arquivos)
-
-    if not linhas_saida:
-        raise ValueError("Nenhuma linha gerada.")
-
-    with pd.ExcelWriter(arquivo_saida, engine="openpyxl") as writer:
-        if dividir_por_uc:
-            usados: dict[str, int] = {}
-            for df_final in linhas_saida:
-                nome_uc = df_final["UC / Relatório"].iloc[0]
-                base_name = (
-                    Path(df_final.attrs.get("arquivo_origem", nome_uc)).stem
-                    if manter_nome_original
-                    else nome_uc
+    if not gravar_xlsx and not formatos_colunares:
+        raise ValueError("Sem a planilha, informe ao menos um formato de saída colunar.")
+
+    if matriz_alunos and not gravar_xlsx:
+        raise ValueError("A matriz Aluno x UC é gravada na planilha; não é possível usá-la sem o xlsx.")
+
+    # O tracemalloc de `medir_memoria` liga antes do perfil, que então não amostra alocações.
+    iniciou_tracemalloc = medir_memoria and not tracemalloc.is_tracing()
+    if iniciou_tracemalloc:
+        tracemalloc.start()
+    contexto = PerfilExecucao(arquivo_saida, log_callback=log_callback) if perfil else nullcontext()
+    try:
+        with contexto as perfilador:
+            destinos: list[Destino] = []
+            colunar = None
+            if formatos_colunares:
+                colunar = DestinoColunar(
+                    arquivo_saida, formatos_colunares, log_callback=log_callback, metrics_callback=metrics_callback
                 )
-
-                contador = usados.get(base_name, 0)
-                if contador == 0:
-                    sheet_name = base_name[:31]
-                else:
-                    sufixo = f"_{contador}"
-                    sheet_name = f"{base_name[:31 - len(sufixo)]}{sufixo}"
-                usados[base_name] = contador + 1
-
-                df_final.drop(columns=["UC / Relatório"]).to_excel(
-                    writer, sheet_name=sheet_name, index=False
+                destinos.append(colunar)
+            xlsx = None
+            if gravar_xlsx:
+                xlsx = DestinoXlsx(
+                    arquivo_saida,
+                    dividir_por_uc=dividir_por_uc,
+                    manter_nome_original=manter_nome_original,
+                    motor_escrita=motor_escrita,
+                    matriz_alunos=matriz_alunos,
+                    linhas_por_aba=linhas_por_aba,
+                    linhas_por_arquivo=linhas_por_arquivo,
+                    max_workers=max_workers,
+                    log_callback=log_callback,
+                    metrics_callback=metrics_callback,
+                    executor=executor,
                 )
-                ws = writer.sheets[sheet_name]
-                formatar_worksheet(ws)
-        else:
-            df_saida = pd.concat(linhas_saida, ignore_index=True)
-            sheet_name = "Consolidado"
-            df_saida.to_excel(writer, sheet_name=sheet_name, index=False)
-            ws = writer.sheets[sheet_name]
-            formatar_worksheet(ws)
-
-    if log_callback:
-        log_callback(f"Arquivo gerado: {arquivo_saida}")
+                destinos.append(xlsx)
+
+            leitor = LeitorRelatorios(
+                lista_arquivos,
+                max_workers=max_workers,
+                cache_dir=cache_dir,
+                cache_limite_mb=cache_limite_mb,
+                validar_antes=validar_antes,
+                ignorar_invalidos=ignorar_invalidos,
+                arquivo_diario=arquivo_saida if usar_diario else None,
+                retomar=retomar,
+                leitura_antecipada=leitura_antecipada,
+                limite_antecipacao_mb=limite_antecipacao_mb,
+                abrir=abrir,
+                log_callback=log_callback,
+                progress_callback=progress_callback,
+                cancelar=cancelar,
+                metrics_callback=metrics_callback,
+                executor=executor,
+            )
+
+            linhas = alimentar_destinos(leitor, destinos)
+            leitor.concluir()
+            if medir_memoria and metrics_callback:
+                metrics_callback(MetricaMemoria(tracemalloc.get_traced_memory()[1]))
+
+            resumo = ResumoProcessamento(
+                arquivo_saida=str(arquivo_saida) if xlsx else "",
+                arquivos=len(leitor.arquivos),
+                linhas=linhas,
+                abas=xlsx.abas if xlsx else [],
+                arquivos_ignorados=leitor.ignorados,
+                saidas_colunares=colunar.arquivos if colunar else [],
+                partes=xlsx.partes if xlsx else [],
+            )
+    finally:
+        if iniciou_tracemalloc:
+            tracemalloc.stop()
+
+    if perfilador is not None:
+        resumo.arquivos_perfil = perfilador.arquivos
+    return resumo
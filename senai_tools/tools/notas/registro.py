@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+import shutil
+import tempfile
+
+LIMITE_HISTORICO_PADRAO = 5000
+
+
+class RegistroExecucao:
+    """
+    Log de execução com memória limitada.
+
+    - `historico`: só as últimas `limite_historico` mensagens (buffer circular);
+    - `pendentes()`: mensagens ainda não exibidas, entregues em lote para a UI;
+    - `arquivo`: log completo, gravado em disco conforme as mensagens chegam.
+    """
+
+    def __init__(self, limite_historico: int = LIMITE_HISTORICO_PADRAO, pasta: str | Path | None = None):
+        self.historico: deque[str] = deque(maxlen=limite_historico)
+        self._pendentes: deque[str] = deque(maxlen=limite_historico)
+        self.total = 0
+        fd, caminho = tempfile.mkstemp(prefix="senai_tools_log_", suffix=".txt", dir=pasta)
+        self.arquivo = Path(caminho)
+        self._saida = open(fd, "w", encoding="utf-8")
+
+    def registrar(self, mensagem: str) -> None:
+        self.historico.append(mensagem)
+        self._pendentes.append(mensagem)
+        self._saida.write(mensagem + "\n")
+        self.total += 1
+
+    def pendentes(self) -> list[str]:
+        """Retorna e esvazia as mensagens ainda não exibidas (no máximo `limite_historico`)."""
+        mensagens = list(self._pendentes)
+        self._pendentes.clear()
+        return mensagens
+
+    def limpar(self) -> None:
+        self.historico.clear()
+        self._pendentes.clear()
+        self.total = 0
+        self._saida.seek(0)
+        self._saida.truncate()
+
+    def exportar(self, destino: str | Path) -> None:
+        """Copia o log completo do disco para `destino`."""
+        self._saida.flush()
+        shutil.copyfile(self.arquivo, destino)
+
+    def fechar(self) -> None:
+        self._saida.close()
+        self.arquivo.unlink(missing_ok=True)
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+from senai_tools.agendador import (
+    ESTADO_AGUARDANDO,
+    EVENTO_CONCLUIDO,
+    EVENTO_LOG,
+    EVENTO_PROGRESSO,
+    Evento,
+    TarefaAgendada,
+    TarefaCancelada,
+    agendador_padrao,
+)
+
+from .cache import pasta_cache_padrao
+from .diario import verificar_diario
+from .ingestao import ProcessamentoCancelado
+from .metricas import ColetorMetricas
 from .processor import processar_arquivos
+from .registro import LIMITE_HISTORICO_PADRAO, RegistroExecucao
+
+# Intervalo entre leituras da fila de eventos (~ uma atualização por quadro de tela).
+INTERVALO_ATUALIZACAO_MS = 16
+# Cadência de inserção do log no widget e quantas linhas ele mantém visíveis.
+INTERVALO_LOG_MS = 100
+LIMITE_LINHAS_WIDGET = 2000
 
 
 class NotasConsolidadorFrame(ttk.Frame):
@@ -22,9 +45,20 @@ class NotasConsolidadorFrame(ttk.Frame):
         self.nome_arquivo_saida = tk.StringVar(value="notas_consolidadas.xlsx")
         self.dividir_por_uc = tk.BooleanVar(value=True)
         self.manter_nome_original = tk.BooleanVar(value=True)
+        self.matriz_alunos = tk.BooleanVar(value=False)
+        self.ignorar_invalidos = tk.BooleanVar(value=False)
+        self.processar_em_paralelo = tk.BooleanVar(value=False)
+        self.usar_cache = tk.BooleanVar(value=True)
+        self.medir_memoria = tk.BooleanVar(value=False)
+        self.gerar_perfil = tk.BooleanVar(value=False)
         self.progress_var = tk.DoubleVar(value=0)
         self.progress_total = 0
-        self.logs: list[str] = []
+        self.registro = RegistroExecucao(LIMITE_HISTORICO_PADRAO)
+        self._descarga_log_agendada = False
+        self._tarefa: TarefaAgendada | None = None
+        self._na_fila = False
+        self._caminho_saida: Path | None = None
+        self.metricas = ColetorMetricas()
 
         self._montar_layout()
 
@@ -76,37 +110,96 @@ class NotasConsolidadorFrame(ttk.Frame):
             variable=self.manter_nome_original,
         ).grid(row=5, column=0, columnspan=2, sticky="w", **padding_geral)
 
+        ttk.Checkbutton(
+            container,
+            text="Incluir aba 'Alunos x UC' (uma linha por aluno, uma coluna por UC)",
+            variable=self.matriz_alunos,
+        ).grid(row=6, column=0, columnspan=2, sticky="w", **padding_geral)
+
+        ttk.Checkbutton(
+            container,
+            text="Ignorar relatórios com problema no cabeçalho (em vez de interromper)",
+            variable=self.ignorar_invalidos,
+        ).grid(row=7, column=0, columnspan=2, sticky="w", **padding_geral)
+
+        ttk.Checkbutton(
+            container,
+            text="Ler relatórios em paralelo (pool de processos compartilhado do app)",
+            variable=self.processar_em_paralelo,
+        ).grid(row=8, column=0, columnspan=2, sticky="w", **padding_geral)
+
+        ttk.Checkbutton(
+            container,
+            text="Reaproveitar relatórios já lidos em execuções anteriores (cache)",
+            variable=self.usar_cache,
+        ).grid(row=9, column=0, columnspan=2, sticky="w", **padding_geral)
+
+        ttk.Checkbutton(
+            container,
+            text="Medir pico de memória (deixa o processamento mais lento)",
+            variable=self.medir_memoria,
+        ).grid(row=10, column=0, columnspan=2, sticky="w", **padding_geral)
+
+        ttk.Checkbutton(
+            container,
+            text="Gerar perfil de desempenho ao lado da saída (para enviar ao suporte, sem as notas)",
+            variable=self.gerar_perfil,
+        ).grid(row=11, column=0, columnspan=2, sticky="w", **padding_geral)
+
         # Nome arquivo saída
         ttk.Label(container, text="Nome do arquivo de saída (.xlsx):").grid(
-            row=6, column=0, sticky="w", **padding_geral
+            row=12, column=0, sticky="w", **padding_geral
         )
 
         ttk.Entry(container, textvariable=self.nome_arquivo_saida, width=60).grid(
-            row=7, column=0, sticky="we", **padding_geral
+            row=13, column=0, sticky="we", **padding_geral
         )
 
-        ttk.Button(container, text="Processar relatórios", command=self.on_processar).grid(
-            row=7, column=1, sticky="we", **padding_geral
+        frame_botoes = ttk.Frame(container)
+        frame_botoes.grid(row=13, column=1, sticky="we", **padding_geral)
+        self.btn_processar = ttk.Button(frame_botoes, text="Processar relatórios", command=self.on_processar)
+        self.btn_processar.pack(side="left", fill="x", expand=True)
+        self.btn_cancelar = ttk.Button(
+            frame_botoes, text="Cancelar", command=self.on_cancelar, state="disabled"
         )
+        self.btn_cancelar.pack(side="left", padx=(5, 0))
 
-        # Log
+        # Log e métricas
         ttk.Label(container, text="Log de execução:").grid(
-            row=8, column=0, sticky="w", **padding_geral
+            row=14, column=0, sticky="w", **padding_geral
         )
         ttk.Button(container, text="Exportar log", command=self.exportar_log).grid(
-            row=8, column=1, sticky="e", padx=(0, 10), pady=5
+            row=14, column=1, sticky="e", padx=(0, 10), pady=5
         )
 
-        self.txt_log = tk.Text(container, height=10, state="disabled", bg="#ffffff", relief="solid", bd=1)
-        self.txt_log.grid(row=9, column=0, columnspan=2, sticky="nsew", padx=10, pady=(0, 10))
+        self.abas_saida = ttk.Notebook(container)
+        self.abas_saida.grid(row=15, column=0, columnspan=3, sticky="nsew", padx=10, pady=(0, 10))
 
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.txt_log.yview)
-        scrollbar.grid(row=9, column=2, sticky="ns", pady=(0, 10))
+        aba_log = ttk.Frame(self.abas_saida)
+        self.abas_saida.add(aba_log, text="Log")
+        self.txt_log = tk.Text(aba_log, height=10, state="disabled", bg="#ffffff", relief="solid", bd=1)
+        self.txt_log.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(aba_log, orient="vertical", command=self.txt_log.yview)
+        scrollbar.pack(side="right", fill="y")
         self.txt_log["yscrollcommand"] = scrollbar.set
 
+        aba_metricas = ttk.Frame(self.abas_saida)
+        self.abas_saida.add(aba_metricas, text="Métricas")
+        self.tabela_metricas = ttk.Treeview(
+            aba_metricas, columns=("tempo", "linhas", "tamanho"), height=8, selectmode="none"
+        )
+        self.tabela_metricas.heading("#0", text="Etapa / arquivo", anchor="w")
+        self.tabela_metricas.heading("tempo", text="Tempo")
+        self.tabela_metricas.heading("linhas", text="Linhas")
+        self.tabela_metricas.heading("tamanho", text="Tamanho")
+        self.tabela_metricas.column("#0", width=320, stretch=True)
+        for coluna in ("tempo", "linhas", "tamanho"):
+            self.tabela_metricas.column(coluna, width=90, anchor="e", stretch=False)
+        self.tabela_metricas.pack(side="left", fill="both", expand=True)
+
         # Progresso
         frame_progress = ttk.Frame(container)
-        frame_progress.grid(row=10, column=0, columnspan=3, sticky="we", padx=10, pady=(0, 5))
+        frame_progress.grid(row=16, column=0, columnspan=3, sticky="we", padx=10, pady=(0, 5))
         ttk.Label(frame_progress, text="Progresso:").pack(side="left")
         self.lbl_prog_contador = ttk.Label(frame_progress, text="0/0")
         self.lbl_prog_contador.pack(side="right")
@@ -114,18 +207,19 @@ class NotasConsolidadorFrame(ttk.Frame):
         self.progressbar.pack(fill="x", expand=True, padx=(5, 5))
 
         self.lbl_status = ttk.Label(container, text="Pronto.", anchor="w")
-        self.lbl_status.grid(row=11, column=0, columnspan=3, sticky="we", padx=10, pady=(0, 5))
+        self.lbl_status.grid(row=17, column=0, columnspan=3, sticky="we", padx=10, pady=(0, 5))
 
-        container.rowconfigure(9, weight=1)
+        container.rowconfigure(15, weight=1)
         container.columnconfigure(0, weight=1)
 
     def selecionar_arquivos(self) -> None:
         caminhos = filedialog.askopenfilenames(
             title="Selecione os relatórios",
             filetypes=[
-                ("Planilhas Excel/ODS", "*.xlsx *.xls *.ods"),
+                ("Planilhas Excel/ODS e .zip", "*.xlsx *.xls *.ods *.zip"),
                 ("Excel (.xlsx)", "*.xlsx"),
                 ("ODS (.ods)", "*.ods"),
+                ("Arquivo compactado (.zip)", "*.zip"),
                 ("Todos os arquivos", "*.*"),
             ],
         )
@@ -137,12 +231,35 @@ class NotasConsolidadorFrame(ttk.Frame):
             self._set_status("Arquivos selecionados.")
 
     def log(self, mensagem: str) -> None:
-        self.logs.append(mensagem)
+        """Registra a mensagem; o widget é atualizado em lote a cada INTERVALO_LOG_MS."""
+        self.registro.registrar(mensagem)
+        if not self._descarga_log_agendada:
+            self._descarga_log_agendada = True
+            self.after(INTERVALO_LOG_MS, self._descarregar_log)
+
+    def _descarregar_log(self) -> None:
+        self._descarga_log_agendada = False
+        mensagens = self.registro.pendentes()
+        if not mensagens:
+            return
+
         self.txt_log.configure(state="normal")
-        self.txt_log.insert("end", mensagem + "\n")
+        self.txt_log.insert("end", "".join(m + "\n" for m in mensagens))
+        # Mantém no widget apenas as últimas linhas; o log completo está em disco.
+        linhas = int(self.txt_log.index("end-1c").split(".")[0]) - 1
+        if linhas > LIMITE_LINHAS_WIDGET:
+            self.txt_log.delete("1.0", f"{linhas - LIMITE_LINHAS_WIDGET + 1}.0")
         self.txt_log.see("end")
         self.txt_log.configure(state="disabled")
-        self.update_idletasks()
+
+    def _exibir_metricas(self) -> None:
+        self.tabela_metricas.delete(*self.tabela_metricas.get_children())
+        for item, tempo, linhas, tamanho in self.metricas.resumo():
+            self.tabela_metricas.insert("", "end", text=item, values=(tempo, linhas, tamanho))
+
+    def destroy(self) -> None:
+        self.registro.fechar()
+        super().destroy()
 
     def _set_status(self, msg: str) -> None:
         self.lbl_status.config(text=msg)
@@ -159,10 +276,9 @@ class NotasConsolidadorFrame(ttk.Frame):
         porcentagem = (atual / total) * 100
         self.progress_var.set(porcentagem)
         self.lbl_prog_contador.config(text=f"{atual}/{total}")
-        self.update_idletasks()
 
     def exportar_log(self) -> None:
-        if not self.logs:
+        if not self.registro.total:
             messagebox.showinfo("Log", "Nenhum log para exportar.", parent=self)
             return
 
@@ -176,8 +292,14 @@ class NotasConsolidadorFrame(ttk.Frame):
             return
 
         try:
-            Path(caminho).write_text("\n".join(self.logs), encoding="utf-8")
-            messagebox.showinfo("Log", f"Log salvo em:\n{caminho}", parent=self)
+            self.registro.exportar(caminho)
+            mensagem = f"Log salvo em:\n{caminho}"
+            if not self.metricas.vazio:
+                destino = Path(caminho)
+                caminho_metricas = destino.with_name(f"{destino.stem}_metricas.csv")
+                self.metricas.exportar_csv(caminho_metricas)
+                mensagem += f"\n\nMétricas salvas em:\n{caminho_metricas}"
+            messagebox.showinfo("Log", mensagem, parent=self)
         except Exception as e:
             messagebox.showerror("Erro", f"Não foi possível salvar o log:\n{e}", parent=self)
 
@@ -204,6 +326,9 @@ class NotasConsolidadorFrame(ttk.Frame):
         return nome_saida
 
     def on_processar(self) -> None:
+        if self._tarefa is not None:
+            return
+
         if not self.arquivos_selecionados:
             messagebox.showwarning("Validação", "Selecione pelo menos um arquivo de relatório.", parent=self)
             return
@@ -217,30 +342,131 @@ class NotasConsolidadorFrame(ttk.Frame):
         pasta_base = Path(self.arquivos_selecionados[0]).parent
         caminho_saida = pasta_base / nome_saida
 
-        try:
-            # limpa log anterior e reseta progresso
-            self.logs.clear()
-            self.txt_log.configure(state="normal")
-            self.txt_log.delete("1.0", "end")
-            self.txt_log.configure(state="disabled")
-
-            total = len(self.arquivos_selecionados)
-            self._reset_progress(total)
-
-            self.log("Iniciando processamento...")
-            self._set_status("Processando relatórios...")
-            processar_arquivos(
-                self.arquivos_selecionados,
-                str(caminho_saida),
-                dividir_por_uc=self.dividir_por_uc.get(),
-                manter_nome_original=self.manter_nome_original.get(),
-                log_callback=self.log,
-                progress_callback=self._atualizar_progresso,
+        retomar = True
+        interrompido = verificar_diario(caminho_saida, self.arquivos_selecionados)
+        if interrompido:
+            lidos, total_diario = interrompido
+            resposta = messagebox.askyesnocancel(
+                "Processamento interrompido",
+                f"Um processamento anterior para '{nome_saida}' parou com {lidos} de "
+                f"{total_diario} relatórios já lidos.\n\n"
+                "Sim: retomar de onde parou.\nNão: recomeçar do zero.",
+                parent=self,
             )
+            if resposta is None:
+                return
+            retomar = resposta
+
+        # limpa log anterior e reseta progresso
+        self.registro.limpar()
+        self.txt_log.configure(state="normal")
+        self.txt_log.delete("1.0", "end")
+        self.txt_log.configure(state="disabled")
+        self.metricas = ColetorMetricas()
+        self._exibir_metricas()
+
+        total = len(self.arquivos_selecionados)
+        self._reset_progress(total)
+
+        self.log("Iniciando processamento...")
+
+        agendador = agendador_padrao()
+        paralelo = self.processar_em_paralelo.get()
+        arquivos = list(self.arquivos_selecionados)
+        opcoes = {
+            "dividir_por_uc": self.dividir_por_uc.get(),
+            "manter_nome_original": self.manter_nome_original.get(),
+            "matriz_alunos": self.matriz_alunos.get(),
+            "validar_antes": True,
+            "ignorar_invalidos": self.ignorar_invalidos.get(),
+            "usar_diario": True,
+            "retomar": retomar,
+            "max_workers": agendador.max_processos if paralelo else 1,
+            "cache_dir": pasta_cache_padrao() if self.usar_cache.get() else None,
+            "medir_memoria": self.medir_memoria.get(),
+            "perfil": self.gerar_perfil.get(),
+            "metrics_callback": self.metricas,
+        }
+
+        def executar(log, progresso, cancelar):
+            # Várias consolidações ao mesmo tempo dividem o mesmo pool (e os núcleos).
+            executor = agendador.pool_processos() if paralelo else None
+            try:
+                processar_arquivos(
+                    arquivos,
+                    str(caminho_saida),
+                    log_callback=log,
+                    progress_callback=progresso,
+                    cancelar=cancelar,
+                    executor=executor,
+                    **opcoes,
+                )
+            except BrokenProcessPool:
+                # Sem isto o pool morto falharia todas as consolidações seguintes.
+                if executor is not None:
+                    agendador.descartar_pool_quebrado(executor)
+                raise
+
+        self._caminho_saida = caminho_saida
+        self._tarefa = agendador.enviar(executar, f"Consolidação: {nome_saida}", ferramenta="consolidador_notas")
+        self._na_fila = self._tarefa.estado == ESTADO_AGUARDANDO
+        self._set_status("Aguardando outras tarefas na fila..." if self._na_fila else "Processando relatórios...")
+        self.btn_processar.configure(state="disabled")
+        self.btn_cancelar.configure(state="normal")
+        self.after(INTERVALO_ATUALIZACAO_MS, self._acompanhar_tarefa)
+
+    def on_cancelar(self) -> None:
+        if self._tarefa is None or not self._tarefa.ativa:
+            return
+        self._tarefa.cancelar()
+        self.btn_cancelar.configure(state="disabled")
+        self._set_status("Cancelando após o arquivo atual...")
+
+    def _acompanhar_tarefa(self) -> None:
+        """
+        Esvazia a fila de eventos da tarefa. Só o último progresso é aplicado,
+        então a barra é atualizada no máximo uma vez por ciclo.
+        """
+        tarefa = self._tarefa
+        if tarefa is None:
+            return
+
+        progresso: tuple[int, int] | None = None
+        fim: Evento | None = None
+        for evento in tarefa.drenar():
+            if evento.tipo == EVENTO_LOG:
+                self.log(evento.dados)
+            elif evento.tipo == EVENTO_PROGRESSO:
+                progresso = evento.dados
+            else:
+                fim = evento
+
+        if progresso:
+            self._atualizar_progresso(*progresso)
+
+        if fim is None:
+            if self._na_fila and tarefa.estado != ESTADO_AGUARDANDO:
+                self._na_fila = False
+                if not tarefa.cancelamento_solicitado:
+                    self._set_status("Processando relatórios...")
+            self.after(INTERVALO_ATUALIZACAO_MS, self._acompanhar_tarefa)
+            return
+
+        self._tarefa = None
+        self.btn_processar.configure(state="normal")
+        self.btn_cancelar.configure(state="disabled")
+        # O coletor só é lido aqui, depois que a thread de processamento terminou.
+        self._exibir_metricas()
+
+        if fim.tipo == EVENTO_CONCLUIDO:
             self.log("Processamento concluído com sucesso.")
             self._set_status("Processamento concluído.")
-            messagebox.showinfo("Sucesso", f"Arquivo gerado:\n{caminho_saida}", parent=self)
-        except Exception as e:
+            messagebox.showinfo("Sucesso", f"Arquivo gerado:\n{self._caminho_saida}", parent=self)
+        elif isinstance(fim.dados, (ProcessamentoCancelado, TarefaCancelada)):
+            self.log(str(fim.dados))
+            self._set_status("Processamento cancelado.")
+        else:
+            e = fim.dados
             self.log(f"Erro: {e}")
             self._set_status("Erro no processamento.")
             messagebox.showerror("Erro", f"Ocorreu um erro:\n{e}", parent=self)
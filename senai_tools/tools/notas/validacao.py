@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from dataclasses import dataclass
+import os
+from pathlib import Path
+from typing import Callable, Sequence
+
+from .entradas import extrair_nome_uc
+from .execucao import usar_pool
+from .leitor import COLUNAS_OBRIGATORIAS, ler_cabecalho
+
+PROBLEMA_ILEGIVEL = "ilegivel"
+PROBLEMA_VAZIO = "planilha_vazia"
+PROBLEMA_COLUNAS = "colunas_ausentes"
+PROBLEMA_UC_DUPLICADA = "uc_duplicada"
+
+# Problemas que impedem a leitura do arquivo; UC duplicada é só um aviso
+# (as abas recebem sufixo e a matriz junta as notas).
+PROBLEMAS_GRAVES = {PROBLEMA_ILEGIVEL, PROBLEMA_VAZIO, PROBLEMA_COLUNAS}
+
+
+@dataclass(frozen=True)
+class ProblemaRelatorio:
+    """Problema encontrado no cabeçalho de um relatório antes da leitura completa."""
+
+    caminho: str
+    tipo: str
+    mensagem: str
+
+    @property
+    def grave(self) -> bool:
+        return self.tipo in PROBLEMAS_GRAVES
+
+    def __str__(self) -> str:
+        return f"{Path(self.caminho).name}: {self.mensagem}"
+
+
+class RelatoriosInvalidos(ValueError):
+    """Levantada quando a validação prévia encontra relatórios que não podem ser lidos."""
+
+    def __init__(self, problemas: Sequence[ProblemaRelatorio]):
+        self.problemas = list(problemas)
+        linhas = "\n".join(f"- {problema}" for problema in self.problemas)
+        super().__init__(f"{len(self.problemas)} relatório(s) com problema:\n{linhas}")
+
+
+def inspecionar_relatorio(caminho: str) -> ProblemaRelatorio | None:
+    """
+    Confere só o cabeçalho de um relatório. Função de módulo para poder ser
+    executada em processos separados.
+    """
+    try:
+        cabecalho = ler_cabecalho(caminho)
+    except Exception as e:
+        return ProblemaRelatorio(caminho, PROBLEMA_ILEGIVEL, f"não foi possível abrir o arquivo ({e})")
+
+    if cabecalho is None:
+        return ProblemaRelatorio(caminho, PROBLEMA_VAZIO, "a primeira planilha está vazia")
+
+    faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in cabecalho]
+    if faltantes:
+        nomes = ", ".join(f"'{col}'" for col in faltantes)
+        return ProblemaRelatorio(caminho, PROBLEMA_COLUNAS, f"coluna(s) obrigatória(s) ausente(s): {nomes}")
+    return None
+
+
+def validar_relatorios(
+    lista_arquivos: Sequence[str],
+    max_workers: int | None = 1,
+    log_callback: Callable[[str], None] | None = None,
+    executor: Executor | None = None,
+) -> list[ProblemaRelatorio]:
+    """
+    Confere o cabeçalho de todos os relatórios (em paralelo quando
+    `max_workers` permite) e devolve todos os problemas de uma vez, na ordem
+    da lista: arquivos ilegíveis, planilhas vazias, colunas ausentes e UCs
+    repetidas entre arquivos. `executor` é um pool compartilhado, usado no
+    lugar de um pool próprio.
+    """
+    workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+    workers = min(max(workers, 1), len(lista_arquivos))
+
+    if workers <= 1:
+        resultados = [inspecionar_relatorio(str(caminho)) for caminho in lista_arquivos]
+    else:
+        if log_callback:
+            log_callback(f"Validando cabeçalhos com {workers} processos.")
+        with usar_pool(executor, workers) as pool:
+            # Cada tarefa é curta: lotes maiores reduzem o custo de comunicação.
+            lote = max(1, len(lista_arquivos) // (workers * 4))
+            resultados = list(pool.map(inspecionar_relatorio, map(str, lista_arquivos), chunksize=lote))
+
+    problemas = [problema for problema in resultados if problema is not None]
+    problemas.extend(_ucs_duplicadas(lista_arquivos))
+    ordem = {str(caminho): idx for idx, caminho in enumerate(lista_arquivos)}
+    problemas.sort(key=lambda problema: ordem[problema.caminho])
+    return problemas
+
+
+def _ucs_duplicadas(lista_arquivos: Sequence[str]) -> list[ProblemaRelatorio]:
+    primeiro_da_uc: dict[str, str] = {}
+    problemas = []
+    for caminho in map(str, lista_arquivos):
+        uc = extrair_nome_uc(Path(caminho).name)
+        if uc in primeiro_da_uc:
+            problemas.append(
+                ProblemaRelatorio(
+                    caminho,
+                    PROBLEMA_UC_DUPLICADA,
+                    f"UC '{uc}' repetida (também em {Path(primeiro_da_uc[uc]).name})",
+                )
+            )
+        else:
+            primeiro_da_uc[uc] = caminho
+    return problemas